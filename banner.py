@@ -0,0 +1,39 @@
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import os
+import tempfile
+
+
+# -----------------------------
+# Cached Figlet Banner
+# -----------------------------
+# Rendering with pyfiglet costs an import plus a font parse on every call.
+# The rendered text is cached in-process and in a small on-disk artifact, so
+# pyfiglet is only imported the first time a (text, font) pair is ever drawn.
+CACHE_DIR = Path(os.environ.get("GAME_BANNER_CACHE", Path(__file__).with_name(".banner_cache")))
+
+def _artifact(text: str, font: str) -> Path:
+    key = hashlib.sha1(f"{font}\x00{text}".encode()).hexdigest()[:16]
+    return CACHE_DIR / f"{font}-{key}.txt"
+
+@lru_cache(maxsize=None)
+def render_banner(text: str = "Game Zone", font: str = "slant") -> str:
+    path = _artifact(text, font)
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
+    from pyfiglet import Figlet
+    rendered = Figlet(font=font).renderText(text)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(rendered)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only checkout: still correct, just not cached on disk
+    return rendered
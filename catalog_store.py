@@ -0,0 +1,235 @@
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from array import array
+from pathlib import Path
+import argparse
+import csv
+import json
+import mmap
+import struct
+import sys
+import time
+
+
+# -----------------------------
+# Compact Catalog Storage
+# -----------------------------
+# A word catalog held as flat arrays instead of a dict of lists:
+#   words        list of the words, in file order (word id = position)
+#   categories   interned category names, in first-seen order
+#   tag_offsets  uint32[len(words) + 1]; word i's tags are
+#   tag_ids      uint32[tag_offsets[i]:tag_offsets[i + 1]], ids into categories
+# Text catalogs are streamed once, record by record. The binary form (.wcat)
+# is the same arrays laid out on disk: opening it memory-maps the file and
+# views the arrays in place, so only the word and category text is decoded.
+# It may also carry the catalog's prebuilt question plan and digest (see
+# question_planner.QuestionPlan.stored), so opening it skips the plan build.
+#
+# Text formats, picked by extension:
+#   .csv    word,categories   categories joined by ";" (rows for the same word
+#                             may also repeat one category each, back to back)
+#   .jsonl  {"word": ..., "categories": [...]} per line
+#   .json   {word: [categories], ...}
+BINARY_SUFFIX = ".wcat"
+_MAGIC = b"WCAT\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sIIIIII")  # magic, words, categories, tags, word bytes, category bytes, plan bytes
+# Plan section, after the category text: this header, then int32 kinds,
+# subjects, yes_child and no_child per node and word_depths per word
+_PLAN_MAGIC = b"PLAN"
+_PLAN_HEADER = struct.Struct("<4sII32s")  # magic, planner version, nodes, catalog sha256
+
+Record = Tuple[str, Sequence[str]]
+
+
+class StoredPlan(NamedTuple):
+    version: int
+    digest: str  # question_planner.catalog_hash of the catalog it was built from
+    kinds: Sequence[int]  # 1 category question, 0 direct guess
+    subjects: Sequence[int]  # category id (into CatalogStore.categories) or word id
+    yes_child: Sequence[int]
+    no_child: Sequence[int]
+    word_depths: Sequence[int]
+
+
+def _int_arrays(view: memoryview, start: int, counts: Sequence[int], code: str) -> list:
+    # Little-endian 4-byte arrays laid end to end from `start`, viewed in place
+    arrays = []
+    for count in counts:
+        chunk = view[start:start + 4 * count]
+        if sys.byteorder == "little":
+            arrays.append(chunk.cast(code))
+        else:
+            swapped = array(code, chunk.tobytes())
+            swapped.byteswap()
+            arrays.append(swapped)
+        start += 4 * count
+    return arrays
+
+def _little_endian(values: Sequence[int], code: str) -> bytes:
+    values = array(code, values)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _csv_records(path: Path) -> Iterator[Record]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        for line_no, row in enumerate(csv.reader(handle)):
+            if not row or row[0].startswith("#") or (line_no == 0 and row[0].strip().lower() == "word"):
+                continue  # blank, comment or header row
+            tags = row[1].split(";") if len(row) > 1 else []
+            yield row[0].strip(), [tag.strip() for tag in tags if tag.strip()]
+
+def _jsonl_records(path: Path) -> Iterator[Record]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                yield record["word"], record.get("categories", ())
+
+def _json_records(path: Path) -> Iterator[Record]:
+    with open(path, encoding="utf-8") as handle:
+        yield from json.load(handle).items()
+
+_READERS = {".csv": _csv_records, ".jsonl": _jsonl_records, ".json": _json_records}
+
+def iter_records(path) -> Iterator[Record]:
+    path = Path(path)
+    reader = _READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"unsupported catalog format: {path.name}")
+    return reader(path)
+
+
+class CatalogStore:
+    __slots__ = ("words", "categories", "tag_offsets", "tag_ids", "plan", "_buffer")
+
+    def __init__(self, words: list[str], categories: list[str], tag_offsets: Sequence[int], tag_ids: Sequence[int],
+                 buffer=None, plan: Optional[StoredPlan] = None):
+        self.words = words
+        self.categories = categories
+        self.tag_offsets = tag_offsets
+        self.tag_ids = tag_ids
+        self.plan = plan
+        self._buffer = buffer  # keeps a memory map alive while the views are in use
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def tags(self, word_id: int) -> list[str]:
+        return [self.categories[c] for c in self.tag_ids[self.tag_offsets[word_id]:self.tag_offsets[word_id + 1]]]
+
+    def items(self) -> Iterator[Record]:
+        for word_id, word in enumerate(self.words):
+            yield word, self.tags(word_id)
+
+    # -- building -----------------------------------------------------------------
+    @classmethod
+    def from_records(cls, records: Iterable[Record]) -> "CatalogStore":
+        words: list[str] = []
+        seen: set[str] = set()
+        categories: list[str] = []
+        category_ids: dict[str, int] = {}
+        tag_offsets = array("I", [0])
+        tag_ids = array("I")
+        for word, tags in records:
+            if not word or "\n" in word:
+                raise ValueError(f"invalid word: {word!r}")
+            if words and word == words[-1]:
+                tag_offsets.pop()  # long format: more tags for the same word
+            elif word in seen:
+                raise ValueError(f"duplicate word: {word!r}")
+            else:
+                words.append(word)
+                seen.add(word)
+            for tag in tags:
+                category_id = category_ids.get(tag)
+                if category_id is None:
+                    if not tag or "\n" in tag:
+                        raise ValueError(f"invalid category for {word!r}: {tag!r}")
+                    category_id = category_ids[tag] = len(categories)
+                    categories.append(sys.intern(tag))
+                tag_ids.append(category_id)
+            tag_offsets.append(len(tag_ids))
+        return cls(words, categories, tag_offsets, tag_ids)
+
+    # -- binary form -------------------------------------------------------------------
+    def save(self, path, plan: Optional[StoredPlan] = None) -> None:
+        word_blob = "\n".join(self.words).encode("utf-8")
+        category_blob = "\n".join(self.categories).encode("utf-8")
+        plan_blob = b""
+        if plan is not None:
+            plan_blob = b"".join([_PLAN_HEADER.pack(_PLAN_MAGIC, plan.version, len(plan.kinds), bytes.fromhex(plan.digest))]
+                                 + [_little_endian(values, "i") for values in plan[2:]])
+        with open(path, "wb") as handle:
+            handle.write(_HEADER.pack(_MAGIC, len(self.words), len(self.categories), len(self.tag_ids),
+                                      len(word_blob), len(category_blob), len(plan_blob)))
+            handle.write(_little_endian(self.tag_offsets, "I"))
+            handle.write(_little_endian(self.tag_ids, "I"))
+            handle.write(word_blob)
+            handle.write(category_blob)
+            handle.write(plan_blob)
+
+    @classmethod
+    def open(cls, path) -> "CatalogStore":
+        with open(path, "rb") as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_words, n_categories, n_tags, word_bytes, category_bytes, plan_bytes = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"not a word catalog: {path}")
+
+        view = memoryview(buffer)
+        start = _HEADER.size
+        tag_offsets, tag_ids = _int_arrays(view, start, (n_words + 1, n_tags), "I")
+        start += 4 * (n_words + 1 + n_tags)
+        words = str(view[start:start + word_bytes], "utf-8").split("\n") if n_words else []
+        start += word_bytes
+        categories = str(view[start:start + category_bytes], "utf-8").split("\n") if n_categories else []
+        start += category_bytes
+
+        plan = None
+        if plan_bytes:
+            if start + plan_bytes > len(buffer):
+                raise ValueError(f"corrupt question plan in {path}")
+            plan_magic, version, nodes, digest = _PLAN_HEADER.unpack_from(buffer, start)
+            if plan_magic != _PLAN_MAGIC or plan_bytes != _PLAN_HEADER.size + 4 * (4 * nodes + n_words):
+                raise ValueError(f"corrupt question plan in {path}")
+            plan = StoredPlan(version, digest.hex(),
+                              *_int_arrays(view, start + _PLAN_HEADER.size, (nodes,) * 4 + (n_words,), "i"))
+        return cls(words, [sys.intern(c) for c in categories], tag_offsets, tag_ids, buffer, plan)
+
+
+def load_store(path) -> CatalogStore:
+    if Path(path).suffix.lower() == BINARY_SUFFIX:
+        return CatalogStore.open(path)
+    return CatalogStore.from_records(iter_records(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV/JSONL/JSON word catalog to the memory-mapped binary form.")
+    parser.add_argument("source")
+    parser.add_argument("target", nargs="?", help=f"defaults to the source with a {BINARY_SUFFIX} suffix")
+    parser.add_argument("--no-plan", action="store_true", help="leave out the prebuilt question plan")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = load_store(args.source)
+    loaded = time.perf_counter() - start
+    target = Path(args.target or Path(args.source).with_suffix(BINARY_SUFFIX))
+    plan, planned = None, 0.0
+    if not args.no_plan:
+        from word_index import WordIndex
+        from matrix_engine import matrix_engine_for
+        from question_planner import QuestionPlan, catalog_hash
+
+        start = time.perf_counter()
+        index = WordIndex.from_store(store)
+        plan = QuestionPlan(index, matrix_engine_for(index)).stored(catalog_hash(index), store.categories)
+        planned = time.perf_counter() - start
+    store.save(target, plan)
+
+    start = time.perf_counter()
+    CatalogStore.open(target)
+    opened = time.perf_counter() - start
+    print(f"{len(store):,} words, {len(store.categories):,} categories, {len(store.tag_ids):,} tags"
+          + (f", {len(plan.kinds):,} plan nodes (planned in {planned:.1f} s)" if plan else ""))
+    print(f"streamed {args.source} in {loaded * 1000:.1f} ms; {target} opens in {opened * 1000:.1f} ms")
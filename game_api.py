@@ -0,0 +1,336 @@
+from typing import Any, Optional, Tuple
+from array import array
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import game_nodes
+from game_simulator import percentile
+from question_planner import CATEGORY
+from state_token import InvalidToken, StateCodec
+from game_stats import get_stats
+from tolerant_search import MAX_ERRORS
+import number_search
+
+
+# -----------------------------
+# HTTP JSON Game API
+# -----------------------------
+# The web app's number and word game steps over plain HTTP/1.1 (keep-alive),
+# without Streamlit or a websocket per player. The server keeps no sessions:
+# every response carries a signed state token (state_token.py) and the next
+# request sends it back, so any replica sharing GAME_TOKEN_KEY can serve it.
+#   POST /start   {"mode": "number"|"word", "low"?, "high"?, "games_played"?, "tolerance"?}
+#   POST /answer  {"token", "answer": "yes"|"no"|"back"}
+#   POST /state   {"token"}            (or GET /state?token=...)
+#   POST /batch   {"requests": [{"op": "start"|"answer"|"state", ...}, ...]}   (at most MAX_BATCH)
+# Each game response is {"token", "mode", "prompt", "question": {"kind",
+# "subject"} or null, "game_over", "attempts"}. Steps run the graph nodes
+# directly (number_game / word_game), one node call per answer.
+MAX_BODY = 1 << 20
+MAX_BATCH = 64  # steps per /batch request, so one request cannot hold the event loop for long
+NODES = {"number": game_nodes.number_game, "word": game_nodes.word_game}
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _bound(value) -> int:
+    # A JSON int, or a string parse_bound accepts ("2**64"; powers are sized
+    # before they are computed, so no request can stall the event loop)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return number_search.parse_bound(value)
+    raise ValueError("bounds must be integers")
+
+
+class GameApi:
+    def __init__(self, codec: Optional[StateCodec] = None):
+        self.codec = codec or StateCodec()
+        self.requests = 0
+
+    def _view(self, state: game_nodes.GameState) -> dict:
+        if state["game_over"] or state["mode"] not in NODES:
+            question = None
+        elif state["mode"] == "number":
+            subject = state["mid"] if state["tolerance"] else number_search.midpoint(*state["number_range"])
+            question = {"kind": "number", "subject": subject}
+        elif state["tolerance"]:
+            kind, subject = game_nodes.tolerant_search_for(state).question()
+            question = {"kind": kind, "subject": subject}
+        else:
+            kind, subject = game_nodes.word_plan.question(state["plan_node"])
+            question = {"kind": kind, "subject": subject}
+        return {
+            "token": self.codec.encode(state),
+            "mode": state["mode"],
+            "prompt": state["step_output"],
+            "question": question,
+            "game_over": state["game_over"],
+            "attempts": state["attempts"],
+        }
+
+    def _state(self, request: dict) -> game_nodes.GameState:
+        try:
+            return self.codec.decode(str(request["token"]))
+        except KeyError:
+            raise ApiError(400, "missing token") from None
+        except InvalidToken as exc:
+            raise ApiError(400, f"invalid token: {exc}") from None
+
+    def step(self, op: str, request: dict) -> dict:
+        if op == "start":
+            mode = request.get("mode")
+            if mode not in NODES:
+                raise ApiError(400, "mode must be 'number' or 'word'")
+            try:
+                bounds = number_search.validate_range(
+                    _bound(request.get("low", number_search.DEFAULT_RANGE[0])),
+                    _bound(request.get("high", number_search.DEFAULT_RANGE[1])),
+                )
+            except ValueError as exc:
+                raise ApiError(400, f"invalid range: {exc}") from None
+            games_played = request.get("games_played", 0)
+            if not isinstance(games_played, int) or isinstance(games_played, bool) or not 0 <= games_played < 2 ** 32:
+                raise ApiError(400, "games_played must be an integer in [0, 2**32)")
+            tolerance = request.get("tolerance", 0)
+            if not isinstance(tolerance, int) or isinstance(tolerance, bool) or not 0 <= tolerance <= MAX_ERRORS:
+                raise ApiError(400, f"tolerance must be an integer in [0, {MAX_ERRORS}]")
+            state = NODES[mode](game_nodes.initialize_state(mode, bounds, games_played, tolerance))
+            if state["game_over"]:  # a one-number range ends before any question
+                get_stats().record(mode, True, 0, None, "api")
+            return self._view(state)
+
+        state = self._state(request)
+        if op == "answer":
+            answer = request.get("answer")
+            if answer not in ("yes", "no", "back") or (answer == "back" and state["mode"] != "word" and not state["tolerance"]):
+                raise ApiError(400, "answer must be 'yes' or 'no' (or 'back' in the word game or a tolerant game)")
+            if state["mode"] not in NODES:
+                raise ApiError(400, "no game in progress")
+            state["user_input"] = answer
+            was_over = state["game_over"]
+            state = NODES[state["mode"]](state)
+            if state["game_over"] and not was_over:
+                get_stats().record(state["mode"], game_nodes.answer_found(state), state["attempts"], None, "api")
+        elif op != "state":
+            raise ApiError(404, f"unknown operation: {op}")
+        return self._view(state)
+
+    def batch(self, request: dict) -> dict:
+        requests = request.get("requests")
+        if not isinstance(requests, list):
+            raise ApiError(400, "requests must be a list")
+        if len(requests) > MAX_BATCH:
+            raise ApiError(413, f"at most {MAX_BATCH} requests per batch")
+        responses = []
+        for item in requests:
+            try:
+                responses.append(self.step(str(item.get("op")), item))
+            except (ApiError, AttributeError, TypeError, ValueError) as exc:
+                responses.append({"error": str(exc)})
+        return {"responses": responses}
+
+    def route(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        self.requests += 1
+        url = urlsplit(target)
+        try:
+            if method == "GET" and url.path == "/state":
+                token = parse_qs(url.query).get("token", [""])[0]
+                return 200, self.step("state", {"token": token})
+            if method != "POST":
+                raise ApiError(405, "use POST")
+            if len(body) > MAX_BODY:
+                raise ApiError(413, "body too large")
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                raise ApiError(400, "body is not JSON") from None
+            if not isinstance(request, dict):
+                raise ApiError(400, "body must be a JSON object")
+            if url.path == "/batch":
+                return 200, self.batch(request)
+            return 200, self.step(url.path.strip("/"), request)
+        except ApiError as exc:
+            return exc.status, {"error": str(exc)}
+        except (TypeError, ValueError) as exc:
+            return 400, {"error": str(exc)}
+
+    # -- HTTP/1.1 ---------------------------------------------------------------------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = self.route(method, target, body)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+
+                data = json.dumps(payload, separators=(",", ":")).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, backlog=4096)
+
+
+# -----------------------------
+# Load Generator
+# -----------------------------
+# Keep-alive clients that each play games to the end, answering truthfully
+# about a random secret. With --batch N a client advances N games per
+# request through /batch instead. Latency is per HTTP request.
+class HttpClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def post(self, path: str, payload: dict) -> dict:
+        body = json.dumps(payload).encode()
+        self.writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        result = json.loads(await self.reader.readexactly(length))
+        if not status_line.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(result.get("error", status_line.decode().strip()))
+        return result
+
+def _answer(question: dict, secret) -> str:
+    kind, subject = question["kind"], question["subject"]
+    if kind == "number":
+        return "yes" if secret > subject else "no"
+    if kind == CATEGORY:
+        return "yes" if game_nodes.word_index.has_category(secret, subject) else "no"
+    return "yes" if subject == secret else "no"
+
+class LoadStats:
+    def __init__(self):
+        self.latency_ns = array("q")
+        self.games = 0
+        self.steps = 0
+
+async def _client(host: str, port: int, games: int, batch: int, bounds, rng: random.Random, stats: LoadStats) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    client = HttpClient(reader, writer)
+    index = game_nodes.word_index
+    try:
+        remaining = games
+        while remaining:
+            size = min(batch, remaining)
+            remaining -= size
+            modes = [rng.choice(("number", "word")) for _ in range(size)]
+            secrets = [rng.randint(*bounds) if mode == "number" else index.pick(index.all_words, rng) for mode in modes]
+            requests = [{"op": "start", "mode": mode, "low": bounds[0], "high": bounds[1]} for mode in modes]
+            live = list(range(size))
+            while live:
+                start = time.perf_counter_ns()
+                if batch == 1:
+                    request = requests[0]
+                    responses = [await client.post("/" + request.pop("op"), request)]
+                else:
+                    responses = (await client.post("/batch", {"requests": [requests[i] for i in live]}))["responses"]
+                stats.latency_ns.append(time.perf_counter_ns() - start)
+                stats.steps += len(responses)
+
+                still_live = []
+                for i, response in zip(live, responses):
+                    if response["game_over"]:
+                        stats.games += 1
+                        continue
+                    requests[i] = {"op": "answer", "token": response["token"], "answer": _answer(response["question"], secrets[i])}
+                    still_live.append(i)
+                live = still_live
+    finally:
+        writer.close()
+
+async def run_load(host: str, port: int, clients: int, games: int, batch: int = 1,
+                   bounds=number_search.DEFAULT_RANGE, seed: int = 0) -> dict:
+    stats = LoadStats()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, games, batch, bounds, random.Random(rng.random()), stats) for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    requests = len(stats.latency_ns)
+    return {
+        "clients": clients,
+        "batch": batch,
+        "games": stats.games,
+        "requests": requests,
+        "steps": stats.steps,
+        "seconds": seconds,
+        "requests_per_sec": requests / seconds if seconds else 0.0,
+        "steps_per_sec": stats.steps / seconds if seconds else 0.0,
+        "games_per_sec": stats.games / seconds if seconds else 0.0,
+        "latency_ms": {f"p{int(q * 100)}": percentile(stats.latency_ns, q) / 1e6 for q in (0.5, 0.95, 0.99)},
+    }
+
+
+async def _main(args) -> None:
+    if args.command == "serve":
+        listener = await GameApi().start(args.host, args.port)
+        print(f"Serving the game API on http://{args.host}:{args.port}", flush=True)
+        async with listener:
+            await listener.serve_forever()
+
+    listener = await GameApi().start(args.host, args.port) if args.local else None
+    report = await run_load(args.host, args.port, args.clients, args.games, args.batch, (args.low, args.high), args.seed)
+    if listener is not None:
+        listener.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the games as a JSON HTTP API, or load-test one.")
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=50, help="load: concurrent keep-alive connections")
+    parser.add_argument("--games", type=int, default=100, help="load: games per client")
+    parser.add_argument("--batch", type=int, default=1, help="load: games advanced per request via /batch")
+    parser.add_argument("--low", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[0])
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="load: start a server in this process first")
+    args = parser.parse_args()
+    if not 1 <= args.batch <= MAX_BATCH:
+        parser.error(f"--batch must be in [1, {MAX_BATCH}]")
+    asyncio.run(_main(args))
@@ -0,0 +1,333 @@
+from langgraph.constants import START, END # Cheap; langgraph.graph is imported lazily
+from typing import TypedDict, Optional, Tuple, Literal
+from collections import OrderedDict
+import os
+import threading
+import time
+from word_catalog import get_catalog
+from question_planner import CATEGORY, FOUND, EXHAUSTED
+from play_history import QuestionStrategy
+import number_search
+import tolerant_search
+
+# -----------------------------
+# State Definition for LangGraph
+# -----------------------------
+class GameState(TypedDict):
+    mode: Optional[Literal['number', 'word', 'exit']]
+    number_bounds: Tuple[int, int] # Configured range every number game starts from
+    number_range: Tuple[int, int]
+    attempts: int
+    games_played: int
+    word_options: Optional[list[str]]
+    asked_categories: list[str]
+    current_guess: Optional[str]
+    user_input: Optional[Literal['yes', 'no', 'back']]
+    low: int
+    high: int
+    mid: Optional[int]
+    game_start: bool
+    step_output: Optional[str]
+    next_node: Optional[str]
+    game_over: bool
+    word_list: Optional[list[str]] # For the new word game logic
+    word_game_step: int # To track the step in the word game
+    plan_node: int # Current node in the word game question plan; it fixes the candidate words
+    answer_log: list[int] # Plan nodes answered so far; popping one undoes that answer
+    tolerance: int # Wrong answers the game survives (tolerant_search); 0 for the plain game
+    tolerant_answers: list[bool] # Answers of a tolerant game; popping one undoes that answer
+    plan_id: int # Number split and word plan the game asks with (see use_strategy); 0 for the uniform ones
+
+def initialize_state(mode=None, number_bounds=number_search.DEFAULT_RANGE, games_played=0, tolerance=0) -> GameState:
+    low, high = number_bounds
+    return {
+        'mode': mode,
+        'number_bounds': (low, high),
+        'number_range': (low, high),
+        'attempts': 0,
+        'games_played': games_played,
+        'word_options': None, # The word list lives in the shared catalog
+        'asked_categories': [],
+        'current_guess': None,
+        'user_input': None,
+        'low': low,
+        'high': high,
+        'mid': None,
+        'game_start': False,
+        'step_output': None,
+        'next_node': {'number': 'number_game', 'word': 'word_game'}.get(mode),
+        'game_over': False,
+        'word_list': None,
+        'word_game_step': 0,
+        'plan_node': word_plan.ROOT,
+        'answer_log': [],
+        'tolerance': tolerance,
+        'tolerant_answers': [],
+        'plan_id': current_plan_id() if mode in ('number', 'word') and not tolerance else 0,
+    }
+
+# -----------------------------
+# Word game data
+# -----------------------------
+# Built once per process by word_catalog and shared by every session; a rerun
+# only looks it up (and re-stats the file when GAME_WORD_CATALOG is set).
+catalog = get_catalog()
+word_index = catalog.index
+all_categories = catalog.categories
+word_plan = catalog.plan
+
+# -----------------------------
+# Question Strategy
+# -----------------------------
+# Plain bisection and the catalog's uniform plan, unless an app installs a
+# prior-weighted strategy (play_history.AdaptiveStrategy; the web app does
+# when GAME_HISTORY_FILE is set). Its rebuilds swap a new split or plan in
+# while games run, so a game keeps the pair it started with: its state names
+# the pair by plan_id. Id 0 is the uniform pair, the only one the token
+# codec, the HTTP API and the replay log know; other ids are random, so a
+# checkpoint saved by another process never names a pair of this one.
+# New games take up a rebuilt pair at most once per PLAN_REFRESH_SECONDS and
+# the last PLANS_KEPT pairs are kept, so a game has at least 7 minutes
+# before its pair may be dropped; such a game starts over.
+PLANS_KEPT = 8
+PLAN_REFRESH_SECONDS = 60.0
+RESTART_NOTE = "🔄 My questions were updated, so let's start this game over.\n"
+strategy = QuestionStrategy(word_plan)
+_plans: OrderedDict = OrderedDict({0: (number_search.midpoint, word_plan)})
+_plans_lock = threading.Lock()
+_plan_taken = float("-inf")
+
+def use_strategy(new_strategy: QuestionStrategy) -> None:
+    global strategy
+    strategy = new_strategy
+
+def current_plan_id() -> int:
+    # Id of the pair new games ask with
+    global _plan_taken
+    split, plan = strategy.number_split, strategy.plan
+    with _plans_lock:
+        latest = next(reversed(_plans))
+        known_split, known_plan = _plans[latest]
+        if (split is not known_split or plan is not known_plan) and time.monotonic() - _plan_taken >= PLAN_REFRESH_SECONDS:
+            latest = int.from_bytes(os.urandom(6), "big") or 1
+            _plans[latest] = (split, plan)
+            _plan_taken = time.monotonic()
+            if len(_plans) > PLANS_KEPT:
+                del _plans[next(plan_id for plan_id in _plans if plan_id)]
+        return latest
+
+def plan_of(state: GameState) -> Optional[tuple]:
+    # (number split, word plan) of the game, or None once dropped
+    with _plans_lock:
+        return _plans.get(state.get("plan_id", 0))
+
+def _start_over(state: GameState) -> GameState:
+    fresh = initialize_state(state["mode"], state["number_bounds"], state["games_played"])
+    state = (number_game if state["mode"] == "number" else word_game)(fresh)
+    state["step_output"] = RESTART_NOTE + state["step_output"]
+    return state
+
+# -----------------------------
+# Game Nodes
+# -----------------------------
+# Each node handles exactly one answer (state["user_input"]; None when a game
+# has just been started) and leaves the next prompt in state["step_output"].
+# They never touch Streamlit, so the same graph serves every session of the
+# web app, and the token codec, the HTTP API and the replay log run the very
+# same nodes without importing Streamlit at all.
+def number_game(state: GameState) -> GameState:
+    low, high = state["number_range"]
+    response = state["user_input"]
+    state["user_input"] = None
+    if state["tolerance"]:
+        return tolerant_game(state, response)
+    pair = plan_of(state)
+    if pair is None:
+        return _start_over(state)
+
+    if response is None:
+        if low == high:
+            state["step_output"] = f"🎉 Your number is {low}!"
+            state["game_over"] = True
+        else:
+            state["step_output"] = f"Welcome to the Number Game! {number_search.intro(low, high)}\n{ask_number(state, low, high, pair[0])}"
+        return state
+
+    if low < high:
+        # Bisection keeps no mid in the state; any other split keeps the one it asked about
+        mid = state["mid"] if state["mid"] is not None else number_search.midpoint(low, high)
+        state["number_range"] = (mid + 1, high) if response == "yes" else (low, mid)
+        state["attempts"] += 1
+
+        if state["number_range"][0] == state["number_range"][1]:
+            # The finished state keeps the found number; Play Again starts a
+            # fresh state, so every field stays a function of the answers.
+            state["step_output"] = f"🎉 Your number is {state['number_range'][0]}!"
+            state["game_over"] = True  # Mark game as over
+        else:
+            state["step_output"] = ask_number(state, *state["number_range"], pair[0])
+    return state
+
+def ask_number(state: GameState, low: int, high: int, split) -> str:
+    if split is not number_search.midpoint:
+        state["mid"] = split(low, high)
+    return number_search.question(low, high, state["mid"])
+
+def answer_found(state: GameState) -> bool:
+    # For a finished game
+    if state["mode"] == "number":
+        return state["number_range"][0] == state["number_range"][1]
+    return state["current_guess"] is not None if state["tolerance"] else state["plan_node"] == FOUND
+
+def word_game(state: GameState) -> GameState:
+    # The candidate set is never materialised: every plan node stands for the
+    # words consistent with the answers that reach it. An answer pushes the
+    # node it was given at and moves to a child; "back" pops it again. Both
+    # are O(1) whatever the catalog size.
+    node = state["plan_node"]
+    response = state["user_input"]
+    state["user_input"] = None
+    if state["tolerance"]:
+        return tolerant_game(state, response)
+    pair = plan_of(state)
+    if pair is None:
+        return _start_over(state)
+    plan = pair[1]
+
+    if response == "back":
+        if state["answer_log"]:
+            node = state["plan_node"] = state["answer_log"].pop()
+            if plan.question(node)[0] == CATEGORY:
+                state["asked_categories"].pop()
+                state["word_game_step"] -= 1
+            state["attempts"] -= 1
+            state["game_over"] = False
+    elif response is not None and not state["game_over"]:
+        kind, subject = plan.question(node)
+        state["answer_log"].append(node)
+        if kind == CATEGORY:
+            state["asked_categories"].append(subject)
+            state["word_game_step"] += 1
+        state["attempts"] += 1
+        node = state["plan_node"] = plan.advance(node, response == "yes")
+
+        if node == FOUND:
+            state["game_over"] = True
+            state["step_output"] = f"🎉 I guessed it! Your word is '{subject}'!"
+            return state
+        if node == EXHAUSTED:
+            state["game_over"] = True
+            state["step_output"] = "😢 I ran out of guesses."
+            return state
+
+    # Next question is a lookup in the precomputed plan
+    return ask_word(state, *plan.question(node))
+
+def ask_word(state: GameState, kind: str, subject: str, note: str = "") -> GameState:
+    if kind == CATEGORY:
+        state["current_guess"] = None
+        state["step_output"] = f"{note}🧐 Is your word related to '{subject}'?"
+    else:
+        state["current_guess"] = subject
+        state["step_output"] = f"{note}🤔 Is your word '{subject}'?"
+    return state
+
+# Tolerant games keep only their yes/no answers, so "back" is a pop and the
+# state stays a function of the answers, as in the plain games. The searches
+# themselves are cached by (game, tolerance, answers) in LRU order: a step
+# finds the search for all but its last answer and applies just that one, and
+# the search remembers its next question, so the API's view of the step and
+# the decoding of the next token (state_token) find it again instead of
+# replaying. Only a process that has not seen the game (another replica, or
+# after eviction) replays it, once, from its longest cached prefix.
+SLIP_NOTE = "🤨 Some of your answers contradict each other, so I'm double-checking.\n"
+TOLERANT_CACHE_SIZE = 4096
+_searches: OrderedDict = OrderedDict()
+_searches_lock = threading.Lock()
+
+def tolerant_search_for(state: GameState):
+    # The tolerant game's search after its answers; shared, so never answered in place
+    game = ("number", tuple(state["number_bounds"])) if state["mode"] == "number" else ("word",)
+    key, answers = (game, state["tolerance"]), tuple(state["tolerant_answers"])
+    with _searches_lock:
+        for known in range(len(answers), -1, -1):
+            search = _searches.get((key, answers[:known]))
+            if search is not None:
+                _searches.move_to_end((key, answers[:known]))
+                break
+    if search is None:
+        if state["mode"] == "number":
+            search = tolerant_search.TolerantNumberSearch(*state["number_bounds"], state["tolerance"])
+        else:
+            search = tolerant_search.TolerantWordSearch(word_index, state["tolerance"])
+        _cache_search((key, ()), search)
+    for i in range(known, len(answers)):
+        search = tolerant_search.step(search, answers[i])
+        _cache_search((key, answers[:i + 1]), search)
+    return search
+
+def _cache_search(key, search) -> None:
+    with _searches_lock:
+        _searches[key] = search
+        if len(_searches) > TOLERANT_CACHE_SIZE:
+            _searches.popitem(last=False)
+
+def tolerant_game(state: GameState, response) -> GameState:
+    answers = state["tolerant_answers"]
+    if response == "back":
+        if answers:
+            answers.pop()
+            state["game_over"] = False
+    elif response is not None and not state["game_over"]:
+        answers.append(response == "yes")
+    state["attempts"] = len(answers)
+    search = tolerant_search_for(state)
+
+    if state["mode"] == "number":
+        low, high = state["number_bounds"]
+        if search.result is not None:
+            state["number_range"] = (search.result, search.result)
+            state["step_output"] = f"🎉 Your number is {search.result}!"
+            state["game_over"] = True
+        else:
+            # Every threshold leaves candidates on both sides, so a number game
+            # always ends on a number (a wrong one after too many lies)
+            state["number_range"] = (search.segments[0][0], search.segments[-1][1])
+            state["mid"] = search.question()
+            welcome = "" if answers else f"Welcome to the Number Game! {number_search.intro(low, high)}\n"
+            note = SLIP_NOTE if search.caught_error else ""
+            state["step_output"] = f"{welcome}{note}Is your number greater than {state['mid']}?"
+        return state
+
+    if search.found is not None:
+        state["current_guess"] = search.found
+        state["step_output"] = f"🎉 I guessed it! Your word is '{search.found}'!"
+        state["game_over"] = True
+    elif search.exhausted:
+        state["current_guess"] = None
+        state["step_output"] = "😢 I ran out of guesses."
+        state["game_over"] = True
+    else:
+        ask_word(state, *search.question(), note=SLIP_NOTE if search.caught_error else "")
+    return state
+
+# -----------------------------
+# LangGraph Setup
+# -----------------------------
+# One invoke runs exactly one node: START routes on the mode and every node
+# goes straight to END. The checkpointer keeps each session's state between
+# invokes under its thread_id.
+def route_mode(state: GameState) -> str:
+    return state["next_node"] or END
+
+def build_game_graph(checkpointer=None, wrap=None):
+    # `wrap(name, fn)` decorates every node and the router (see node_metrics)
+    from langgraph.graph import StateGraph
+    wrap = wrap or (lambda name, fn: fn)
+    builder = StateGraph(GameState)
+    builder.add_node("number_game", wrap("number_game", number_game))
+    builder.add_node("word_game", wrap("word_game", word_game))
+    builder.add_conditional_edges(START, wrap("route_mode", route_mode))
+    builder.add_edge("number_game", END)
+    builder.add_edge("word_game", END)
+    return builder.compile(checkpointer=checkpointer)
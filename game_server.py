@@ -0,0 +1,261 @@
+from typing import Optional, Tuple
+from array import array
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+import langraph_CLI as cli
+from banner import render_banner
+from game_simulator import percentile
+import number_search
+
+
+# -----------------------------
+# Asyncio Game Server
+# -----------------------------
+# Serves the terminal flow (game_selector -> number_game / word_game, then the
+# router) to many players at once over plain TCP: `telnet localhost 8023`.
+# Each connection is one coroutine driving the same node step generators as
+# langraph_CLI: ASK writes the prompt and awaits a line, PAUSE is an asyncio
+# timer, so an idle player costs a socket and a suspended coroutine, not a
+# thread. Prompts end with telnet IAC GA ("go ahead"), which terminals ignore
+# and the load generator waits for.
+#
+# An answer line longer than MAX_LINE gets a short error and the connection
+# is closed. The rest of that line is never read.
+GO_AHEAD = b"\xff\xf9"
+MAX_LINE = 4096
+LINE_TOO_LONG = f"⚠️ Lines are limited to {MAX_LINE} bytes. Goodbye!"
+
+class SessionClosed(Exception):
+    pass
+
+class LineTooLong(SessionClosed):
+    pass
+
+
+class TcpPlayer:
+    __slots__ = ("reader", "writer", "pause_scale")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, pause_scale: float):
+        self.reader = reader
+        self.writer = writer
+        self.pause_scale = pause_scale
+
+    def say(self, text: str) -> None:
+        self.writer.write(text.replace("\n", "\r\n").encode() + b"\r\n")
+
+    async def ask(self, prompt: str) -> str:
+        self.writer.write(prompt.encode() + GO_AHEAD)
+        await self.writer.drain()
+        try:
+            line = await self.reader.readline()
+        except ValueError:  # the line overran the stream limit
+            raise LineTooLong from None
+        if not line:
+            raise SessionClosed
+        return line.decode(errors="replace")
+
+    async def pause(self, seconds: float) -> None:
+        if self.pause_scale:
+            await asyncio.sleep(seconds * self.pause_scale)
+
+
+async def run_steps_async(steps: cli.NodeSteps, player: TcpPlayer) -> cli.GameState:
+    # Awaitable counterpart of cli.run_steps
+    send = steps.send
+    reply = None
+    while True:
+        try:
+            op = send(reply)
+        except StopIteration as done:
+            return done.value
+        reply = None
+        if op[0] is cli.SAY:
+            player.say(op[1])
+        elif op[0] is cli.ASK:
+            reply = await player.ask(op[1])
+        else:
+            await player.pause(op[1])
+
+
+class GameServer:
+    def __init__(self, number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE, pause_scale: float = 1.0):
+        self.number_bounds = number_search.validate_range(*number_bounds)
+        self.pause_scale = pause_scale
+        self.active = 0
+        self.peak = 0
+        self.sessions = 0
+        self.games = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        player = TcpPlayer(reader, writer, self.pause_scale)
+        self.active += 1
+        self.sessions += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            player.say(render_banner('Game Zone', 'slant'))
+            player.say("🎲 Welcome to the Multi-Game Challenge! 🎲")
+            state = cli.initialize_state(self.number_bounds)
+            node = "game_selector"
+            while node in cli.STEPS:
+                state = await run_steps_async(cli.STEPS[node](state), player)
+                if node != "game_selector":
+                    self.games += 1
+                node = cli.router(state)
+            player.say("🎮 Thank you for playing! See you next time!")
+            await writer.drain()
+        except LineTooLong:
+            player.say(LINE_TOO_LONG)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        except (SessionClosed, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8023) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, backlog=4096, limit=MAX_LINE)
+
+    def status(self) -> dict:
+        return {"active": self.active, "peak": self.peak, "sessions": self.sessions, "games": self.games}
+
+
+# -----------------------------
+# Load Generator
+# -----------------------------
+# Each simulated player opens a connection, plays `games` games answering
+# truthfully about a random secret, then picks Exit. Latency is measured from
+# sending an answer to receiving the next prompt, so it includes the server's
+# pacing pauses unless the server runs with --pause-scale 0.
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+_RANGE = re.compile(r"between (-?\d+) and (-?\d+)")
+_NUMBER = re.compile(r"greater than (-?\d+)\?")
+_CATEGORY = re.compile(r"related to '(.*)'\?")
+_GUESS = re.compile(r"Is your word '(.*)'\?")
+
+class LoadStats:
+    def __init__(self):
+        self.latency_ns = array("q")
+        self.games = 0
+        self.sessions = 0
+        self.failed = 0
+        self.connected = 0
+        self.peak = 0
+
+async def _play(host: str, port: int, games: int, think: float, rng: random.Random, stats: LoadStats) -> None:
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+    except OSError:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    stats.peak = max(stats.peak, stats.connected)
+    index = cli.word_index
+    played, secret, sent = 0, None, 0
+    try:
+        while True:
+            try:
+                chunk = await reader.readuntil(GO_AHEAD)
+            except asyncio.IncompleteReadError:
+                break
+            if sent:
+                stats.latency_ns.append(time.perf_counter_ns() - sent)
+            text = _ANSI.sub("", chunk[:-len(GO_AHEAD)].decode(errors="replace"))
+            prompt = text.rsplit("\n", 1)[-1]
+
+            if "Enter your choice" in prompt:
+                if played == games:
+                    answer = "3"
+                else:
+                    played += 1
+                    secret = None if rng.random() < 0.5 else index.pick(index.all_words, rng)
+                    answer = "1" if secret is None else "2"
+            elif (match := _NUMBER.search(prompt)):
+                if not isinstance(secret, int):
+                    secret = rng.randint(*map(int, _RANGE.search(text).groups()))
+                answer = "yes" if secret > int(match[1]) else "no"
+            elif (match := _CATEGORY.search(prompt)):
+                answer = "yes" if index.has_category(secret, match[1]) else "no"
+            elif (match := _GUESS.search(prompt)):
+                answer = "yes" if secret == match[1] else "no"
+            else:
+                answer = ""
+
+            if think:
+                await asyncio.sleep(think * rng.random() * 2)
+            writer.write(answer.encode() + b"\n")
+            sent = time.perf_counter_ns()
+        stats.games += played
+        stats.sessions += 1
+    except ConnectionError:
+        stats.failed += 1
+    finally:
+        stats.connected -= 1
+        writer.close()
+
+async def run_load(host: str, port: int, sessions: int, games: int, think: float = 0.0, seed: int = 0,
+                   server: Optional[GameServer] = None) -> dict:
+    stats = LoadStats()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(_play(host, port, games, think, random.Random(rng.random()), stats) for _ in range(sessions)))
+    seconds = time.perf_counter() - start
+    answers = len(stats.latency_ns)
+    report = {
+        "sessions": stats.sessions,
+        "failed": stats.failed,
+        "peak_connected": stats.peak,
+        "games": stats.games,
+        "seconds": seconds,
+        "games_per_sec": stats.games / seconds if seconds else 0.0,
+        "answers_per_sec": answers / seconds if seconds else 0.0,
+        "latency_ms": {f"p{int(q * 100)}": percentile(stats.latency_ns, q) / 1e6 for q in (0.5, 0.95, 0.99)},
+    }
+    if server is not None:
+        report["server"] = server.status()
+    return report
+
+
+async def _main(args) -> None:
+    if args.command == "serve":
+        server = GameServer((args.low, args.high), args.pause_scale)
+        listener = await server.start(args.host, args.port)
+        print(f"Serving games on {args.host}:{args.port} (telnet {args.host} {args.port})", flush=True)
+        async with listener:
+            while True:
+                await asyncio.sleep(args.report or 3600)
+                if args.report:
+                    print(json.dumps(server.status()), flush=True)
+
+    server = None
+    if args.local:
+        server = GameServer(pause_scale=args.pause_scale)
+        listener = await server.start(args.host, args.port)
+    report = await run_load(args.host, args.port, args.sessions, args.games, args.think, args.seed, server)
+    if server is not None:
+        listener.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the terminal games to many players over TCP, or load-test a server.")
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8023)
+    parser.add_argument("--pause-scale", type=float, default=1.0, help="multiplier for the pacing pauses; 0 disables them")
+    parser.add_argument("--low", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[0])
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1])
+    parser.add_argument("--report", type=float, default=0.0, help="serve: print session counts every N seconds")
+    parser.add_argument("--sessions", type=int, default=1000, help="load: concurrent simulated players")
+    parser.add_argument("--games", type=int, default=3, help="load: games per player")
+    parser.add_argument("--think", type=float, default=0.0, help="load: mean seconds a player waits before answering")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="load: start a server in this process first")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,222 @@
+from typing import TypedDict, Optional, Callable, Any
+from array import array
+from collections import defaultdict
+import argparse
+import json
+import random
+import time
+
+import langraph_CLI as cli
+import number_search
+
+
+# -----------------------------
+# Scripted Players
+# -----------------------------
+# Answer oracles that stand in for input(): the player picks one game from the
+# menu, answers every question truthfully about its secret, then exits.
+class ScriptedPlayer:
+    __slots__ = ("choice", "secret", "questions", "_chosen")
+
+    def __init__(self, game: str, secret: Any):
+        self.choice = "1" if game == "number" else "2"
+        self.secret = secret
+        self.questions = 0
+        self._chosen = False
+
+    def ask(self, prompt: str, kind: str, subject: Any) -> str:
+        if kind == "menu":
+            if self._chosen:
+                return "3"
+            self._chosen = True
+            return self.choice
+        self.questions += 1
+        if kind == "number":
+            return "yes" if self.secret > subject else "no"
+        if kind == "category":
+            return "yes" if cli.word_index.has_category(self.secret, subject) else "no"
+        return "yes" if subject == self.secret else "no"
+
+
+def _quiet(*args, **kwargs) -> None:
+    return None
+
+
+# -----------------------------
+# Reports
+# -----------------------------
+class NodeLatency(TypedDict):
+    calls: int
+    mean_us: float
+    p99_us: float
+
+class SimulationReport(TypedDict):
+    games: int
+    seconds: float
+    games_per_sec: float
+    questions_mean: float
+    questions_p99: int
+    node_latency: dict[str, NodeLatency]
+
+
+def percentile(samples, q: float):
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+# -----------------------------
+# Headless Driver
+# -----------------------------
+class GameSimulator:
+    def __init__(self, use_graph: bool = True, timed: bool = True, number_bounds=number_search.DEFAULT_RANGE):
+        self.number_bounds = number_search.validate_range(*number_bounds)
+        self.player: Optional[ScriptedPlayer] = None
+        self.latency: dict[str, array] = defaultdict(lambda: array("q"))
+        self.io = cli.GameIO(ask=self._ask, say=_quiet, pause=_quiet)
+        wrap = self._timed if timed else None
+
+        # Same nodes either way; use_graph=False steps them with the router
+        # directly, which skips LangGraph's per-step overhead.
+        self.graph = cli.build_game_graph(io=self.io, wrap=wrap) if use_graph else None
+        wrap = wrap or (lambda name, fn: fn)
+        self.nodes = {name: wrap(name, lambda state, node=node: node(state, io=self.io)) for name, node in cli.NODES.items()}
+        self.route = wrap("router", cli.router)
+
+    def _ask(self, prompt: str, kind: str, subject: Any) -> str:
+        return self.player.ask(prompt, kind, subject)
+
+    def _timed(self, name: str, fn: Callable) -> Callable:
+        samples = self.latency[name]
+        clock = time.perf_counter_ns
+
+        def timed(state):
+            start = clock()
+            try:
+                return fn(state)
+            finally:
+                samples.append(clock() - start)
+        return timed
+
+    def play(self, game: str, secret: Any, number_bounds=None) -> int:
+        self.player = ScriptedPlayer(game, secret)
+        state = cli.initialize_state(number_bounds or self.number_bounds)
+        if self.graph is not None:
+            self.graph.invoke(state)
+        else:
+            node = "game_selector"
+            while node != cli.END:
+                state = self.nodes[node](state)
+                node = self.route(state)
+        return self.player.questions
+
+    def run(self, games: int, seed: int = 0, game: str = "mixed") -> SimulationReport:
+        rng = random.Random(seed)
+        low, high = self.number_bounds
+        words = cli.word_index.words
+        questions = array("I")
+
+        start = time.perf_counter()
+        for i in range(games):
+            kind = game if game != "mixed" else ("number", "word")[i & 1]
+            secret = rng.randint(low, high) if kind == "number" else rng.choice(words)
+            questions.append(self.play(kind, secret))
+        seconds = time.perf_counter() - start
+
+        return {
+            "games": games,
+            "seconds": seconds,
+            "games_per_sec": games / seconds if seconds else 0.0,
+            "questions_mean": sum(questions) / games if games else 0.0,
+            "questions_p99": percentile(questions, 0.99),
+            "node_latency": {
+                name: {
+                    "calls": len(samples),
+                    "mean_us": sum(samples) / len(samples) / 1000 if samples else 0.0,
+                    "p99_us": percentile(samples, 0.99) / 1000,
+                }
+                for name, samples in sorted(self.latency.items())
+            },
+        }
+
+
+def simulate(games: int, seed: int = 0, game: str = "mixed", use_graph: bool = True) -> SimulationReport:
+    return GameSimulator(use_graph=use_graph).run(games, seed=seed, game=game)
+
+
+# -----------------------------
+# Batched Word Games
+# -----------------------------
+# Word games in lockstep, without the nodes: each round asks every live game
+# its next question with one MatrixEngine.best_categories call, which makes
+# the question plan's choice from the candidates alone. So the questions per
+# secret must equal the plan's word_depths, at `batch` games per product.
+def batched_word_questions(engine, secrets: list[str], batch: int = 256, latency: Optional[array] = None) -> list[int]:
+    # `latency` collects the ns of each best_categories call
+    index = engine.index
+    questions = [0] * len(secrets)
+    for first in range(0, len(secrets), batch):
+        live = list(range(first, min(first + batch, len(secrets))))
+        masks = {game: index.all_words for game in live}
+        asked: dict[int, list[str]] = {game: [] for game in live}
+        while live:
+            start = time.perf_counter_ns()
+            asking = engine.best_categories([masks[game] for game in live], [asked[game] for game in live])
+            if latency is not None:
+                latency.append(time.perf_counter_ns() - start)
+            playing = []
+            for game, question in zip(live, asking):
+                if question is None:
+                    continue  # ran out of guesses; cannot happen with truthful answers
+                kind, subject = question
+                questions[game] += 1
+                if kind == "category":
+                    asked[game].append(subject)
+                    masks[game] = index.narrow(masks[game], subject, index.has_category(secrets[game], subject))
+                elif subject != secrets[game]:
+                    masks[game] = index.remove(masks[game], subject)
+                else:
+                    continue  # found
+                playing.append(game)
+            live = playing
+    return questions
+
+def simulate_batched(games: int, seed: int = 0, batch: int = 256) -> SimulationReport:
+    from matrix_engine import MatrixEngine
+    engine = cli.catalog.engine or MatrixEngine(cli.word_index)
+    rng = random.Random(seed)
+    secrets = [rng.choice(cli.word_index.words) for _ in range(games)]
+    calls = array("q")
+
+    start = time.perf_counter()
+    questions = batched_word_questions(engine, secrets, batch, calls)
+    seconds = time.perf_counter() - start
+    return {
+        "games": games,
+        "seconds": seconds,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "questions_mean": sum(questions) / games if games else 0.0,
+        "questions_p99": percentile(questions, 0.99),
+        "node_latency": {"best_categories": {
+            "calls": len(calls),
+            "mean_us": sum(calls) / len(calls) / 1000 if calls else 0.0,
+            "p99_us": percentile(calls, 0.99) / 1000,
+        }},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play seeded games headless and report throughput.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--game", choices=["number", "word", "mixed"], default="mixed")
+    parser.add_argument("--direct", action="store_true", help="step the nodes without the compiled graph")
+    parser.add_argument("--batched", type=int, metavar="GAMES", nargs="?", const=256,
+                        help="word games only, this many at a time in lockstep through MatrixEngine.best_categories (needs numpy)")
+    args = parser.parse_args()
+
+    if args.batched:
+        print(json.dumps(simulate_batched(args.games, args.seed, args.batched), indent=2))
+    else:
+        print(json.dumps(simulate(args.games, args.seed, args.game, use_graph=not args.direct), indent=2))
@@ -0,0 +1,336 @@
+from typing import Optional
+from collections import deque
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+# -----------------------------
+# Game Statistics
+# -----------------------------
+# One aggregator per process counts every finished game (mode, whether the
+# answer was found, questions asked, seconds taken) for the web app, the
+# terminal games, the TCP server and the HTTP API. Recording must not slow
+# down a click, so `record` only bumps the counters of its thread's shard
+# (one of SHARDS, each with its own lock, so threads rarely meet) and appends
+# the row to a deque, which is thread safe without a lock. A timer thread
+# drains the deque every GAME_STATS_FLUSH_SECONDS and writes the batch in one
+# go to GAME_STATS_FILE: SQLite for .db / .sqlite / .sqlite3, otherwise
+# JSON lines. Without a file only the counters are kept.
+#
+# `snapshot()` adds up the shards, plus the totals already in the file when
+# the process started, so counts survive restarts.
+#
+# A batch the file refuses (disk full, database locked) goes back to the front
+# of the deque, and the timer retries it with a doubling delay, up to
+# MAX_RETRY_SECONDS. Any other failure is logged and costs only that batch.
+STATS_FILE_ENV = "GAME_STATS_FILE"
+FLUSH_SECONDS_ENV = "GAME_STATS_FLUSH_SECONDS"
+SHARDS = 16
+MAX_RETRY_SECONDS = 60.0
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+TOTALS_SUFFIX = ".totals.json"
+
+GAMES, FOUND, QUESTIONS, QUESTIONS_MAX, TIMED, SECONDS = range(6)
+
+logger = logging.getLogger(__name__)
+
+def _new_counts() -> list:
+    return [0, 0, 0, 0, 0, 0.0]
+
+def _add(counts: list, found: bool, questions: int, seconds: Optional[float]) -> None:
+    counts[GAMES] += 1
+    counts[FOUND] += found
+    counts[QUESTIONS] += questions
+    if questions > counts[QUESTIONS_MAX]:
+        counts[QUESTIONS_MAX] = questions
+    if seconds is not None:
+        counts[TIMED] += 1
+        counts[SECONDS] += seconds
+
+
+class _Shard:
+    __slots__ = ("lock", "counts")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: dict[str, list] = {}
+
+
+# Sinks take batches of rows (time, source, game, found, questions, seconds)
+# and can total up what they already hold.
+#
+# A JSON lines log keeps its running totals in a sidecar (<path>.totals.json)
+# with the byte offset of the log they cover. Each batch adds itself (and any
+# rows other processes appended meanwhile) and rewrites the sidecar, so
+# start-up only reads the rows past that offset instead of the whole log. A
+# log that was replaced or truncated since is counted again from the start.
+class JsonLinesSink:
+    def __init__(self, path):
+        self.path = path
+        self.totals_path = f"{path}{TOTALS_SUFFIX}"
+        self._totals, self._offset = self._load_totals()
+
+    def _load_totals(self) -> tuple[dict[str, list], int]:
+        try:
+            with open(self.totals_path, encoding="utf-8") as handle:
+                saved = json.load(handle)
+            totals = {str(game): list(counts) for game, counts in saved["games"].items()}
+            offset, inode = int(saved["offset"]), saved["inode"]
+            stat = os.stat(self.path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}, 0
+        if stat.st_ino != inode or stat.st_size < offset or any(len(counts) != len(_new_counts()) for counts in totals.values()):
+            return {}, 0
+        return totals, offset
+
+    def _catch_up(self) -> bool:
+        # Counts the complete lines past the offset; a torn last line waits
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        start = self._offset
+        with handle:
+            handle.seek(start)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                try:
+                    row = json.loads(line)
+                    _add(self._totals.setdefault(str(row["game"]), _new_counts()), bool(row["found"]),
+                         int(row["questions"]), row.get("seconds"))
+                except (ValueError, KeyError, TypeError):
+                    continue  # blank or torn line
+        return self._offset != start
+
+    def _save_totals(self) -> None:
+        saved = {"offset": self._offset, "inode": os.stat(self.path).st_ino, "games": self._totals}
+        temp = f"{self.totals_path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as handle:
+            json.dump(saved, handle, separators=(",", ":"))
+        os.replace(temp, self.totals_path)  # readers see the old sidecar or the new one
+
+    def write(self, rows: list[tuple]) -> None:
+        lines = "".join(
+            json.dumps({"t": round(t, 3), "source": source, "game": game, "found": found,
+                        "questions": questions, "seconds": None if seconds is None else round(seconds, 3)}, separators=(",", ":")) + "\n"
+            for t, source, game, found, questions, seconds in rows
+        )
+        # One append per batch, so batches from several processes never interleave
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+        # The batch is in the log now; the sidecar is only a shortcut, and the
+        # next batch (or start-up) catches up from its offset
+        try:
+            self._catch_up()
+            self._save_totals()
+        except OSError as exc:
+            logger.warning("could not update %s: %s", self.totals_path, exc)
+
+    def totals(self) -> dict[str, list]:
+        if self._catch_up():
+            self._save_totals()
+        return {game: list(counts) for game, counts in self._totals.items()}
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSink:
+    def __init__(self, path):
+        # Written by the flush thread and at exit, never at the same time
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS game_stats (t REAL NOT NULL, source TEXT NOT NULL, game TEXT NOT NULL,"
+            " found INTEGER NOT NULL, questions INTEGER NOT NULL, seconds REAL)"
+        )
+
+    def write(self, rows: list[tuple]) -> None:
+        with self.conn:  # one transaction per batch
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT INTO game_stats VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def totals(self) -> dict[str, list]:
+        query = ("SELECT game, COUNT(*), SUM(found), SUM(questions), MAX(questions), COUNT(seconds),"
+                 " COALESCE(SUM(seconds), 0) FROM game_stats GROUP BY game")
+        return {game: list(counts) for game, *counts in self.conn.execute(query)}
+
+    def close(self) -> None:
+        self.conn.close()
+
+def sink_for(path) -> Optional[object]:
+    if not path:
+        return None
+    return SQLiteSink(path) if str(path).endswith(SQLITE_SUFFIXES) else JsonLinesSink(path)
+
+
+class GameStats:
+    def __init__(self, sink=None, flush_seconds: float = 5.0, shards: int = SHARDS):
+        self.sink = sink
+        self.flush_seconds = flush_seconds
+        self._shards = [_Shard() for _ in range(shards)]
+        self._base = sink.totals() if sink is not None else {}
+        self._pending: Optional[deque] = deque() if sink is not None else None
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.flushed = 0
+        self.flushes = 0
+        if sink is not None:
+            threading.Thread(target=self._flush_loop, name="game-stats-flush", daemon=True).start()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "GameStats":
+        return cls(sink_for(os.environ.get(STATS_FILE_ENV)), float(os.environ.get(FLUSH_SECONDS_ENV, 5.0)))
+
+    def record(self, game: str, found: bool, questions: int, seconds: Optional[float] = None, source: str = "") -> None:
+        shard = self._shards[threading.get_native_id() % len(self._shards)]
+        with shard.lock:
+            counts = shard.counts.get(game)
+            if counts is None:
+                counts = shard.counts[game] = _new_counts()
+            _add(counts, found, questions, seconds)
+        pending = self._pending  # close() may set it to None meanwhile
+        if pending is not None:
+            pending.append((time.time(), source, game, bool(found), questions, seconds))
+
+    def snapshot(self) -> dict:
+        totals: dict[str, list] = {game: list(counts) for game, counts in self._base.items()}
+        for shard in self._shards:
+            with shard.lock:
+                items = [(game, list(counts)) for game, counts in shard.counts.items()]
+            for game, counts in items:
+                merged = totals.setdefault(game, _new_counts())
+                for i, value in enumerate(counts):
+                    merged[i] = max(merged[i], value) if i == QUESTIONS_MAX else merged[i] + value
+        games = {
+            game: {
+                "games": c[GAMES],
+                "found": c[FOUND],
+                "found_rate": c[FOUND] / c[GAMES] if c[GAMES] else 0.0,
+                "questions_mean": c[QUESTIONS] / c[GAMES] if c[GAMES] else 0.0,
+                "questions_max": c[QUESTIONS_MAX],
+                "seconds_mean": c[SECONDS] / c[TIMED] if c[TIMED] else None,
+            }
+            for game, c in sorted(totals.items())
+        }
+        return {
+            "games": games,
+            "total_games": sum(c[GAMES] for c in totals.values()),
+            "pending": len(self._pending) if self._pending is not None else 0,
+            "flushed": self.flushed,
+        }
+
+    def flush(self) -> int:
+        # Writes what is pending now; rows recorded meanwhile wait for the next one
+        with self._flush_lock:
+            pending = self._pending
+            if pending is None:
+                return 0
+            rows = [pending.popleft() for _ in range(len(pending))]
+            if rows:
+                try:
+                    self.sink.write(rows)
+                except (OSError, sqlite3.Error):
+                    pending.extendleft(reversed(rows))  # ahead of anything recorded meanwhile
+                    raise
+                self.flushed += len(rows)
+                self.flushes += 1
+        return len(rows)
+
+    def _flush_loop(self) -> None:
+        delay = self.flush_seconds
+        while not self._stop.wait(delay):
+            try:
+                self.flush()
+                delay = self.flush_seconds
+            except (OSError, sqlite3.Error) as exc:
+                delay = min(max(delay, 0.1) * 2, MAX_RETRY_SECONDS)
+                logger.warning("game stats flush failed, retrying in %.1fs: %s", delay, exc)
+            except Exception:
+                delay = self.flush_seconds
+                logger.exception("game stats flush failed; its batch was dropped")
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+        with self._flush_lock:
+            if self.sink is not None:
+                self.sink.close()
+                self.sink, self._pending = None, None
+
+
+_stats: Optional[GameStats] = None
+_stats_lock = threading.Lock()
+
+def get_stats() -> GameStats:
+    # The process-wide aggregator, configured from the environment on first use
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = GameStats.from_env()
+    return _stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Recording throughput: sharded counters with batched flush "
+                                                 "vs a locked write per game.")
+    parser.add_argument("--records", type=int, default=200_000, help="game completions per run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    def hammer(record, threads: int) -> float:
+        # Completions per second with `threads` threads recording at once
+        per_thread = args.records // threads
+
+        def work():
+            for i in range(per_thread):
+                record("number" if i & 1 else "word", i % 7 != 0, 5 + i % 4, 12.5)
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return per_thread * threads / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("stats.jsonl", "stats.db"):
+            path = os.path.join(tmp, name)
+            for threads in args.threads:
+                stats = GameStats(sink_for(path), flush_seconds=1.0)
+                rate = hammer(stats.record, threads)
+                start = time.perf_counter()
+                stats.snapshot()
+                snapshot_us = (time.perf_counter() - start) * 1e6
+                start = time.perf_counter()
+                stats.close()
+                print(f"{name:12s} {threads:2d} threads  batched {rate:10,.0f} games/s"
+                      f"  (snapshot {snapshot_us:5.0f} us, final flush {time.perf_counter() - start:.2f}s,"
+                      f" {stats.flushes} flushes)")
+
+                # Baseline: one locked write per completion
+                sink, lock = sink_for(path), threading.Lock()
+
+                def direct(game, found, questions, seconds):
+                    with lock:
+                        sink.write([(time.time(), "bench", game, found, questions, seconds)])
+                saved, args.records = args.records, max(args.records // 50, threads)
+                print(f"{'':12s} {threads:2d} threads  per-game {hammer(direct, threads):10,.0f} games/s")
+                args.records = saved
+                sink.close()
+            stored = GameStats(sink_for(path))
+            print(f"{name:12s} holds {stored.snapshot()['total_games']:,} games")
+            stored.close()
@@ -1,9 +1,22 @@
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, Optional, Tuple, Literal
-import random
+from langgraph.constants import END  # cheap; langgraph.graph is imported lazily
+from typing import TypedDict, Optional, Tuple, Literal, Callable, Any, NamedTuple, Generator
+from functools import partial
+import argparse
+import importlib
+import json
+import re
+import sys
+import threading
 import time
-from colorama import init, Fore, Style
-from pyfiglet import Figlet
+from colorama import init, deinit, Fore, Style
+from banner import render_banner
+import node_metrics
+from word_catalog import get_catalog
+from question_planner import CATEGORY, FOUND
+from play_history import strategy_from_env
+from game_stats import get_stats
+from tolerant_search import TolerantNumberSearch, TolerantWordSearch, tolerance_from_env
+import number_search
 
 init(autoreset=True)  # Reset colors after each print
 
@@ -16,19 +29,65 @@ class GameState(TypedDict):
     game_mode: Optional[str]
     game_count: int
     message: str
-    guess_range: Tuple[int, int]
+    number_bounds: Tuple[int, int]  # configured range; every game starts from it
+    guess_range: Tuple[int, int]    # interval still possible in the current game
     attempts: int
     asked_categories: list[str]
     possible_words: list[str]
     next_node: Optional[str]
 
-def initialize_state() -> GameState:
+# -----------------------------
+# Player I/O
+# -----------------------------
+# Nodes never call input()/print()/time.sleep() directly. They go through a
+# GameIO bundle so the same graph can run against a terminal or headless
+# against scripted answer oracles. `ask` also receives what is being asked
+# (kind, subject) so an oracle does not have to parse the prompt text:
+#   "menu" (None), "number" (mid), "category" (name), "guess" (word).
+class GameIO(NamedTuple):
+    ask: Callable[[str, str, Any], str]
+    say: Callable[[str], None]
+    pause: Callable[[float], None]
+
+def _console_ask(prompt: str, kind: str, subject: Any) -> str:
+    return input(prompt)
+
+CONSOLE_IO = GameIO(ask=_console_ask, say=print, pause=time.sleep)
+
+# The node bodies are generators that yield their I/O instead of performing
+# it, so one body serves a blocking driver (run_steps, used by the graph)
+# and the asyncio server in game_server.py alike:
+#   yield SAY, text                        show a line
+#   answer = yield ASK, prompt, kind, subject
+#   yield PAUSE, seconds                   pacing delay
+SAY, ASK, PAUSE = "say", "ask", "pause"
+NodeSteps = Generator[tuple, Optional[str], "GameState"]
+
+def run_steps(steps: NodeSteps, io: GameIO) -> "GameState":
+    send, (ask, say, pause) = steps.send, io
+    reply = None
+    while True:
+        try:
+            op = send(reply)
+        except StopIteration as done:
+            return done.value
+        reply = None
+        if op[0] is SAY:
+            say(op[1])
+        elif op[0] is ASK:
+            reply = ask(op[1], op[2], op[3])
+        else:
+            pause(op[1])
+
+def initialize_state(number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE) -> GameState:
+    number_bounds = number_search.validate_range(*number_bounds)
     return {
         "game_choice": None,
         "game_mode": None,
         "game_count": 0,
         "message": "",
-        "guess_range": (1, 50),
+        "number_bounds": number_bounds,
+        "guess_range": number_bounds,
         "attempts": 0,
         "asked_categories": [],
         "possible_words": [],
@@ -38,133 +97,195 @@ def initialize_state() -> GameState:
 # -----------------------------
 # Game Selector Node (Updated)
 # -----------------------------
-def game_selector(state: GameState) -> GameState:
-    print(Fore.GREEN + "\n🎮 " + Style.BRIGHT + "Choose a game:" + Style.RESET_ALL)
-    print(Fore.CYAN + Style.BRIGHT + " 1️⃣  Number Game")
-    print(Fore.CYAN + Style.BRIGHT + " 2️⃣  Word Game")
-    print(Fore.RED + Style.BRIGHT + " 3️⃣  Exit")
-    print()
-    choice = input(Fore.YELLOW + Style.BRIGHT + "👉 Enter your choice (1/2/3): " + Style.RESET_ALL).strip()
+def game_selector_steps(state: GameState) -> NodeSteps:
+    yield SAY, Fore.GREEN + "\n🎮 " + Style.BRIGHT + "Choose a game:" + Style.RESET_ALL
+    yield SAY, Fore.CYAN + Style.BRIGHT + " 1️⃣  Number Game"
+    yield SAY, Fore.CYAN + Style.BRIGHT + " 2️⃣  Word Game"
+    yield SAY, Fore.RED + Style.BRIGHT + " 3️⃣  Exit"
+    yield SAY, ""
+    choice = (yield ASK, Fore.YELLOW + Style.BRIGHT + "👉 Enter your choice (1/2/3): " + Style.RESET_ALL, "menu", None).strip()
 
 
     if choice == "1":
-        print(Fore.LIGHTBLUE_EX + "🔢 Starting Number Game...\n")
+        yield SAY, Fore.LIGHTBLUE_EX + "🔢 Starting Number Game...\n"
         state["game_choice"] = "number_game"
         state["game_mode"] = "number_game"
         state["next_node"] = "number_game"
     elif choice == "2":
-        print(Fore.LIGHTBLUE_EX + "🧠 Starting Word Game...\n")
+        yield SAY, Fore.LIGHTBLUE_EX + "🧠 Starting Word Game...\n"
         state["game_choice"] = "word_game"
         state["game_mode"] = "word_game"
         state["next_node"] = "word_game"
     elif choice == "3":
-        print(Fore.RED + "👋 Exiting the game. Thanks for playing!")
+        yield SAY, Fore.RED + "👋 Exiting the game. Thanks for playing!"
         state["next_node"] = None
     else:
-        print(Fore.RED + "❌ Invalid choice. Try again.")
+        yield SAY, Fore.RED + "❌ Invalid choice. Try again."
         state["next_node"] = "game_selector"
 
-    time.sleep(1)
+    yield PAUSE, 1
     return state
 
 
 # -----------------------------
 # Number Game Node
 # -----------------------------
-def number_game(state: GameState) -> GameState:
-    print(Fore.BLUE + Style.BRIGHT + "\n🔢 Welcome to the Number Game!")
-    print("🤔 Think of a number between " + Fore.YELLOW + "1" + Style.RESET_ALL + " and " + Fore.YELLOW + "50" + Style.RESET_ALL)
+def number_game_steps(state: GameState) -> NodeSteps:
+    yield SAY, Fore.BLUE + Style.BRIGHT + "\n🔢 Welcome to the Number Game!"
+    started = time.monotonic()
     low, high = state["guess_range"]
+    yield SAY, "🤔 Think of a number between " + Fore.YELLOW + str(low) + Style.RESET_ALL + " and " + Fore.YELLOW + str(high) + Style.RESET_ALL
 
-    while low < high:
-        mid = (low + high) // 2
-        user_response = input(Fore.CYAN + f"🧠 Is your number greater than {mid}? (yes/no): ").strip().lower()
-        state["attempts"] += 1
+    if tolerated_errors:
+        low = yield from tolerant_number_steps(state, low, high)
+    else:
+        split = strategy.number_split
+        while low < high:
+            mid = split(low, high)
+            user_response = (yield ASK, Fore.CYAN + f"🧠 Is your number greater than {mid}? (yes/no): ", "number", mid).strip().lower()
+            if user_response not in ("yes", "no"):
+                yield SAY, "Invalid input."
+                continue
+            state["attempts"] += 1
 
-        if user_response == "yes":
-            low = mid + 1
-        elif user_response == "no":
-            high = mid
-        else:
-            print("Invalid input.")
-            continue
+            low, high = (mid + 1, high) if user_response == "yes" else (low, mid)
 
-        if low == high:
-            print(Fore.GREEN + f"🎉 I guessed it! Your number is {low}!")
-            break
-        
-    print(Fore.LIGHTBLUE_EX + "🔄 Loading the next challenge...")
-    time.sleep(1.2)
+    if low is None:
+        yield SAY, Fore.RED + f"😢 More than {tolerated_errors} of those answers were wrong, I couldn't find your number."
+    else:
+        strategy.record("number", low, state["number_bounds"])
+        yield SAY, Fore.GREEN + f"🎉 I guessed it! Your number is {low}!"
+    get_stats().record("number", low is not None, state["attempts"], time.monotonic() - started, "terminal")
+    yield SAY, Fore.LIGHTBLUE_EX + "🔄 Loading the next challenge..."
+    yield PAUSE, 1.2
     
-    state["guess_range"] = (1, 50)
+    state["guess_range"] = state["number_bounds"]
     state["attempts"] = 0
     state["game_count"] += 1
-    state["next_node"] = "game_selector" if state["game_count"] < 5 else "end"
+    state["next_node"] = "game_selector"
     return state
 
 # -----------------------------
 # Word Game Node
 # -----------------------------
-word_categories = {
-    "apple": ["food", "fruit"],
-    "chair": ["furniture", "object"],
-    "elephant": ["animal"],
-    "guitar": ["instrument", "object"],
-    "rocket": ["vehicle", "space"],
-    "pencil": ["stationery", "object"],
-    "pizza": ["food"],
-    "tiger": ["animal"]
-}
-all_categories = sorted({cat for tags in word_categories.values() for cat in tags})
+# Shared with the web app; set GAME_WORD_CATALOG to load a CSV/JSONL/.wcat file
+catalog = get_catalog()
+word_index = catalog.index
+all_categories = catalog.categories
+word_plan = catalog.plan
 
-def word_game(state: GameState) -> GameState:
-    print(Fore.BLUE + Style.BRIGHT + "\n🧠 Welcome to the Word Game!")
-    print(Fore.LIGHTMAGENTA_EX + "Think of one of these words:")
-    print(Fore.YELLOW + ", ".join(word_categories.keys()) + "\n")
-    state["possible_words"] = list(word_categories.keys())
+# What to ask: plain bisection and the catalog's plan, or with
+# GAME_HISTORY_FILE set, prior-weighted ones learned from recorded games
+strategy = strategy_from_env(catalog)
+
+def word_game_steps(state: GameState) -> NodeSteps:
+    yield SAY, Fore.BLUE + Style.BRIGHT + "\n🧠 Welcome to the Word Game!"
+    started = time.monotonic()
+    yield SAY, Fore.LIGHTMAGENTA_EX + "Think of one of these words:"
+    yield SAY, Fore.YELLOW + catalog.word_list_text + "\n"
     state["asked_categories"] = []
     state["attempts"] = 0
 
-    for _ in range(5):
-        remaining = [c for c in all_categories if c not in state["asked_categories"]]
-        if not remaining:
-            break
-        category = random.choice(remaining)
-        state["asked_categories"].append(category)
+    if tolerated_errors:
+        found = yield from tolerant_word_steps(state)
+    else:
+        plan = strategy.plan
+        node = plan.ROOT
+        while node >= 0:
+            kind, subject = plan.question(node)
+            answer = yield from _ask_word(kind, subject)
+            if answer not in ("yes", "no"):
+                yield SAY, "Invalid input."
+                continue
+            state["attempts"] += 1
+
+            if kind == CATEGORY:
+                state["asked_categories"].append(subject)
+            node = plan.advance(node, answer == "yes")
+        # The plan node fixes the candidates, so none are tracked per answer:
+        # the walk ends either on the word or with no candidate left.
+        found = subject if node == FOUND else None
+
+    if found is not None:
+        strategy.record("word", found)
+        yield SAY, Fore.GREEN + f"🎉 I guessed it! Your word is '{found}'!"
+        state["possible_words"] = [found]
+    else:
+        state["possible_words"] = []
+        yield SAY, Fore.RED + "😢 I couldn't guess your word."
+    get_stats().record("word", found is not None, state["attempts"], time.monotonic() - started, "terminal")
+
+    yield SAY, Fore.LIGHTBLUE_EX + "🔄 Loading the next challenge..."
+    yield PAUSE, 1.2
+
+    state["game_count"] += 1
+    state["next_node"] = "game_selector"
+    return state
+
+# -----------------------------
+# Error-Tolerant Questions
+# -----------------------------
+# With GAME_TOLERATED_ERRORS (or --tolerate) set to e > 0, both games keep
+# going through up to e wrong answers per game instead of ending on the wrong
+# number or on "I couldn't guess your word" (see tolerant_search). They return
+# the answer, or None when more than e answers were wrong.
+tolerated_errors = tolerance_from_env()
+
+def _ask_word(kind: str, subject: str) -> NodeSteps:
+    if kind == CATEGORY:
+        answer = yield ASK, Fore.CYAN + f"🧐 Is your word related to '{subject}'? (yes/no): ", kind, subject
+    else:
+        answer = yield ASK, Fore.YELLOW + f"🤔 Is your word '{subject}'? (yes/no): ", kind, subject
+    return answer.strip().lower()
 
-        clue = input(Fore.CYAN + f"🧐 Is your word related to '{category}'? (yes/no): ").strip().lower()
+_SLIP = Fore.LIGHTMAGENTA_EX + "🤨 Those answers don't add up, one of them must be a slip. I'll double-check."
+
+def tolerant_number_steps(state: GameState, low: int, high: int) -> NodeSteps:
+    search = TolerantNumberSearch(low, high, tolerated_errors)
+    warned = False
+    while (mid := search.question()) is not None:
+        user_response = (yield ASK, Fore.CYAN + f"🧠 Is your number greater than {mid}? (yes/no): ", "number", mid).strip().lower()
+        if user_response not in ("yes", "no"):
+            yield SAY, "Invalid input."
+            continue
         state["attempts"] += 1
 
-        if clue == "yes":
-            state["possible_words"] = [
-                word for word in state["possible_words"] if category in word_categories[word]
-            ]
-        elif clue == "no":
-            state["possible_words"] = [
-                word for word in state["possible_words"] if category not in word_categories[word]
-            ]
-        else:
-            print("Invalid input.")
+        search.answer(mid, user_response == "yes")
+        if search.caught_error and not warned:
+            warned = True
+            yield SAY, _SLIP
+    return search.result
+
+def tolerant_word_steps(state: GameState) -> NodeSteps:
+    search = TolerantWordSearch(word_index, tolerated_errors)
+    warned = False
+    while (question := search.question()) is not None:
+        kind, subject = question
+        answer = yield from _ask_word(kind, subject)
+        if answer not in ("yes", "no"):
+            yield SAY, "Invalid input."
             continue
+        state["attempts"] += 1
 
-        if state["possible_words"]:
-            guess = random.choice(state["possible_words"])
-            confirm = input(Fore.YELLOW + f"🤔 Is your word '{guess}'? (yes/no): ").strip().lower()
-            if confirm == "yes":
-                print(Fore.GREEN + f"🎉 I guessed it! Your word is '{guess}'!")
-                break
-            else:
-                state["possible_words"].remove(guess)
+        if kind == CATEGORY:
+            state["asked_categories"].append(subject)
+        search.answer(kind, subject, answer == "yes")
+        if search.caught_error and not warned:
+            warned = True
+            yield SAY, _SLIP
+    return search.found
 
-    if not state["possible_words"]:
-        print(Fore.RED + "😢 I couldn't guess your word.")
+# -----------------------------
+# Graph Nodes (blocking I/O)
+# -----------------------------
+def game_selector(state: GameState, io: GameIO = CONSOLE_IO) -> GameState:
+    return run_steps(game_selector_steps(state), io)
 
-    print(Fore.LIGHTBLUE_EX + "🔄 Loading the next challenge...")
-    time.sleep(1.2)
+def number_game(state: GameState, io: GameIO = CONSOLE_IO) -> GameState:
+    return run_steps(number_game_steps(state), io)
 
-    state["game_count"] += 1
-    state["next_node"] = "game_selector" if state["game_count"] < 5 else "end"
-    return state
+def word_game(state: GameState, io: GameIO = CONSOLE_IO) -> GameState:
+    return run_steps(word_game_steps(state), io)
 
 # -----------------------------
 # LangGraph Setup
@@ -172,33 +293,141 @@ def word_game(state: GameState) -> GameState:
 def router(state: GameState) -> str:
     return state["next_node"] if state["next_node"] else END
 
-def build_game_graph():
+NODES = {
+    "game_selector": game_selector,
+    "number_game": number_game,
+    "word_game": word_game,
+}
+
+STEPS = {
+    "game_selector": game_selector_steps,
+    "number_game": number_game_steps,
+    "word_game": word_game_steps,
+}
+
+def build_game_graph(io: GameIO = CONSOLE_IO, wrap: Optional[Callable[[str, Callable], Callable]] = None, checkpointer=None):
+    # `wrap(name, fn)` lets callers decorate every node and the router
+    # (timing, tracing) without touching the node bodies.
+    from langgraph.graph import StateGraph
+
+    wrap = wrap or (lambda name, fn: fn)
     builder = StateGraph(GameState)
 
-    builder.add_node("game_selector", game_selector)
-    builder.add_node("number_game", number_game)
-    builder.add_node("word_game", word_game)
+    for name, node in NODES.items():
+        builder.add_node(name, wrap(name, partial(node, io=io)))
 
+    route = wrap("router", router)
     builder.set_entry_point("game_selector")
-    builder.add_conditional_edges("game_selector", router)
-    builder.add_conditional_edges("number_game", router)
-    builder.add_conditional_edges("word_game", router)
+    builder.add_conditional_edges("game_selector", route)
+    builder.add_conditional_edges("number_game", route)
+    builder.add_conditional_edges("word_game", route)
 
     #builder.add_edge("end", END)
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
+
+# Sessions last until the player picks Exit, however many games that takes
+RUN_CONFIG = {"recursion_limit": sys.maxsize}
+
+# -----------------------------
+# Scripted Mode
+# -----------------------------
+# `--script FILE` (or - for stdin) reads the answers one per line, skips the
+# pauses and, instead of colored text, writes one JSON line per node step as
+# graph.stream() produces it:
+#   {"step": 1, "node": "game_selector", "say": [...], "ask": [[kind, subject, answer], ...], "state": {...}}
+# The session ends at "3" in the menu, or with an "end" event when the
+# answers run out.
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+class ScriptEnded(Exception):
+    pass
+
+class ScriptIO:
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.said: list[str] = []
+        self.asked: list[list] = []
+        self.io = GameIO(ask=self.ask, say=self.said.append, pause=lambda seconds: None)
+
+    def ask(self, prompt: str, kind: str, subject: Any) -> str:
+        line = next(self.lines, None)
+        if line is None:
+            raise ScriptEnded
+        answer = line.rstrip("\r\n")
+        self.asked.append([kind, subject, answer])
+        return answer
+
+    def drain(self) -> dict:
+        # Output of the step just finished
+        event = {"say": [_ANSI.sub("", text) for text in self.said], "ask": self.asked}
+        self.said.clear()
+        self.asked = []
+        return event
+
+def run_script(lines, number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE, out=None,
+               wrap: Optional[Callable[[str, Callable], Callable]] = None) -> int:
+    script = ScriptIO(lines)
+    graph = build_game_graph(io=script.io, wrap=wrap)
+    write, dumps = (out or sys.stdout).write, json.dumps
+    step = 0
+    try:
+        for update in graph.stream(initialize_state(number_bounds), RUN_CONFIG, stream_mode="updates"):
+            for node, state in update.items():
+                step += 1
+                write(dumps({"step": step, "node": node, **script.drain(), "state": state}, ensure_ascii=False) + "\n")
+    except ScriptEnded:
+        write(dumps({"step": step, "node": None, **script.drain(), "end": "input exhausted"}, ensure_ascii=False) + "\n")
+    return step
 
 # -----------------------------
 # Run the Game
 # -----------------------------
 if __name__ == "__main__":
-    figlet = Figlet(font='slant')
-    print(Fore.CYAN + figlet.renderText('Game Zone'))
+    parser = argparse.ArgumentParser(description="Play the number and word games in the terminal.")
+    parser.add_argument("--low", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[0])
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1],
+                        help="upper bound of the number game, e.g. 100 or 2**64")
+    parser.add_argument("--session", help="save progress under this id and resume it if it exists")
+    parser.add_argument("--db", default="game_sessions.db", help="SQLite file for --session")
+    parser.add_argument("--script", help="read answers from this file (- for stdin) and write JSON lines per node step")
+    parser.add_argument("--tolerate", type=int, default=tolerated_errors,
+                        help="wrong answers each game survives (default $GAME_TOLERATED_ERRORS or 0)")
+    args = parser.parse_args()
+    tolerated_errors = max(0, args.tolerate)
+
+    if args.script:
+        deinit()  # plain stdout, no color translation
+        metrics = node_metrics.configure()
+        handle = sys.stdin if args.script == "-" else open(args.script, encoding="utf-8")
+        with handle:
+            run_script(handle, (args.low, args.high), wrap=metrics.wrap if metrics else None)
+        sys.exit()
+
+    # Warm the LangGraph import (most of our cold start) while the banner and
+    # the welcome pause are on screen.
+    threading.Thread(target=importlib.import_module, args=("langgraph.graph",), daemon=True).start()
+    print(Fore.CYAN + render_banner('Game Zone', 'slant'))
 
     print(Fore.MAGENTA + "🎲 Welcome to the Multi-Game Challenge! 🎲\n")
     time.sleep(1)
 
-    graph = build_game_graph()
-    state = initialize_state()
-    graph.invoke(state)
+    # GAME_METRICS_FILE / GAME_METRICS_PORT time every node, the router and the pauses
+    metrics = node_metrics.configure()
+    io = CONSOLE_IO._replace(pause=metrics.timed("pause", CONSOLE_IO.pause)) if metrics else CONSOLE_IO
+    wrap = metrics.wrap if metrics else None
+
+    if args.session:
+        from sqlite_checkpointer import SQLiteCheckpointer
+        graph = build_game_graph(io=io, wrap=wrap, checkpointer=SQLiteCheckpointer(args.db))
+        config = {**RUN_CONFIG, "configurable": {"thread_id": args.session}}
+        if graph.get_state(config).next:
+            print(Fore.LIGHTBLUE_EX + f"⏩ Resuming session '{args.session}'...")
+            graph.invoke(None, config)
+        else:
+            graph.invoke(initialize_state((args.low, args.high)), config)
+    else:
+        graph = build_game_graph(io=io, wrap=wrap)
+        state = initialize_state((args.low, args.high))
+        graph.invoke(state, RUN_CONFIG)
 
     print(Fore.YELLOW + Style.BRIGHT + "\n🎮 Thank you for playing! See you next time!\n")
@@ -0,0 +1,131 @@
+from typing import Iterable, Optional, Sequence, Tuple
+
+from word_index import WordIndex
+
+# numpy/scipy are optional and imported on first use, so small catalogs
+# (and process start-up) never pay for them.
+np = None
+sparse = None
+
+def _load_numpy() -> bool:
+    global np, sparse
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+        try:
+            from scipy import sparse as scipy_sparse
+            sparse = scipy_sparse
+        except ImportError:
+            pass
+    return True
+
+
+# -----------------------------
+# Incidence Matrix Scoring Engine
+# -----------------------------
+# Optional NumPy backend for large catalogs. `word_categories` is held as a
+# word x category matrix (dense float32, or scipy CSR with sparse_matrix=True), so the
+# yes-counts of every category for the words still alive come out of a single
+# vector-matrix product. The question planner uses it to score its candidates.
+# best_categories makes the planner's choice for many games at once, with
+# candidate sets given as the same int bitmasks WordIndex uses.
+class MatrixEngine:
+    def __init__(self, index: WordIndex, sparse_matrix: bool = False):
+        if not _load_numpy():
+            raise ImportError("MatrixEngine needs numpy: pip install numpy")
+        if sparse_matrix and sparse is None:
+            raise ImportError("sparse_matrix=True needs scipy: pip install scipy")
+
+        self.index = index
+        self.categories = index.categories
+        self.category_ids = {category: i for i, category in enumerate(self.categories)}
+        self._nbytes = (len(index) + 7) // 8
+
+        rows, cols = [], []
+        for word_id, tags in enumerate(index.word_category_ids()):
+            rows.extend([word_id] * len(tags))
+            cols.extend(tags)
+        shape = (len(index), len(self.categories))
+        data = np.ones(len(rows), dtype=np.float32)
+        if sparse_matrix:
+            self.matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape)
+        else:
+            self.matrix = np.zeros(shape, dtype=np.float32)
+            self.matrix[rows, cols] = 1.0
+
+    # -- scoring -----------------------------------------------------------------
+    def category_counts(self, alive: "np.ndarray") -> "np.ndarray":
+        # `alive` is a vector over words: 0/1, or each alive word's weight
+        counts = alive @ self.matrix
+        return np.asarray(counts)
+
+    def weight_vector(self, weights: Sequence[float]) -> "np.ndarray":
+        return np.asarray(weights, dtype=np.float64)
+
+    def counts_for(self, word_ids: Sequence[int], weights: Optional["np.ndarray"] = None) -> dict[int, float]:
+        # Yes-counts per category id for an explicit list of alive word ids,
+        # or with `weights` (a weight_vector) the summed weights of those words.
+        ids = np.asarray(word_ids, dtype=np.intp)
+        if weights is None:
+            alive = np.zeros(len(self.index), dtype=np.float32)
+            alive[ids] = 1.0
+        else:
+            alive = np.zeros(len(self.index), dtype=np.float64)
+            alive[ids] = weights[ids]
+        counts = self.category_counts(alive)
+        cast = int if weights is None else float
+        return {int(i): cast(counts[i]) for i in np.flatnonzero(counts)}
+
+    # -- batched choice --------------------------------------------------------------
+    def rows(self, masks: Sequence[int]) -> "np.ndarray":
+        # Candidate bitmasks as a (games x words) 0/1 matrix
+        packed = np.frombuffer(b"".join(mask.to_bytes(self._nbytes, "little") for mask in masks), dtype=np.uint8)
+        bits = np.unpackbits(packed.reshape(len(masks), self._nbytes), axis=1, bitorder="little")
+        return bits[:, :len(self.index)].astype(np.float32)
+
+    def best_categories(self, masks: Sequence[int],
+                        asked: Sequence[Iterable[str]] = ()) -> list[Optional[Tuple[str, str]]]:
+        # The next question of each game, as the uniform QuestionPlan would ask
+        # it at a node with these candidates: (kind, subject) as in
+        # QuestionPlan.question, or None for a game without candidates. One
+        # product scores every category for every game; a split's entropy only
+        # grows with its smaller side, so just the most balanced categories
+        # are scored by the planner's own _split_entropy, ties and all.
+        from question_planner import CATEGORY, GUESS, _split_entropy
+        if not masks:
+            return []
+        counts = self.category_counts(self.rows(masks))
+        totals = np.array([mask.bit_count() for mask in masks], dtype=np.float32)
+        balance = np.minimum(counts, totals[:, None] - counts)
+        for game, categories in enumerate(asked):
+            balance[game, [self.category_ids[c] for c in categories if c in self.category_ids]] = 0
+        most_balanced = balance.max(axis=1)
+
+        questions = []
+        for game, mask in enumerate(masks):
+            total = mask.bit_count()
+            if not total:
+                questions.append(None)
+                continue
+            best_category, best_gain = None, 0.0
+            if most_balanced[game] > 0:
+                for category_id in np.flatnonzero(balance[game] == most_balanced[game]).tolist():
+                    gain = _split_entropy(int(counts[game, category_id]), total)
+                    if gain > best_gain:
+                        best_category, best_gain = category_id, gain
+            # Otherwise a direct guess at the first candidate, as in the plan
+            if best_category is None or _split_entropy(1, total) >= best_gain:
+                questions.append((GUESS, self.index.words[(mask & -mask).bit_length() - 1]))
+            else:
+                questions.append((CATEGORY, self.categories[best_category]))
+        return questions
+
+
+def matrix_engine_for(index: WordIndex, min_words: int = 4096, sparse_matrix: bool = False) -> Optional[MatrixEngine]:
+    # Only worth it for large catalogs, and only when NumPy is installed.
+    if len(index) < min_words or not _load_numpy():
+        return None
+    return MatrixEngine(index, sparse_matrix=sparse_matrix and sparse is not None)
@@ -0,0 +1,238 @@
+from typing import Callable, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import atexit
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+# -----------------------------
+# Node Latency Metrics
+# -----------------------------
+# Opt-in timing for graph nodes, the router, CLI pauses and Streamlit reruns.
+# Nothing is wrapped unless GAME_METRICS_FILE (Prometheus text file, rewritten
+# every few seconds and at exit) or GAME_METRICS_PORT (http://host:port/metrics)
+# is set, so the disabled path costs nothing.
+#
+# Each name gets a log-linear histogram over nanoseconds: values below 8 ns
+# have their own bucket, above that every power of two is split into 8
+# buckets (<= 12.5% relative error). Recording is a bit_length, a shift and
+# one list increment; quantiles are read off the buckets at export time.
+METRICS_FILE_ENV = "GAME_METRICS_FILE"
+METRICS_PORT_ENV = "GAME_METRICS_PORT"
+
+_SUB_BITS = 3
+_SUB = 1 << _SUB_BITS
+_BUCKETS = 64 << _SUB_BITS  # covers every 64-bit duration
+QUANTILES = (0.5, 0.95, 0.99)
+
+logger = logging.getLogger(__name__)
+
+
+def _bucket(ns: int) -> int:
+    if ns < _SUB:
+        return max(ns, 0)
+    shift = ns.bit_length() - _SUB_BITS - 1
+    return ((shift + 1) << _SUB_BITS) + (ns >> shift) - _SUB
+
+def _bucket_midpoint(bucket: int) -> float:
+    if bucket < _SUB:
+        return float(bucket)
+    shift = (bucket >> _SUB_BITS) - 1
+    low = ((bucket & (_SUB - 1)) + _SUB) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_ns", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self._lock = threading.Lock()
+
+    def record(self, ns: int) -> None:
+        bucket = _bucket(ns)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total_ns += ns
+
+    def record_all(self, samples) -> None:
+        buckets = [_bucket(ns) for ns in samples]
+        with self._lock:
+            counts = self.counts
+            for bucket in buckets:
+                counts[bucket] += 1
+            self.count += len(buckets)
+            self.total_ns += sum(samples)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        # Same buckets everywhere, so histograms from other threads or
+        # processes add up exactly
+        with other._lock:
+            counts, count, total_ns = list(other.counts), other.count, other.total_ns
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.count += count
+            self.total_ns += total_ns
+
+    # Pickled without the lock, to ship from worker processes
+    def __getstate__(self):
+        with self._lock:
+            return list(self.counts), self.count, self.total_ns
+
+    def __setstate__(self, state) -> None:
+        self.counts, self.count, self.total_ns = state
+        self._lock = threading.Lock()
+
+    def quantile(self, q: float) -> float:
+        # Nanoseconds at quantile q (bucket midpoint)
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        target, seen = q * count, 0
+        for bucket, n in enumerate(counts):
+            seen += n
+            if n and seen >= target:
+                return _bucket_midpoint(bucket)
+        return 0.0
+
+
+class NodeMetrics:
+    def __init__(self):
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    # -- instrumentation ------------------------------------------------------
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        # Matches the `wrap(name, fn)` hook of build_game_graph
+        record = self.histogram(name).record
+        clock = time.perf_counter_ns
+
+        def timed(state):
+            start = clock()
+            try:
+                return fn(state)
+            finally:
+                record(clock() - start)
+        return timed
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        record = self.histogram(name).record
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - start)
+        return timed
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter_ns() - start)
+
+    # -- export -------------------------------------------------------------------
+    def render(self) -> str:
+        lines = [
+            "# HELP game_node_seconds Time spent per game graph node, router, pause and rerun.",
+            "# TYPE game_node_seconds summary",
+        ]
+        for name, histogram in sorted(self.histograms.items()):
+            for q in QUANTILES:
+                lines.append(f'game_node_seconds{{node="{name}",quantile="{q}"}} {histogram.quantile(q) / 1e9:.9g}')
+            lines.append(f'game_node_seconds_sum{{node="{name}"}} {histogram.total_ns / 1e9:.9g}')
+            lines.append(f'game_node_seconds_count{{node="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path) -> None:
+        # Write-then-rename so a scraper never reads a partial file
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(self.render())
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="game-metrics-http", daemon=True).start()
+        return server
+
+    def export_every(self, path, interval: float = 5.0) -> None:
+        # A failed write (disk full, directory gone) is logged and the next
+        # one tries again: the thread must outlive it
+        def export():
+            try:
+                self.write(path)
+            except OSError as exc:
+                logger.warning("could not write metrics to %s: %s", path, exc)
+            except Exception:
+                logger.exception("could not write metrics to %s", path)
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                export()
+        threading.Thread(target=loop, name="game-metrics-file", daemon=True).start()
+        atexit.register(export)
+
+
+METRICS = NodeMetrics()
+_exporting = False
+_export_lock = threading.Lock()
+
+def configure() -> Optional[NodeMetrics]:
+    # The shared registry when metrics are switched on by the environment,
+    # else None. Exporters start once per process however often it is called.
+    global _exporting
+    path, port = os.environ.get(METRICS_FILE_ENV), os.environ.get(METRICS_PORT_ENV)
+    if not path and not port:
+        return None
+    with _export_lock:
+        if not _exporting:
+            _exporting = True
+            if path:
+                METRICS.export_every(path)
+            if port:
+                METRICS.serve(int(port))
+    return METRICS
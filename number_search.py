@@ -0,0 +1,115 @@
+from typing import Callable, Optional, Tuple
+import argparse
+import math
+import random
+import time
+
+
+# -----------------------------
+# Number Range Search
+# -----------------------------
+# Exact bisection over arbitrary-size integer ranges. The search state is just
+# the current (low, high) interval: every step is one midpoint and one
+# comparison, and Python ints keep it exact up to 1..2**64 and beyond.
+DEFAULT_RANGE = (1, 50)
+MAX_BOUND = 2 ** 64
+
+def validate_range(low: int, high: int) -> Tuple[int, int]:
+    low, high = int(low), int(high)
+    if low > high:
+        raise ValueError(f"empty range: {low} > {high}")
+    if abs(low) > MAX_BOUND or abs(high) > MAX_BOUND:
+        raise ValueError("range bounds must stay within ±2**64")
+    return low, high
+
+def parse_bound(text: str) -> int:
+    # Accepts plain integers and powers written as "2**64". The text may come
+    # from a form or a request, so a power is sized before it is computed:
+    # nothing past 2**65 is ever built (validate_range rejects it anyway).
+    base, power, exponent = str(text).strip().partition("**")
+    if not power:
+        return int(base)
+    base, exponent = int(base), int(exponent)
+    if exponent < 0:
+        raise ValueError("exponent must not be negative")
+    if abs(base) > 1 and exponent * math.log2(abs(base)) > 65:
+        raise ValueError("range bounds must stay within ±2**64")
+    # As in Python, "-2**64" is -(2**64)
+    return -(abs(base) ** exponent) if base < 0 else base ** exponent
+
+def midpoint(low: int, high: int) -> int:
+    return (low + high) >> 1
+
+def narrow(low: int, high: int, greater: bool) -> Tuple[int, int]:
+    mid = (low + high) >> 1
+    return (mid + 1, high) if greater else (low, mid)
+
+def max_questions(low: int, high: int) -> int:
+    return (high - low).bit_length()
+
+def intro(low: int, high: int) -> str:
+    return f"Think of a number between {low} and {high}."
+
+def question(low: int, high: int, mid: Optional[int] = None) -> str:
+    return f"Is your number greater than {midpoint(low, high) if mid is None else mid}?"
+
+def intervals(low: int, high: int, k: int,
+              split: Callable[[int, int], int] = midpoint) -> list[Tuple[int, int, Tuple[bool, ...]]]:
+    # The leaves of the next k bisection steps, left to right: each interval
+    # with the answers ("greater than mid?") that lead to it. Picking one of
+    # these 2**k intervals is the same as answering those k questions.
+    # `split` picks each mid, as in solve().
+    leaves = [(low, high, ())]
+    for _ in range(k):
+        deeper = []
+        for lo, hi, answers in leaves:
+            if lo == hi:
+                deeper.append((lo, hi, answers))
+                continue
+            mid = split(lo, hi)
+            deeper.append((lo, mid, answers + (False,)))
+            deeper.append((mid + 1, hi, answers + (True,)))
+        leaves = deeper
+    return leaves
+
+
+def solve(bounds: Tuple[int, int], oracle: Callable[[int], bool],
+          split: Optional[Callable[[int, int], int]] = None) -> Tuple[int, int]:
+    # Non-interactive search: `oracle(mid)` answers "is it greater than mid?".
+    # `split(low, high)` picks mid in [low, high) instead of the midpoint (see
+    # play_history for a prior-weighted one). Returns the number found and the questions it took.
+    low, high = bounds
+    questions = 0
+    while low < high:
+        mid = (low + high) >> 1 if split is None else split(low, high)
+        if oracle(mid):
+            low = mid + 1
+        else:
+            high = mid
+        questions += 1
+    return low, questions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test solve() with random secrets.")
+    parser.add_argument("--low", type=parse_bound, default=DEFAULT_RANGE[0])
+    parser.add_argument("--high", type=parse_bound, default=DEFAULT_RANGE[1], help="upper bound, e.g. 50 or 2**64")
+    parser.add_argument("--searches", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bounds = validate_range(args.low, args.high)
+    rng = random.Random(args.seed)
+    secrets = [rng.randint(*bounds) for _ in range(min(args.searches, 65536))]
+
+    start = time.perf_counter()
+    total_questions = 0
+    for i in range(args.searches):
+        secret = secrets[i % len(secrets)]
+        found, questions = solve(bounds, secret.__gt__)
+        total_questions += questions
+    seconds = time.perf_counter() - start
+    assert found == secret
+
+    print(f"{args.searches:,} searches over {bounds[0]}..{bounds[1]} in {seconds:.2f}s "
+          f"({args.searches / seconds:,.0f}/s, {total_questions / args.searches:.2f} questions each)")
@@ -0,0 +1,225 @@
+from typing import Iterator, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
+import os
+import random
+import time
+
+import langraph_CLI as cli
+from game_simulator import GameSimulator, SimulationReport
+from node_metrics import LatencyHistogram
+from play_history import FrequencyPriors, PlayHistory, QuestionStrategy
+from question_planner import QuestionPlan
+import number_search
+
+
+# -----------------------------
+# Shards
+# -----------------------------
+# A shard is a small picklable descriptor; workers expand it themselves so no
+# secret lists cross the process boundary:
+#   ("all", game, start, stop)   secrets start..stop-1 of the game's full domain
+#   ("random", game, seed, count) `count` secrets drawn from Random(seed)
+# The number domain is the simulated bounds, low first.
+Shard = Tuple[str, str, int, int]
+MAX_EXHAUSTIVE = 10_000_000  # secrets per game when --games is 0
+
+def domain_size(game: str, number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE) -> int:
+    if game == "number":
+        low, high = number_bounds
+        return high - low + 1
+    return len(cli.word_index)
+
+def exhaustive_shards(games: Tuple[str, ...] = ("number", "word"), repeat: int = 1, shard_size: int = 1000,
+                      number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE) -> list[Shard]:
+    shards = []
+    for _ in range(repeat):
+        for game in games:
+            size = domain_size(game, number_bounds)
+            shards.extend(("all", game, start, min(start + shard_size, size)) for start in range(0, size, shard_size))
+    return shards
+
+def random_shards(games: int, seed: int = 0, game: str = "mixed", shard_size: int = 1000) -> list[Shard]:
+    kinds = ("number", "word") if game == "mixed" else (game,)
+    shards = []
+    for shard_id, start in enumerate(range(0, games, shard_size)):
+        shards.append(("random", kinds[shard_id % len(kinds)], seed * 1_000_003 + shard_id, min(shard_size, games - start)))
+    return shards
+
+
+# -----------------------------
+# Strategies
+# -----------------------------
+# What the simulated games ask (see play_history):
+#   uniform   plain bisection and the catalog's question plan
+#   prior     the split and plan weighted by the games in --history, fixed
+#             for the whole run (nothing the simulation plays is learned)
+# With a history, random secrets are drawn from its recorded games, so a
+# prior strategy is measured on the traffic it was fitted to.
+STRATEGIES = ("uniform", "prior")
+
+def _strategy(name: str, records: list[dict]) -> QuestionStrategy:
+    if name == "uniform":
+        return QuestionStrategy(cli.word_plan)
+    priors = FrequencyPriors()
+    for record in records:
+        priors.observe(record)
+    strategy = QuestionStrategy(QuestionPlan(cli.word_index, cli.catalog.engine, priors.word_weights(cli.word_index)))
+    strategy.number_split = priors.number_split()
+    return strategy
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+# The graph, the word index and the plan are built once per worker process by
+# the pool initializer and reused for every shard that worker runs.
+_simulator: Optional[GameSimulator] = None
+_recorded: dict[str, list] = {}
+
+def _init_worker(use_graph: bool, number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE,
+                 strategy: str = "uniform", history: Optional[str] = None) -> None:
+    global _simulator
+    _simulator = GameSimulator(use_graph=use_graph, number_bounds=number_bounds)
+    records = list(PlayHistory(history)) if history else []
+    cli.strategy = _strategy(strategy, records)  # also keeps GAME_HISTORY_FILE from being appended to
+    low, high = _simulator.number_bounds
+    _recorded["number"] = [r["secret"] for r in records if r["game"] == "number" and low <= r["secret"] <= high]
+    _recorded["word"] = [r["secret"] for r in records if r["game"] == "word" and r["secret"] in cli.word_index.word_ids]
+
+def _run_shard(shard: Shard) -> dict:
+    kind, game, a, b = shard
+    sim = _simulator
+    low, high = sim.number_bounds
+    words = cli.word_index.words
+    if kind == "all":
+        secrets = (low + i for i in range(a, b)) if game == "number" else (words[i] for i in range(a, b))
+    else:
+        rng = random.Random(a)
+        recorded = _recorded.get(game)
+        if recorded:
+            secrets = (rng.choice(recorded) for _ in range(b))
+        elif game == "number":
+            secrets = (rng.randint(low, high) for _ in range(b))
+        else:
+            secrets = (rng.choice(words) for _ in range(b))
+
+    for samples in sim.latency.values():
+        del samples[:]  # in place: the timed node wrappers hold these arrays
+    questions = Counter()
+    for secret in secrets:
+        questions[sim.play(game, secret)] += 1
+
+    # Ship compact aggregates: per node, node_metrics' log-linear histogram
+    # over nanoseconds (call count and total ns included), which merges
+    # exactly and keeps sub-microsecond nodes apart.
+    latency = {}
+    for name, samples in sim.latency.items():
+        latency[name] = LatencyHistogram()
+        latency[name].record_all(samples)
+    return {"questions": questions, "latency": latency}
+
+
+# -----------------------------
+# Aggregation
+# -----------------------------
+def _histogram_percentile(histogram: Counter, q: float) -> int:
+    total = sum(histogram.values())
+    if not total:
+        return 0
+    target, seen = q * total, 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= target:
+            return value
+    return max(histogram)
+
+class Aggregate:
+    def __init__(self):
+        self.questions: Counter = Counter()
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.started = time.perf_counter()
+
+    @property
+    def games(self) -> int:
+        return sum(self.questions.values())
+
+    def merge(self, result: dict) -> None:
+        self.questions.update(result["questions"])
+        for name, histogram in result["latency"].items():
+            self.latency.setdefault(name, LatencyHistogram()).merge(histogram)
+
+    def report(self) -> SimulationReport:
+        games = self.games
+        seconds = time.perf_counter() - self.started
+        return {
+            "games": games,
+            "seconds": seconds,
+            "games_per_sec": games / seconds if seconds else 0.0,
+            "questions_mean": sum(q * n for q, n in self.questions.items()) / games if games else 0.0,
+            "questions_p99": _histogram_percentile(self.questions, 0.99),
+            "node_latency": {
+                name: {
+                    "calls": histogram.count,
+                    "mean_us": histogram.total_ns / histogram.count / 1000 if histogram.count else 0.0,
+                    "p99_us": histogram.quantile(0.99) / 1000,
+                }
+                for name, histogram in sorted(self.latency.items())
+            },
+        }
+
+
+def run_parallel(shards: list[Shard], workers: Optional[int] = None, use_graph: bool = True,
+                 number_bounds: Tuple[int, int] = number_search.DEFAULT_RANGE, strategy: str = "uniform",
+                 history: Optional[str] = None) -> Iterator[SimulationReport]:
+    # Yields the running totals each time a shard finishes.
+    aggregate = Aggregate()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(use_graph, number_bounds, strategy, history)) as pool:
+        for future in as_completed([pool.submit(_run_shard, shard) for shard in shards]):
+            aggregate.merge(future.result())
+            yield aggregate.report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate games across a process pool.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--games", type=int, default=0, help="random games to play; 0 plays every secret once")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over every secret when --games is 0")
+    parser.add_argument("--game", choices=["number", "word", "mixed"], default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--direct", action="store_true", help="step the nodes without the compiled graph")
+    parser.add_argument("--progress", action="store_true")
+    parser.add_argument("--low", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[0])
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1], help="e.g. 50 or 2**64")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="uniform")
+    parser.add_argument("--history", help="play history (JSON lines) for the prior strategy and the random secrets")
+    parser.add_argument("--compare", action="store_true", help="run every strategy on the same shards")
+    args = parser.parse_args()
+
+    try:
+        bounds = number_search.validate_range(args.low, args.high)
+    except ValueError as exc:
+        parser.error(str(exc))
+    strategies = STRATEGIES if args.compare else (args.strategy,)
+    if "prior" in strategies and not args.history:
+        parser.error("the prior strategy needs --history")
+    games = ("number", "word") if args.game == "mixed" else (args.game,)
+    if args.games:
+        shards = random_shards(args.games, args.seed, args.game, args.shard_size)
+    elif max(domain_size(game, bounds) for game in games) > MAX_EXHAUSTIVE:
+        parser.error(f"more than {MAX_EXHAUSTIVE:,} secrets to play; use --games for a range this large")
+    else:
+        shards = exhaustive_shards(games, args.repeat, args.shard_size, bounds)
+
+    reports = {}
+    for strategy in strategies:
+        report = None
+        for report in run_parallel(shards, args.workers, not args.direct, bounds, strategy, args.history):
+            if args.progress:
+                print(f"{strategy:>8} {report['games']:>12,} games  {report['games_per_sec']:>12,.0f}/s", flush=True)
+        reports[strategy] = report
+    print(json.dumps(reports if args.compare else reports[args.strategy], indent=2))
@@ -0,0 +1,337 @@
+from typing import Any, Iterator, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import random
+import threading
+import time
+
+from question_planner import QuestionPlan
+from word_index import WordIndex
+import number_search
+
+
+# -----------------------------
+# Play History
+# -----------------------------
+# Outcomes of finished games, one JSON object per line:
+#   {"game": "number", "secret": 42, "bounds": [1, 50]}
+#   {"game": "word", "secret": "pizza"}
+# Set GAME_HISTORY_FILE to record them (the terminal games, the TCP server and
+# the web app all append to it) and to let the terminal games learn from them.
+HISTORY_ENV = "GAME_HISTORY_FILE"
+REBUILD_ENV = "GAME_PRIOR_REBUILD"
+
+def _valid(record: Any) -> bool:
+    if not isinstance(record, dict):
+        return False
+    secret = record.get("secret")
+    if record.get("game") == "number":
+        return isinstance(secret, int) and not isinstance(secret, bool)
+    return record.get("game") == "word" and isinstance(secret, str)
+
+
+class PlayHistory:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, game: str, secret, bounds: Optional[Tuple[int, int]] = None) -> dict:
+        record = {"game": game, "secret": secret}
+        if bounds is not None:
+            record["bounds"] = list(bounds)
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        # One write per line in append mode, so lines from several
+        # processes sharing the file never interleave.
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+        return record
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            handle = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # blank or torn line
+                if _valid(record):
+                    yield record
+
+def history_from_env() -> Optional[PlayHistory]:
+    path = os.environ.get(HISTORY_ENV)
+    return PlayHistory(path) if path else None
+
+
+# -----------------------------
+# Smoothed Frequency Priors
+# -----------------------------
+# Additive smoothing: every number and word starts at weight `alpha` and each
+# recorded game adds 1 to its secret, so unseen secrets stay possible and the
+# priors approach the observed frequencies as play accumulates.
+class FrequencyPriors:
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.numbers: Counter = Counter()
+        self.words: Counter = Counter()
+
+    def observe(self, record: dict) -> None:
+        (self.numbers if record["game"] == "number" else self.words)[record["secret"]] += 1
+
+    def copy(self) -> "FrequencyPriors":
+        priors = FrequencyPriors(self.alpha)
+        priors.numbers, priors.words = Counter(self.numbers), Counter(self.words)
+        return priors
+
+    def word_weights(self, index: WordIndex) -> list[float]:
+        return [self.alpha + self.words[word] for word in index.words]
+
+    def number_split(self) -> "NumberSplit":
+        return NumberSplit(self.numbers, self.alpha)
+
+
+# Numbers are asked by threshold ("greater than mid?"), so the question tree
+# must keep them in order and a plain Huffman code does not apply. Each
+# question instead splits the remaining prior mass as evenly as a threshold
+# can (the weight-balanced rule for order-preserving codes, within two
+# questions of the entropy bound). An interval with no recorded secrets is
+# split at the plain midpoint. Lookups are O(log range * log observed).
+class NumberSplit:
+    __slots__ = ("alpha", "values", "prefix")
+
+    def __init__(self, counts: Counter, alpha: float):
+        self.alpha = alpha
+        self.values = sorted(counts)
+        self.prefix = [0]
+        for value in self.values:
+            self.prefix.append(self.prefix[-1] + counts[value])
+
+    def __call__(self, low: int, high: int) -> int:
+        values, prefix, alpha = self.values, self.prefix, self.alpha
+        first, last = bisect_left(values, low), bisect_right(values, high)
+        if first == last:
+            return (low + high) >> 1
+        base = prefix[first]
+        half = (alpha * (high - low + 1) + prefix[last] - base) / 2
+
+        def mass(x: int) -> float:
+            # Prior weight of low..x
+            return alpha * (x - low + 1) + prefix[bisect_right(values, x, first, last)] - base
+
+        # Smallest threshold holding at least half the mass, or the one
+        # before it when that is closer to an even split.
+        lo, hi = low, high - 1
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if mass(mid) >= half:
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo > low and half - mass(lo - 1) < mass(lo) - half:
+            lo -= 1
+        return lo
+
+
+# -----------------------------
+# Question Strategies
+# -----------------------------
+# What the terminal game nodes ask: `number_split(low, high)` picks each
+# threshold and `plan` is the word game's question plan. They call
+# `record(game, secret, bounds)` once per finished game; `join()` waits for
+# whatever that set off in the background.
+class QuestionStrategy:
+    def __init__(self, plan: QuestionPlan):
+        self.plan = plan
+        self.number_split = number_search.midpoint
+
+    def record(self, game: str, secret, bounds: Optional[Tuple[int, int]] = None) -> None:
+        pass
+
+    def join(self) -> None:
+        pass
+
+
+class AdaptiveStrategy(QuestionStrategy):
+    # Starts from everything in `history` and learns from every game it
+    # records. The number split and the prior-weighted plan are rebuilt after
+    # every `rebuild_every` recorded games, each only if its game was played
+    # since. Games in progress keep the plan they started with.
+    #
+    # `record` runs inside the game nodes (and so on the TCP server's event
+    # loop), so there it only counts the game. The history append and the
+    # rebuilds (seconds for a large catalog) run on one worker thread, which
+    # swaps the new split and plan in when they are ready. A rebuild that is
+    # still running is not queued again; the games recorded meanwhile go into
+    # the next one.
+    #
+    # Given a starting `plan` (the catalog's uniform one), the strategy asks
+    # with it and plain bisection at once, and reading `history` and the first
+    # rebuild run on the worker too; otherwise both happen here. `engine` may
+    # be a function returning the engine, so building it waits for the worker.
+    def __init__(self, index: WordIndex, history: Optional[PlayHistory] = None,
+                 alpha: float = 1.0, rebuild_every: Optional[int] = None, engine=None,
+                 plan: Optional[QuestionPlan] = None):
+        self.index = index
+        self.engine = engine  # the catalog's MatrixEngine, if it has one
+        self.history = history
+        self.priors = FrequencyPriors(alpha)
+        self.rebuild_every = rebuild_every or int(os.environ.get(REBUILD_ENV, 25))
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="priors")
+        self._rebuilding = False
+        self._changed: set[str] = set()
+        self._recorded = 0
+        if plan is None:
+            for record in history or ():
+                self.priors.observe(record)
+            self.rebuild(("number", "word"))
+        else:
+            self.plan, self.number_split = plan, number_search.midpoint
+            self._rebuilding = True
+            self._worker.submit(self._load, history)
+
+    def _load(self, history: Optional[PlayHistory]) -> None:
+        # Games recorded meanwhile are already counted, and their history
+        # appends are queued behind this job, so none is read twice
+        loaded = FrequencyPriors(self.priors.alpha)
+        for record in history or ():
+            loaded.observe(record)
+        with self._lock:
+            self.priors.numbers.update(loaded.numbers)
+            self.priors.words.update(loaded.words)
+            priors = self.priors.copy()
+            self._changed, self._recorded = set(), 0
+        self._rebuild(("number", "word"), priors)
+
+    def record(self, game: str, secret, bounds: Optional[Tuple[int, int]] = None) -> None:
+        record = {"game": game, "secret": secret}
+        if bounds is not None:
+            record["bounds"] = list(bounds)
+        with self._lock:
+            self.priors.observe(record)
+            self._changed.add(game)
+            self._recorded += 1
+            due = self._recorded >= self.rebuild_every and not self._rebuilding
+            if due:
+                self._rebuilding = True
+                games, priors = self._changed, self.priors.copy()
+                self._changed, self._recorded = set(), 0
+        if self.history is not None:
+            self._worker.submit(self.history.record, game, secret, bounds)
+        if due:
+            self._worker.submit(self._rebuild, games, priors)
+
+    def rebuild(self, games) -> None:
+        # Synchronous, from the current priors
+        with self._lock:
+            priors = self.priors.copy()
+            self._changed, self._recorded = set(), 0
+        self._rebuild(games, priors)
+
+    def _rebuild(self, games, priors: FrequencyPriors) -> None:
+        start = time.perf_counter()
+        try:
+            if callable(self.engine):
+                self.engine = self.engine()
+            if "number" in games:
+                self.number_split = priors.number_split()
+            if "word" in games:
+                self.plan = QuestionPlan(self.index, self.engine, priors.word_weights(self.index))
+            self.rebuilds += 1
+            self.rebuild_seconds += time.perf_counter() - start
+        finally:
+            self._rebuilding = False
+
+    def join(self) -> None:
+        # One worker runs jobs in order, so this waits for all earlier ones
+        self._worker.submit(int).result()
+
+def strategy_from_env(catalog) -> QuestionStrategy:
+    # Uniform questions unless GAME_HISTORY_FILE is set; then uniform ones
+    # only until the first prior-weighted plan is ready
+    history = history_from_env()
+    if history is None:
+        return QuestionStrategy(catalog.plan)
+    return AdaptiveStrategy(catalog.index, history, engine=lambda: catalog.engine, plan=catalog.plan)
+
+
+# -----------------------------
+# Replay Measurement
+# -----------------------------
+def synthetic_history(games: int, words: list[str], bounds: Tuple[int, int] = number_search.DEFAULT_RANGE,
+                      seed: int = 0) -> list[dict]:
+    # Players who favour a few secrets: Zipf-distributed over a fixed order
+    # that starts with the usual suspects.
+    rng = random.Random(seed)
+    numbers = [n for n in (42, 7, 25, 13, 37, 50, 1, 21, 3, 17) if bounds[0] <= n <= bounds[1]]
+    rest = [n for n in range(bounds[0], min(bounds[1], bounds[0] + 9999) + 1) if n not in numbers]
+    rng.shuffle(rest)
+    numbers += rest
+    words = sorted(words, key=lambda word: (word != "pizza", rng.random()))
+    zipf = lambda n: [1 / (rank + 1) for rank in range(n)]
+    number_weights, word_weights = zipf(len(numbers)), zipf(len(words))
+    history = []
+    for _ in range(games):
+        if rng.random() < 0.5:
+            history.append({"game": "number", "secret": rng.choices(numbers, number_weights)[0], "bounds": list(bounds)})
+        else:
+            history.append({"game": "word", "secret": rng.choices(words, word_weights)[0]})
+    return history
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import langraph_CLI as cli
+    from game_simulator import GameSimulator
+
+    parser = argparse.ArgumentParser(description="Replay a play history through the terminal game nodes, "
+                                                 "with uniform and with prior-weighted questions.")
+    parser.add_argument("--history", default=os.environ.get(HISTORY_ENV), help="JSON-lines history (default $GAME_HISTORY_FILE)")
+    parser.add_argument("--synthetic", type=int, default=4000, help="games of skewed synthetic history when there is no file")
+    parser.add_argument("--alpha", type=float, default=1.0, help="smoothing weight of every number and word")
+    parser.add_argument("--rebuild-every", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.history:
+        records = list(PlayHistory(args.history))
+        source = args.history
+    else:
+        records = synthetic_history(args.synthetic, cli.word_index.words, seed=args.seed)
+        source = "synthetic (Zipf)"
+    records = [r for r in records if r["game"] == "number" or r["secret"] in cli.word_index.word_ids]
+
+    # Each strategy plays the recorded games in order through the real nodes;
+    # the adaptive one only knows the games before the current one.
+    results = {}
+    for name, strategy in (("uniform", QuestionStrategy(cli.word_plan)),
+                           ("adaptive", AdaptiveStrategy(cli.word_index, None, args.alpha, args.rebuild_every, cli.word_plan.engine))):
+        cli.strategy = strategy
+        simulator = GameSimulator(use_graph=False, timed=False)
+        questions = {"number": [], "word": []}
+        start = time.perf_counter()
+        for record in records:
+            bounds = tuple(record.get("bounds") or number_search.DEFAULT_RANGE)
+            questions[record["game"]].append(simulator.play(record["game"], record["secret"], bounds))
+            strategy.join()  # a live server swaps rebuilds in a little later; replays stay deterministic
+        results[name] = (questions, time.perf_counter() - start, strategy)
+
+    print(f"{len(records):,} recorded games from {source}")
+    for game in ("number", "word"):
+        uniform, adaptive = (results[name][0][game] for name in ("uniform", "adaptive"))
+        if not uniform:
+            continue
+        before, after = sum(uniform) / len(uniform), sum(adaptive) / len(adaptive)
+        print(f"{game:6s} {len(uniform):6,} games  uniform {before:.3f} -> adaptive {after:.3f} questions/game"
+              f"  ({(after - before) / before * 100:+.1f}%)")
+    adaptive = results["adaptive"][2]
+    print(f"{adaptive.rebuilds} rebuilds, {adaptive.rebuild_seconds / adaptive.rebuilds * 1e3:.2f} ms each; "
+          f"replay {results['uniform'][1]:.2f}s uniform, {results['adaptive'][1]:.2f}s adaptive")
@@ -0,0 +1,278 @@
+from typing import Optional, Sequence, Tuple
+import hashlib
+import math
+
+from catalog_store import StoredPlan
+from word_index import WordIndex
+from matrix_engine import MatrixEngine, matrix_engine_for
+
+
+# -----------------------------
+# Decision Tree Question Planner
+# -----------------------------
+# The whole word game is planned once per catalog: every node of the tree is
+# either a category question or a direct guess, chosen greedily by information
+# gain over the words still consistent with the answers so far. The tree is
+# stored as flat lists indexed by node id, so a turn is a single list lookup.
+#
+# With `weights` (a prior per word id, e.g. from play_history) every split is
+# scored by probability mass instead of word count, direct guesses go to the
+# likeliest word first, and expected_questions is the prior-weighted mean.
+CATEGORY = "category"
+GUESS = "guess"
+
+FOUND = -1       # "yes" to a guess: the word was found
+EXHAUSTED = -2   # no candidates left: the answers were inconsistent
+
+MATRIX_MIN_WORDS = 1024  # below this, counting tags word by word is cheaper
+
+# Bump whenever _build would pick a different tree for the same catalog, so
+# plans stored in .wcat files (catalog_store) are rebuilt instead of reused.
+PLAN_VERSION = 1
+
+
+def catalog_hash(index: WordIndex) -> str:
+    if index.digest is None:
+        digest = hashlib.sha256()
+        for word, tags in zip(index.words, index.word_category_ids()):
+            digest.update(word.encode())
+            digest.update(b"\x00")
+            digest.update("\x01".join(index.categories[c] for c in tags).encode())
+            digest.update(b"\x02")
+        index.digest = digest.hexdigest()
+    return index.digest
+
+
+def _split_entropy(yes: int, total: int) -> float:
+    if yes <= 0 or yes >= total:
+        return 0.0
+    p = yes / total
+    return -(p * math.log2(p) + (1 - p) * math.log2(1 - p))
+
+
+class QuestionPlan:
+    ROOT = 0
+
+    def __init__(self, index: WordIndex, engine: Optional[MatrixEngine] = None,
+                 weights: Optional[Sequence[float]] = None):
+        self.index = index
+        self.engine = engine
+        self.weights = weights
+        self.kinds: list[str] = []
+        self.subjects: list[str] = []
+        self.yes_child: list[int] = []
+        self.no_child: list[int] = []
+        # Number of questions needed to confirm each word, by word id.
+        self.word_depths: list[int] = [0] * len(index)
+        self._build()
+        self._summarise()
+
+    def _summarise(self):
+        if self.weights:
+            self.expected_questions = sum(d * w for d, w in zip(self.word_depths, self.weights)) / sum(self.weights)
+        else:
+            self.expected_questions = sum(self.word_depths) / len(self.word_depths) if self.word_depths else 0.0
+        self.worst_questions = max(self.word_depths, default=0)
+
+    # -- stored form (catalog_store) -------------------------------------------
+    def stored(self, digest: str, categories: Sequence[str]) -> StoredPlan:
+        # Subjects as ids: category ids into `categories` (the store's order), word ids
+        category_ids = {category: i for i, category in enumerate(categories)}
+        word_ids = self.index.word_ids
+        return StoredPlan(PLAN_VERSION, digest, [int(kind == CATEGORY) for kind in self.kinds],
+                          [category_ids[subject] if kind == CATEGORY else word_ids[subject]
+                           for kind, subject in zip(self.kinds, self.subjects)],
+                          self.yes_child, self.no_child, self.word_depths)
+
+    @classmethod
+    def from_stored(cls, index: WordIndex, stored: StoredPlan, categories: Sequence[str]) -> "QuestionPlan":
+        # The uniform plan of `index`, as saved by stored(); nothing is recomputed
+        plan = cls.__new__(cls)
+        plan.index, plan.engine, plan.weights = index, None, None
+        plan.kinds = [CATEGORY if kind else GUESS for kind in stored.kinds]
+        plan.subjects = [categories[subject] if kind else index.words[subject]
+                         for kind, subject in zip(stored.kinds, stored.subjects)]
+        plan.yes_child = list(stored.yes_child)
+        plan.no_child = list(stored.no_child)
+        plan.word_depths = list(stored.word_depths)
+        plan._summarise()
+        return plan
+
+    def _new_node(self) -> int:
+        self.kinds.append(GUESS)
+        self.subjects.append("")
+        self.yes_child.append(EXHAUSTED)
+        self.no_child.append(EXHAUSTED)
+        return len(self.kinds) - 1
+
+    def _build(self):
+        if not self.index.words:
+            return
+        categories = self.index.categories
+        word_tags = self.index.word_category_ids()
+        weights = self.weights
+        candidates = list(range(len(self.index)))
+        engine_weights = self.engine.weight_vector(weights) if self.engine is not None and weights else None
+        if weights:
+            # Heaviest first; the partitions below keep this order
+            candidates.sort(key=lambda word_id: -weights[word_id])
+
+        # (node id, candidate word ids, categories already asked, questions so far)
+        stack = [(self._new_node(), candidates, frozenset(), 0)]
+        while stack:
+            node, candidates, asked, depth = stack.pop()
+            total = len(candidates) if not weights else sum(weights[w] for w in candidates)
+
+            if self.engine is not None and len(candidates) >= MATRIX_MIN_WORDS:
+                # Large nodes: one vectorised reduction over the alive rows.
+                counts = {c: n for c, n in self.engine.counts_for(candidates, engine_weights).items() if c not in asked}
+            else:
+                counts = {}
+                for word_id in candidates:
+                    weight = weights[word_id] if weights else 1
+                    for category_id in word_tags[word_id]:
+                        if category_id not in asked:
+                            counts[category_id] = counts.get(category_id, 0) + weight
+
+            best_category, best_gain = None, 0.0
+            for category_id in sorted(counts):
+                gain = _split_entropy(counts[category_id], total)
+                if gain > best_gain:
+                    best_category, best_gain = category_id, gain
+
+            if best_category is None:
+                # Nothing left to tell these words apart: guess them in turn.
+                for i, guess in enumerate(candidates):
+                    self.kinds[node] = GUESS
+                    self.subjects[node] = self.index.words[guess]
+                    self.yes_child[node] = FOUND
+                    self.word_depths[guess] = depth + i + 1
+                    if i + 1 < len(candidates):
+                        child = self._new_node()
+                        self.no_child[node] = child
+                        node = child
+                continue
+
+            # A direct guess is itself a yes/no question and ends the game on
+            # "yes", so it wins whenever it is at least as informative.
+            if _split_entropy(weights[candidates[0]] if weights else 1, total) >= best_gain:
+                guess, rest = candidates[0], candidates[1:]
+                self.kinds[node] = GUESS
+                self.subjects[node] = self.index.words[guess]
+                self.yes_child[node] = FOUND
+                self.word_depths[guess] = depth + 1
+                if rest:
+                    child = self._new_node()
+                    self.no_child[node] = child
+                    stack.append((child, rest, asked, depth + 1))
+                continue
+
+            yes_words = [w for w in candidates if best_category in word_tags[w]]
+            no_words = [w for w in candidates if best_category not in word_tags[w]]
+            self.kinds[node] = CATEGORY
+            self.subjects[node] = categories[best_category]
+            asked = asked | {best_category}
+            for answer, words in ((True, yes_words), (False, no_words)):
+                child = self._new_node()
+                if answer:
+                    self.yes_child[node] = child
+                else:
+                    self.no_child[node] = child
+                stack.append((child, words, asked, depth + 1))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def question(self, node: int) -> Tuple[str, str]:
+        return self.kinds[node], self.subjects[node]
+
+    def advance(self, node: int, answer: bool) -> int:
+        return self.yes_child[node] if answer else self.no_child[node]
+
+    def categories_within(self, node: int, depth: int) -> list[str]:
+        # Category questions the next `depth` turns from `node` can ask,
+        # whatever the answers (a guess ends its branch). Answered together,
+        # they walk the plan exactly as asking them one by one would.
+        found, frontier = [], [node]
+        for _ in range(depth):
+            deeper = []
+            for n in frontier:
+                if n >= 0 and self.kinds[n] == CATEGORY:
+                    if self.subjects[n] not in found:
+                        found.append(self.subjects[n])
+                    deeper += (self.yes_child[n], self.no_child[n])
+            frontier = deeper
+        return found
+
+    def walk(self, node: int, answers: dict) -> list[bool]:
+        # Answers along the plan from `node` while its questions are
+        # categories with a known answer in `answers` (category -> bool)
+        path = []
+        while node >= 0 and self.kinds[node] == CATEGORY and self.subjects[node] in answers:
+            path.append(answers[self.subjects[node]])
+            node = self.advance(node, path[-1])
+        return path
+
+
+# -----------------------------
+# Memoised Plans
+# -----------------------------
+_plans: dict[str, QuestionPlan] = {}
+
+def plan_for(index: WordIndex, key: Optional[str] = None, engine: Optional[MatrixEngine] = None) -> QuestionPlan:
+    key = key or catalog_hash(index)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = QuestionPlan(index, engine)
+    return plan
+
+
+# -----------------------------
+# Baseline Comparison
+# -----------------------------
+def heuristic_costs(index: WordIndex) -> Tuple[float, int]:
+    # Questions per word under the play_word_game heuristic: ask the most
+    # balanced category (max of min(yes, no)), then guess, and repeat.
+    depths = []
+    for secret in index.words:
+        candidates, asked, questions = index.all_words, [], 0
+        while candidates:
+            category = index.best_category(candidates, asked)
+            if category and index.count(candidates) > 1:
+                asked.append(category)
+                candidates = index.narrow(candidates, category, index.has_category(secret, category))
+                questions += 1
+            guess = index.nth(candidates, 0)
+            questions += 1
+            if guess == secret:
+                break
+            candidates = index.remove(candidates, guess)
+        depths.append(questions)
+    return (sum(depths) / len(depths) if depths else 0.0), max(depths, default=0)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Compare the planned word game against the greedy heuristic.")
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=60)
+    parser.add_argument("--tags", type=int, default=4, help="categories per word")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [f"category_{i}" for i in range(args.categories)]
+    catalog = {f"word_{i}": rng.sample(names, min(args.tags, len(names))) for i in range(args.words)}
+    index = WordIndex(catalog)
+
+    start = time.perf_counter()
+    plan = plan_for(index, engine=matrix_engine_for(index))
+    build_time = time.perf_counter() - start
+    expected, worst = heuristic_costs(index)
+
+    print(f"catalog   {args.words} words x {args.categories} categories ({len(plan)} plan nodes, built in {build_time:.3f}s)")
+    print(f"planner   expected {plan.expected_questions:.2f} questions, worst {plan.worst_questions}")
+    print(f"heuristic expected {expected:.2f} questions, worst {worst}")
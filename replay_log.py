@@ -0,0 +1,358 @@
+from typing import Callable, Optional, Tuple
+from pathlib import Path
+import atexit
+import hashlib
+import os
+import threading
+import time
+
+import game_nodes
+import number_search
+from question_planner import catalog_hash
+from tolerant_search import TolerantNumberSearch, TolerantWordSearch
+
+
+# -----------------------------
+# Binary Replay Log
+# -----------------------------
+# Every web game is a pure function of its start (mode, bounds) and the
+# answers given, so logging those is enough to re-run any session exactly.
+# A log is a header (b"GLOG", version, sha256 of the catalog) followed by
+# events, each one op byte and a varint session slot:
+#   0 start number game, then zigzag varints low, high
+#   1 start word game
+#   2 / 3 / 4 answer no / yes / back
+#   5 close session (evicted)
+#   6 reset: every open session ends (a new writer took over the file)
+#   7 / 8 start a number / word game that tolerates wrong answers: as 0 / 1,
+#     then a varint of how many
+# Slots are small integers handed out per live session and reused after a
+# close, so an answer costs 2-3 bytes and a reader only holds one state per
+# live session. Set GAME_REPLAY_LOG (may contain {pid}) to log the web app.
+REPLAY_LOG_ENV = "GAME_REPLAY_LOG"
+MAGIC = b"GLOG\x01"
+HEADER_SIZE = len(MAGIC) + 32
+
+START_NUMBER, START_WORD, NO, YES, BACK, CLOSE, RESET, START_NUMBER_TOLERANT, START_WORD_TOLERANT = range(9)
+ANSWER_OPS = {"no": NO, "yes": YES, "back": BACK}
+ANSWERS = {NO: "no", YES: "yes", BACK: "back"}
+FLUSH_SECONDS = 1.0
+
+def _catalog_digest() -> bytes:
+    return bytes.fromhex(catalog_hash(game_nodes.word_index))
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class ReplayLog:
+    def __init__(self, path):
+        self.path = Path(path)
+        digest = _catalog_digest()
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as handle:
+                if handle.read(HEADER_SIZE) != MAGIC + digest:
+                    raise ValueError(f"{self.path} was written for another catalog or format")
+            header = b""
+        else:
+            header = MAGIC + digest
+        self._file = open(self.path, "ab", buffering=1 << 16)
+        self._file.write(header + bytes([RESET]))
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._lock = threading.Lock()
+        self._flushed = time.monotonic()
+        self.events = 0
+        atexit.register(self.close_log)
+
+    @classmethod
+    def from_env(cls) -> Optional["ReplayLog"]:
+        path = os.environ.get(REPLAY_LOG_ENV)
+        return cls(path.replace("{pid}", str(os.getpid()))) if path else None
+
+    def _write(self, event: bytearray) -> None:
+        # Buffered; flushed at most once a second and at exit
+        self._file.write(event)
+        self.events += 1
+        now = time.monotonic()
+        if now - self._flushed >= FLUSH_SECONDS:
+            self._file.flush()
+            self._flushed = now
+
+    def start(self, session_id: str, mode: str, bounds: Tuple[int, int], tolerance: int = 0) -> None:
+        with self._lock:
+            slot = self._slots.get(session_id)
+            if slot is None:
+                slot = self._slots[session_id] = self._free.pop() if self._free else len(self._slots)
+            if tolerance:
+                event = bytearray([START_NUMBER_TOLERANT if mode == "number" else START_WORD_TOLERANT])
+            else:
+                event = bytearray([START_NUMBER if mode == "number" else START_WORD])
+            _put_varint(event, slot)
+            if mode == "number":
+                _put_varint(event, _zigzag(bounds[0]))
+                _put_varint(event, _zigzag(bounds[1]))
+            if tolerance:
+                _put_varint(event, tolerance)
+            self._write(event)
+
+    def answer(self, session_id: str, answer: str) -> None:
+        # Answers to games started before this log was opened are skipped
+        with self._lock:
+            slot = self._slots.get(session_id)
+            if slot is not None:
+                event = bytearray([ANSWER_OPS[answer]])
+                _put_varint(event, slot)
+                self._write(event)
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(session_id, None)
+            if slot is not None:
+                self._free.append(slot)
+                event = bytearray([CLOSE])
+                _put_varint(event, slot)
+                self._write(event)
+
+    def close_log(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+# -----------------------------
+# Fast-Forward Replay
+# -----------------------------
+# Feeds a log through the web graph's nodes (number_game / word_game, one call
+# per answer) without Streamlit or the checkpointer. Every game that ends (by
+# a new start, a close, a reset or the end of the log) goes to `on_game` and
+# into a digest of the final states, so two runs of the same log compare equal
+# exactly when the nodes behaved the same. A writer that crashed may have left
+# its last event half written: replay stops before it, applies only the
+# complete events and reports the bytes it dropped as torn_bytes.
+NODES = {"number": game_nodes.number_game, "word": game_nodes.word_game}
+
+def replay(path, on_game: Optional[Callable[[game_nodes.GameState], None]] = None, nodes: Optional[dict] = None) -> dict:
+    nodes = nodes or NODES
+    number_node, word_node = nodes["number"], nodes["word"]
+    data = Path(path).read_bytes()
+    if bytes(data[:HEADER_SIZE]) != MAGIC + _catalog_digest():
+        raise ValueError(f"{path} is not a replay log for this catalog")
+
+    digest = hashlib.sha256()
+    stats = {"number": [0, 0, 0], "word": [0, 0, 0]}  # games, finished, attempts
+    live: dict[int, game_nodes.GameState] = {}
+    answers = skipped = 0
+
+    def finish(state: game_nodes.GameState) -> None:
+        counters = stats[state["mode"]]
+        counters[0] += 1
+        counters[1] += state["game_over"]
+        counters[2] += state["attempts"]
+        digest.update(f"{state['mode']}|{state['attempts']}|{state['game_over']}|{state['step_output']}\n".encode())
+        if on_game is not None:
+            on_game(state)
+
+    start = time.perf_counter()
+    pos, end = HEADER_SIZE, len(data)
+    torn = 0
+    while pos < end:
+        event = pos
+        op = data[pos]
+        pos += 1
+        if op == RESET:
+            for state in live.values():
+                finish(state)
+            live.clear()
+            continue
+        if op > START_WORD_TOLERANT:
+            raise ValueError(f"bad event {op} at byte {pos - 1}")
+        # Read the whole event before applying any of it
+        try:
+            slot = data[pos]
+            pos += 1
+            if slot > 0x7F:
+                slot, shift = slot & 0x7F, 7
+                while True:
+                    byte = data[pos]
+                    pos += 1
+                    slot |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+            values = []
+            if op not in ANSWERS and op != CLOSE:
+                number, tolerant = op in (START_NUMBER, START_NUMBER_TOLERANT), op >= START_NUMBER_TOLERANT
+                for _ in range(2 * number + tolerant):
+                    value = shift = 0
+                    while True:
+                        byte = data[pos]
+                        pos += 1
+                        value |= (byte & 0x7F) << shift
+                        if byte < 0x80:
+                            break
+                        shift += 7
+                    values.append(value)
+        except IndexError:
+            torn = end - event
+            break
+
+        if NO <= op <= CLOSE:
+            state = live.get(slot)
+            if op == CLOSE:
+                if state is not None:
+                    finish(live.pop(slot))
+            elif state is None:
+                skipped += 1
+            else:
+                answers += 1
+                state["user_input"] = ANSWERS[op]
+                live[slot] = (number_node if state["mode"] == "number" else word_node)(state)
+            continue
+
+        if slot in live:
+            finish(live.pop(slot))
+        tolerance = values.pop() if tolerant else 0
+        if number:
+            bounds = (_unzigzag(values[0]), _unzigzag(values[1]))
+            live[slot] = number_node(game_nodes.initialize_state("number", bounds, tolerance=tolerance))
+        else:
+            live[slot] = word_node(game_nodes.initialize_state("word", tolerance=tolerance))
+    for state in live.values():
+        finish(state)
+    seconds = time.perf_counter() - start
+
+    games = stats["number"][0] + stats["word"][0]
+    return {
+        "bytes": len(data),
+        "torn_bytes": torn,
+        "games": games,
+        "answers": answers,
+        "skipped_answers": skipped,
+        "seconds": seconds,
+        "answers_per_sec": answers / seconds if seconds else 0.0,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "modes": {mode: {"games": g, "finished": f, "attempts_mean": a / g if g else 0.0} for mode, (g, f, a) in stats.items()},
+        "digest": digest.hexdigest(),
+    }
+
+
+# -----------------------------
+# Synthetic Traffic
+# -----------------------------
+# Interleaved sessions answering truthfully about seeded secrets through the
+# writer, with an occasional wrong answer taken back in the word game. With
+# `tolerance` set, every game tolerates that many wrong answers, and the
+# occasional wrong answer is left for the game to catch instead.
+def generate(path, sessions: int, games: int = 3, concurrent: int = 1000,
+             bounds: Tuple[int, int] = number_search.DEFAULT_RANGE, seed: int = 0, tolerance: int = 0) -> int:
+    import random
+    rng = random.Random(seed)
+    plan, index = game_nodes.word_plan, game_nodes.word_index
+    log = ReplayLog(path)
+
+    def tolerant(session_id: str, search, truth):
+        while (question := search.question()) is not None:
+            answer = truth(question) != (rng.random() < 0.05)
+            log.answer(session_id, "yes" if answer else "no")
+            if isinstance(search, TolerantNumberSearch):
+                search.answer(question, answer)
+            else:
+                search.answer(question[0], question[1], answer)
+            yield
+
+    def session(session_id: str):
+        for _ in range(rng.randint(1, 2 * games - 1)):
+            if tolerance:
+                mode = "number" if rng.random() < 0.5 else "word"
+                log.start(session_id, mode, bounds, tolerance)
+                if mode == "number":
+                    secret = rng.randint(*bounds)
+                    yield from tolerant(session_id, TolerantNumberSearch(*bounds, tolerance), lambda t: secret > t)
+                else:
+                    secret = index.pick(index.all_words, rng)
+                    yield from tolerant(session_id, TolerantWordSearch(index, tolerance), lambda question: (
+                        index.has_category(secret, question[1]) if question[0] == "category" else question[1] == secret))
+            elif rng.random() < 0.5:
+                log.start(session_id, "number", bounds)
+                secret, (low, high) = rng.randint(*bounds), bounds
+                while low < high:
+                    greater = secret > (low + high) >> 1
+                    log.answer(session_id, "yes" if greater else "no")
+                    low, high = number_search.narrow(low, high, greater)
+                    yield
+            else:
+                log.start(session_id, "word", bounds)
+                secret, node = index.pick(index.all_words, rng), plan.ROOT
+                while node >= 0:
+                    kind, subject = plan.question(node)
+                    truth = index.has_category(secret, subject) if kind == "category" else subject == secret
+                    if rng.random() < 0.05:
+                        log.answer(session_id, "no" if truth else "yes")
+                        yield
+                        log.answer(session_id, "back")
+                        yield
+                    log.answer(session_id, "yes" if truth else "no")
+                    node = plan.advance(node, truth)
+                    yield
+        log.close(session_id)
+
+    started, running = 0, []
+    while started < sessions or running:
+        while started < sessions and len(running) < concurrent:
+            running.append(session(f"s{started}"))
+            started += 1
+        i = rng.randrange(len(running))
+        try:
+            next(running[i])
+        except StopIteration:
+            running[i] = running[-1]
+            running.pop()
+    log.close_log()
+    return log.events
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Generate synthetic replay logs, or fast-forward a log through the game nodes.")
+    parser.add_argument("command", choices=["generate", "replay"])
+    parser.add_argument("path", help="replay log file")
+    parser.add_argument("--sessions", type=int, default=100_000, help="generate: sessions to write")
+    parser.add_argument("--games", type=int, default=3, help="generate: mean games per session")
+    parser.add_argument("--concurrent", type=int, default=1000, help="generate: sessions interleaved at once")
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=int, default=0, help="generate: wrong answers each game tolerates")
+    parser.add_argument("--export-history", help="replay: append finished games to this play history (see play_history)")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        start = time.perf_counter()
+        events = generate(args.path, args.sessions, args.games, args.concurrent, (1, args.high), args.seed, args.tolerance)
+        size = os.path.getsize(args.path)
+        print(f"{events:,} events, {size:,} bytes ({size / events:.2f} per event) in {time.perf_counter() - start:.1f}s")
+    else:
+        on_game = None
+        if args.export_history:
+            from play_history import PlayHistory
+            history = PlayHistory(args.export_history)
+
+            def on_game(state):
+                if not (state["game_over"] and game_nodes.answer_found(state)):
+                    return
+                if state["mode"] == "number":
+                    history.record("number", state["number_range"][0], state["number_bounds"])
+                else:
+                    history.record("word", state["current_guess"])
+        print(json.dumps(replay(args.path, on_game), indent=2))
@@ -0,0 +1,148 @@
+from typing import Callable, Optional, Tuple
+from collections import OrderedDict
+import os
+import threading
+import time
+
+import number_search
+
+
+# -----------------------------
+# Session Registry
+# -----------------------------
+# Every open tab of the web app holds one GameSession: the menu settings
+# between games, in fixed slots. The game itself lives in the checkpointer,
+# one latest-only record per session. The registry is shared by the whole
+# process and kept in LRU order: each rerun moves its session to the back,
+# and sessions at the front are evicted once they have been idle longer than
+# `idle_seconds` or once there are more than `max_sessions`, calling
+# `on_evict(session_id)` so the checkpointer can drop that session's record.
+# Eviction looks only at the front, so it costs O(1) amortised per access.
+MAX_SESSIONS_ENV = "GAME_MAX_SESSIONS"
+IDLE_SECONDS_ENV = "GAME_SESSION_IDLE_SECONDS"
+
+class GameSession:
+    __slots__ = ("session_id", "mode", "number_range", "games_played", "answers_per_click",
+                 "tolerance", "game_started", "game_counted", "last_seen")
+
+    def __init__(self, session_id: str, mode: Optional[str] = None,
+                 number_range: Tuple[int, int] = number_search.DEFAULT_RANGE, games_played: int = 0):
+        self.session_id = session_id
+        self.mode = mode
+        self.number_range = number_range
+        self.games_played = games_played
+        self.answers_per_click = 1  # k of the k-way mode; 1 asks one question per click
+        self.tolerance = 0  # wrong answers a new game survives (tolerant_search)
+        self.game_started: Optional[float] = None  # monotonic; unknown for a game resumed from a checkpoint
+        self.game_counted = False  # the current game's end went into games_played and the stats
+        self.last_seen = time.monotonic()
+
+
+class SessionRegistry:
+    def __init__(self, max_sessions: Optional[int] = None, idle_seconds: Optional[float] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.max_sessions = max_sessions or int(os.environ.get(MAX_SESSIONS_ENV, 10_000))
+        self.idle_seconds = idle_seconds or float(os.environ.get(IDLE_SECONDS_ENV, 1800))
+        self.on_evict = on_evict
+        self.evicted = 0
+        self._sessions: OrderedDict[str, GameSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str, create: Callable[[], GameSession]) -> GameSession:
+        # The live session, touched; `create()` builds it on first use or
+        # after it was evicted.
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_seen = now
+        if session is None:
+            session = create()  # may read a checkpoint; keep it outside the lock
+            with self._lock:
+                session = self._sessions.setdefault(session_id, session)
+                session.last_seen = now
+        self._evict(now)
+        return session
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            dropped = self._sessions.pop(session_id, None)
+        if dropped is not None and self.on_evict:
+            self.on_evict(session_id)
+
+    def _evict(self, now: float) -> None:
+        expired = []
+        with self._lock:
+            sessions = self._sessions
+            while sessions:
+                session_id, oldest = next(iter(sessions.items()))
+                if len(sessions) <= self.max_sessions and now - oldest.last_seen < self.idle_seconds:
+                    break
+                sessions.popitem(last=False)
+                expired.append(session_id)
+            self.evicted += len(expired)
+        if self.on_evict:
+            for session_id in expired:
+                self.on_evict(session_id)
+
+    def stats(self) -> dict:
+        return {"live": len(self._sessions), "evicted": self.evicted, "max_sessions": self.max_sessions}
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+if __name__ == "__main__":
+    import argparse
+    import subprocess
+    import sys
+
+    parser = argparse.ArgumentParser(description="Memory held by many web sessions, unbounded vs registry-bounded (Linux).")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--answers", type=int, default=5, help="answers per session")
+    parser.add_argument("--max-sessions", type=int, default=1000)
+    parser.add_argument("--run", choices=["unbounded", "bounded"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is None:
+        # One fresh interpreter per configuration, so RSS growth is comparable
+        for run in ("unbounded", "bounded"):
+            subprocess.run([sys.executable, __file__, "--run", run, "--sessions", str(args.sessions),
+                            "--answers", str(args.answers), "--max-sessions", str(args.max_sessions)], check=True)
+        sys.exit()
+
+    import game_nodes
+    if args.run == "unbounded":
+        from langgraph.checkpoint.memory import MemorySaver
+        checkpointer, registry = MemorySaver(), None
+    else:
+        from sqlite_checkpointer import SQLiteCheckpointer
+        checkpointer = SQLiteCheckpointer(":memory:")
+        registry = SessionRegistry(args.max_sessions, on_evict=checkpointer.delete_thread)
+    graph = game_nodes.build_game_graph(checkpointer=checkpointer)
+    graph.invoke(game_nodes.initialize_state("number"), {"configurable": {"thread_id": "warm-up"}})
+
+    before = _rss_mb()
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        session_id = f"tab-{i}"
+        config = {"configurable": {"thread_id": session_id}}
+        if registry is not None:
+            registry.get(session_id, lambda: GameSession(session_id, "number"))
+        graph.invoke(game_nodes.initialize_state("number", (1, 2 ** 20)), config)
+        for _ in range(args.answers):
+            graph.invoke({"user_input": "yes"}, config)
+    seconds = time.perf_counter() - start
+    label = "MemorySaver, every checkpoint kept" if registry is None else f"registry (max {args.max_sessions:,}), latest only"
+    print(f"{label:40s} +{_rss_mb() - before:7.1f} MB RSS for {args.sessions:,} sessions x {args.answers} answers"
+          f"  ({seconds / (args.sessions * (args.answers + 1)) * 1e6:.0f} us/step)"
+          + (f"  {registry.stats()}" if registry else ""))
@@ -0,0 +1,243 @@
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+import atexit
+import sqlite3
+import threading
+import time
+import zlib
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+# -----------------------------
+# SQLite Checkpointer
+# -----------------------------
+# Durable LangGraph checkpointer for game sessions. Only the latest checkpoint
+# of each thread is kept (a game never needs its history to resume), as one
+# compact record: the serializer's msgpack bytes, zlib-compressed when that
+# pays off. put() only encodes the record and parks it in memory; a background
+# thread commits everything parked in one transaction every `flush_interval`
+# seconds, or sooner once `flush_steps` records are waiting (group commit).
+# Reads check the parked records first and fall back to SQLite, so any worker
+# sharing the database file can pick a session up once it has been flushed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns)
+) WITHOUT ROWID
+"""
+
+_COMPRESS_MIN_BYTES = 256
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver):
+    def __init__(self, path: str = "game_sessions.db", flush_interval: float = 0.05, flush_steps: int = 64, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_steps = flush_steps
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+        # (thread_id, checkpoint_ns) -> row waiting for the next group commit
+        self._pending: dict[tuple[str, str], tuple] = {}
+        # (thread_id, checkpoint_ns, checkpoint_id) -> pending task writes; these
+        # only matter inside a running step, so they stay in memory.
+        self._writes: dict[tuple[str, str, str], list] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-checkpointer", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # -- record format ----------------------------------------------------------
+    def _encode(self, checkpoint: Checkpoint, metadata: CheckpointMetadata) -> tuple[str, bytes]:
+        kind, payload = self.serde.dumps_typed({"checkpoint": checkpoint, "metadata": metadata})
+        if len(payload) >= _COMPRESS_MIN_BYTES:
+            packed = zlib.compress(payload, 1)
+            if len(packed) < len(payload):
+                return "z:" + kind, packed
+        return kind, payload
+
+    def _decode(self, kind: str, data: bytes) -> dict:
+        if kind.startswith("z:"):
+            kind, data = kind[2:], zlib.decompress(data)
+        return self.serde.loads_typed((kind, data))
+
+    # -- group commit -------------------------------------------------------------
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # e.g. another worker holds the file locked; the batch waits for the next try
+
+    def flush(self) -> int:
+        # The swap happens under _db_lock, so delete_thread (which takes it
+        # first) never interleaves with a batch in flight. A failed commit is
+        # rolled back and its rows parked again, unless put() has parked a
+        # newer one for the same thread meanwhile.
+        with self._db_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)", list(batch.values())
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                with self._lock:
+                    for key, row in batch.items():
+                        self._pending.setdefault(key, row)
+                raise
+        return len(batch)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=1)
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._conn.close()
+
+    # -- reads ----------------------------------------------------------------------
+    def _row(self, thread_id: str, checkpoint_ns: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._pending.get((thread_id, checkpoint_ns))
+        if row is not None:
+            return row
+        with self._db_lock:
+            # A batch that was in flight may have failed and been parked again
+            with self._lock:
+                row = self._pending.get((thread_id, checkpoint_ns))
+            if row is not None:
+                return row
+            return self._conn.execute(
+                "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)
+            ).fetchone()
+
+    def _tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, kind, data, _ = row
+        record = self._decode(kind, data)
+        writes = self._writes.get((thread_id, checkpoint_ns, checkpoint_id), [])
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=record["checkpoint"],
+            metadata=record["metadata"],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, value) for task_id, channel, value in writes],
+        )
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        row = self._row(configurable["thread_id"], configurable.get("checkpoint_ns", ""))
+        if row is None:
+            return None
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id and checkpoint_id != row[2]:
+            return None  # only the latest checkpoint is kept
+        return self._tuple(row)
+
+    def list(self, config, *, filter: Optional[dict[str, Any]] = None, before=None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        if config is not None:
+            found = self.get_tuple({"configurable": {k: v for k, v in config["configurable"].items() if k != "checkpoint_id"}})
+            candidates = [found] if found else []
+        else:
+            self.flush()
+            with self._db_lock:
+                rows = self._conn.execute("SELECT * FROM checkpoints ORDER BY updated_at DESC").fetchall()
+            candidates = [self._tuple(row) for row in rows]
+        if before is not None:
+            before_id = get_checkpoint_id(before)
+            candidates = [t for t in candidates if t.config["configurable"]["checkpoint_id"] < before_id]
+        if filter:
+            candidates = [t for t in candidates if all(t.metadata.get(k) == v for k, v in filter.items())]
+        yield from candidates[:limit] if limit else candidates
+
+    # -- writes -----------------------------------------------------------------------
+    def put(self, config, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        kind, data = self._encode(checkpoint, get_checkpoint_metadata(config, metadata))
+        row = (thread_id, checkpoint_ns, checkpoint["id"], parent_id, kind, data, time.time())
+
+        with self._lock:
+            self._pending[(thread_id, checkpoint_ns)] = row
+            self._writes.pop((thread_id, checkpoint_ns, parent_id), None)
+            waiting = len(self._pending)
+        if waiting >= self.flush_steps:
+            self._wake.set()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        with self._lock:
+            self._writes.setdefault(key, []).extend((task_id, channel, value) for channel, value in writes)
+
+    def delete_thread(self, thread_id: str) -> None:
+        # _db_lock first: a flush in flight finishes (or parks its batch
+        # again) before the thread's rows go, so it cannot bring them back
+        with self._db_lock:
+            with self._lock:
+                for key in [k for k in self._pending if k[0] == thread_id]:
+                    del self._pending[key]
+                for key in [k for k in self._writes if k[0] == thread_id]:
+                    del self._writes[key]
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+
+    # -- resume ---------------------------------------------------------------------------
+    def resume(self, thread_id: str, checkpoint_ns: str = "") -> Optional[dict[str, Any]]:
+        # Latest saved state values for a session, from any worker.
+        found = self.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}})
+        return found.checkpoint["channel_values"] if found else None
+
+    # -- async (SQLite calls here are short; run them inline) -------------------------------
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
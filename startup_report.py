@@ -0,0 +1,148 @@
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+# -----------------------------
+# Startup-Time Report
+# -----------------------------
+# Measures both entry points against a budget:
+#   cli_cold_start  fresh interpreter: import langraph_CLI and compile its graph
+#   web_cold_start  fresh interpreter: first Streamlit run of Langgraph_Updated.py
+#   web_rerun       mean time of further reruns in the same process, once the
+#                   app's background warm-up (see web_app.warm_up) is done
+# Cold imports are broken down with `python -X importtime`. Save a run with
+# --json and pass it back with --baseline to print before/after deltas.
+#
+# Most of a cold start is langgraph and Streamlit importing themselves, which
+# depends on the machine and the library versions more than on this code.
+# So every metric is also measured for a calibration run that does just that
+# (import langgraph.graph; a two-element Streamlit script), in the same
+# environment and right next to it, and the budget is what the games may add
+# on top. Cold starts take the fastest of --repeat runs, as noise only adds.
+ROOT = Path(__file__).resolve().parent
+
+BUDGETS_MS = {  # over the calibration run
+    "cli_cold_start": 250.0,
+    "web_cold_start": 250.0,
+    "web_rerun": 15.0,
+}
+
+_CLI_SNIPPET = "import langraph_CLI as cli; cli.build_game_graph()"
+_CLI_CALIBRATION = "import langgraph.graph"
+
+_WEB_APP = 'AppTest.from_file("Langgraph_Updated.py", default_timeout=60)'
+_WEB_CALIBRATION = 'AppTest.from_string("import streamlit as st\\nst.title(\'Game\')\\nst.button(\'Start\')")'
+
+_WEB_SNIPPET = """
+import threading
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = APP.run()
+cold = time.perf_counter() - start
+for thread in threading.enumerate():
+    if thread.name == "warm-up":
+        thread.join()
+reruns = []
+for _ in range(RERUNS):
+    start = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - start)
+print(cold * 1000, sum(reruns) / len(reruns) * 1000)
+"""
+
+
+def _importtime(snippet: str) -> tuple[float, list[tuple[str, float]]]:
+    # Wall time of a fresh interpreter running `snippet`, plus the heaviest
+    # first- and second-level imports reported by -X importtime (cumulative ms).
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", snippet],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    imports = []
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip(" ")) + 1) // 2
+        if depth <= 2:  # the snippet's own imports and what they import directly
+            imports.append((name.strip(), int(cumulative) / 1000))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return wall_ms, imports
+
+
+def _web(app: str, reruns: int) -> tuple[float, float]:
+    snippet = _WEB_SNIPPET.replace("APP", app).replace("RERUNS", str(reruns))
+    done = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, capture_output=True, text=True, check=True)
+    cold_ms, rerun_ms = map(float, done.stdout.split()[-2:])
+    return cold_ms, rerun_ms
+
+
+def measure(reruns: int = 20, repeat: int = 3) -> dict:
+    # Each repetition measures the calibration and the app back to back
+    cli, cli_floor, web, web_floor = [], [], [], []
+    for _ in range(repeat):
+        cli_floor.append(_importtime(_CLI_CALIBRATION)[0])
+        cli_ms, cli_imports = _importtime(_CLI_SNIPPET)
+        cli.append(cli_ms)
+        web_floor.append(_web(_WEB_CALIBRATION, reruns))
+        web.append(_web(_WEB_APP, reruns))
+    _, web_imports = _importtime("import web_app")
+
+    return {
+        "cli_cold_start": min(cli),
+        "web_cold_start": min(cold for cold, _ in web),
+        "web_rerun": min(rerun for _, rerun in web),
+        "calibration": {
+            "cli_cold_start": min(cli_floor),
+            "web_cold_start": min(cold for cold, _ in web_floor),
+            "web_rerun": min(rerun for _, rerun in web_floor),
+        },
+        "cli_imports": dict(cli_imports[:10]),
+        "web_imports": dict(web_imports[:10]),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report start-up and rerun cost of both entry points.")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts: keep the fastest of this many")
+    parser.add_argument("--json", type=Path, help="write the measurements to this file")
+    parser.add_argument("--baseline", type=Path, help="earlier --json output to compare against")
+    args = parser.parse_args(argv)
+
+    report = measure(args.reruns, args.repeat)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+
+    over_budget = False
+    for metric, allowance in BUDGETS_MS.items():
+        value, floor = report[metric], report["calibration"][metric]
+        budget = floor + allowance
+        line = f"{metric:15s} {value:9.1f} ms  (budget {budget:.0f} ms = calibration {floor:.0f} + {allowance:.0f})"
+        if metric in baseline:
+            line += f"  before {baseline[metric]:9.1f} ms  ({value - baseline[metric]:+.1f})"
+        if value > budget:
+            line += "  OVER BUDGET"
+            over_budget = True
+        print(line)
+
+    for section in ("cli_imports", "web_imports"):
+        print(f"\n{section} (cumulative ms, -X importtime)")
+        for name, ms in report[section].items():
+            before = baseline.get(section, {}).get(name)
+            print(f"  {name:30s} {ms:9.1f}" + (f"  before {before:9.1f}" if before is not None else ""))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
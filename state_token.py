@@ -0,0 +1,229 @@
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import os
+
+import game_nodes
+import number_search
+from question_planner import catalog_hash
+
+
+# -----------------------------
+# Signed Game-State Tokens
+# -----------------------------
+# Every field of the web app's GameState is a function of a few inputs: the
+# mode, the configured bounds, games_played, whether the game has started,
+# the tolerated errors and the player's yes/no answers. A token carries just
+# those, as
+#   flags (mode, started, tolerant) | varint games_played |
+#   [varint tolerance] | zigzag varints low, high | varint answer count |
+#   answer bits
+# followed by a truncated HMAC-SHA256, in URL-safe base64 (about 22 chars for
+# a 1..50 number game). Decoding replays the answers through the real graph
+# nodes, so decode(encode(state)) == state by construction; a tolerant game
+# picks up the search game_nodes cached when the token was issued, so that
+# costs microseconds too unless the game is new to this process. The catalog hash
+# is part of the MAC input: a token only verifies against the catalog (and so
+# the question plan) it was made with.
+#
+# Set GAME_TOKEN_KEY on every replica that must accept the same tokens;
+# without it each process signs with its own random key.
+TOKEN_KEY_ENV = "GAME_TOKEN_KEY"
+MAC_BYTES = 10
+MODES = (None, "number", "word", "exit")
+_STARTED = 4
+_TOLERANT = 8
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _get_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise InvalidToken("truncated token")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class StateCodec:
+    def __init__(self, key: Optional[bytes] = None):
+        env_key = os.environ.get(TOKEN_KEY_ENV)
+        self.key = key or (env_key.encode() if env_key else os.urandom(32))
+        self.plan = game_nodes.word_plan
+        self._catalog = bytes.fromhex(catalog_hash(game_nodes.word_index))
+
+    def _mac(self, payload: bytes) -> bytes:
+        return hmac.new(self.key, self._catalog + payload, hashlib.sha256).digest()[:MAC_BYTES]
+
+    # -- answers <-> state --------------------------------------------------------
+    def _answers(self, state: game_nodes.GameState) -> list[bool]:
+        if state.get("plan_id"):
+            raise ValueError("only games on the uniform plan have tokens")
+        if state["tolerance"]:
+            return list(state["tolerant_answers"])
+        if state["mode"] == "number":
+            # Bisection is a tree of nested intervals, so the interval reached
+            # after `attempts` answers pins down every answer.
+            low, high = state["number_bounds"]
+            target = tuple(state["number_range"])
+            answers = []
+            for _ in range(state["attempts"]):
+                greater = target[0] > (low + high) >> 1
+                answers.append(greater)
+                low, high = number_search.narrow(low, high, greater)
+            if (low, high) != target:
+                raise ValueError("number_range is not reachable from number_bounds")
+            return answers
+        if state["mode"] == "word":
+            path = state["answer_log"] + [state["plan_node"]]
+            return [self.plan.yes_child[node] == child for node, child in zip(path, path[1:])]
+        return []
+
+    def _replay(self, mode, bounds, games_played: int, started: bool, answers: list[bool],
+                tolerance: int = 0) -> game_nodes.GameState:
+        state = game_nodes.initialize_state(mode, bounds, games_played, tolerance)
+        if not started:
+            return state
+        if mode == "number" and answers and not tolerance:
+            # Same effect as one number_game call per answer, minus the
+            # discarded question texts: narrow all but the last answer, then
+            # let the node apply the last one.
+            low, high = bounds
+            for greater in answers[:-1]:
+                low, high = number_search.narrow(low, high, greater)
+            state["number_range"] = (low, high)
+            state["attempts"] = len(answers) - 1
+            state["user_input"] = "yes" if answers[-1] else "no"
+            return game_nodes.number_game(state)
+        node = game_nodes.number_game if mode == "number" else game_nodes.word_game if mode == "word" else None
+        if node is None:
+            return state
+        if tolerance and answers:
+            # A tolerant node rebuilds the game from all its answers anyway:
+            # step to the state before the last one, then apply that.
+            state["tolerant_answers"] = answers[:-1]
+            state = node(state)
+            state["user_input"] = "yes" if answers[-1] else "no"
+            return node(state)
+        state = node(state)
+        for answer in answers:
+            state["user_input"] = "yes" if answer else "no"
+            state = node(state)
+        return state
+
+    # -- tokens -------------------------------------------------------------------------
+    def encode(self, state: game_nodes.GameState) -> str:
+        answers = self._answers(state)
+        payload = bytearray([MODES.index(state["mode"]) | (_STARTED if state["step_output"] is not None else 0)
+                             | (_TOLERANT if state["tolerance"] else 0)])
+        _put_varint(payload, state["games_played"])
+        if state["tolerance"]:
+            _put_varint(payload, state["tolerance"])
+        low, high = state["number_bounds"]
+        _put_varint(payload, _zigzag(low))
+        _put_varint(payload, _zigzag(high))
+        _put_varint(payload, len(answers))
+        bits = 0
+        for i, answer in enumerate(answers):
+            bits |= answer << i
+        payload += bits.to_bytes((len(answers) + 7) // 8, "little")
+        return base64.urlsafe_b64encode(bytes(payload) + self._mac(payload)).rstrip(b"=").decode()
+
+    def decode(self, token: str) -> game_nodes.GameState:
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError):
+            raise InvalidToken("not a state token") from None
+        payload, mac = raw[:-MAC_BYTES], raw[-MAC_BYTES:]
+        if len(raw) <= MAC_BYTES or not hmac.compare_digest(mac, self._mac(payload)):
+            raise InvalidToken("bad signature")
+
+        flags = payload[0]
+        if flags & 3 >= len(MODES) or flags >> 4:
+            raise InvalidToken("unknown flags")
+        games_played, pos = _get_varint(payload, 1)
+        tolerance = 0
+        if flags & _TOLERANT:
+            tolerance, pos = _get_varint(payload, pos)
+        low, pos = _get_varint(payload, pos)
+        high, pos = _get_varint(payload, pos)
+        count, pos = _get_varint(payload, pos)
+        bits = int.from_bytes(payload[pos:], "little")
+        answers = [bool(bits >> i & 1) for i in range(count)]
+        try:
+            bounds = number_search.validate_range(_unzigzag(low), _unzigzag(high))
+        except ValueError as exc:
+            raise InvalidToken(str(exc)) from None
+        return self._replay(MODES[flags & 3], bounds, games_played, bool(flags & _STARTED), answers, tolerance)
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Round-trip and time state tokens over random games.")
+    parser.add_argument("--states", type=int, default=20000)
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    codec = StateCodec(b"benchmark")
+    bounds = (1, args.high)
+    states = []
+    snapshot = lambda state: dict(state, answer_log=list(state["answer_log"]), asked_categories=list(state["asked_categories"]),
+                                  tolerant_answers=list(state["tolerant_answers"]))
+    while len(states) < args.states:
+        mode = rng.choice(("number", "word"))
+        node = game_nodes.number_game if mode == "number" else game_nodes.word_game
+        state = game_nodes.initialize_state(mode, bounds, rng.randrange(100), rng.choice((0, 0, 1, 2)))
+        states.append(snapshot(state))
+        state = node(state)
+        states.append(snapshot(state))
+        while not state["game_over"] and len(states) < args.states:
+            state["user_input"] = rng.choice(("yes", "no", "back") if mode == "word" or state["tolerance"] else ("yes", "no"))
+            state = node(state)
+            states.append(snapshot(state))
+
+    tokens = [codec.encode(state) for state in states]
+    for state, token in zip(states, tokens):
+        assert codec.decode(token) == state, (state, codec.decode(token))
+
+    start = time.perf_counter()
+    for state in states:
+        codec.encode(state)
+    encode_us = (time.perf_counter() - start) / len(states) * 1e6
+    start = time.perf_counter()
+    for token in tokens:
+        codec.decode(token)
+    decode_us = (time.perf_counter() - start) / len(tokens) * 1e6
+    # As on a replica that has not seen these games: tolerant ones replay their answers
+    start = time.perf_counter()
+    for token in tokens:
+        game_nodes._searches.clear()
+        codec.decode(token)
+    cold_us = (time.perf_counter() - start) / len(tokens) * 1e6
+
+    print(f"{len(states):,} states round-tripped losslessly (numbers 1..{args.high})")
+    print(f"token length mean {sum(map(len, tokens)) / len(tokens):.1f} chars, max {max(map(len, tokens))}")
+    print(f"encode {encode_us:.1f} us, decode {decode_us:.1f} us ({cold_us:.1f} us with no tolerant search cached)")
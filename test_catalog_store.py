@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from catalog_store import CatalogStore, load_store
+from question_planner import PLAN_VERSION, QuestionPlan, catalog_hash
+from word_catalog import BUILTIN_CATALOG, Catalog
+from word_index import WordIndex
+
+
+# -----------------------------
+# Stored Question Plans
+# -----------------------------
+def _saved(tmp_path, plan=True):
+    store = CatalogStore.from_records(BUILTIN_CATALOG.items())
+    index = WordIndex.from_store(store)
+    stored = QuestionPlan(index).stored(catalog_hash(index), store.categories) if plan else None
+    store.save(tmp_path / "words.wcat", stored)
+    return CatalogStore.open(tmp_path / "words.wcat"), index
+
+def test_stored_plan_matches_a_fresh_build(tmp_path):
+    store, index = _saved(tmp_path)
+    catalog, built = Catalog(store), QuestionPlan(index)
+    assert catalog.plan.engine is None and catalog.index.digest == catalog_hash(index)
+    for field in ("kinds", "subjects", "yes_child", "no_child", "word_depths", "expected_questions", "worst_questions"):
+        assert getattr(catalog.plan, field) == getattr(built, field)
+
+@pytest.mark.parametrize("plan", [False, True])
+def test_missing_or_outdated_plan_is_rebuilt(tmp_path, plan):
+    store, index = _saved(tmp_path, plan)
+    if plan:
+        store.plan = store.plan._replace(version=PLAN_VERSION + 1)
+    assert Catalog(store).plan.subjects == QuestionPlan(index).subjects
+
+def test_rejects_truncated_plan(tmp_path):
+    _saved(tmp_path)
+    path = tmp_path / "words.wcat"
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="corrupt question plan"):
+        CatalogStore.open(path)
+
+@pytest.mark.parametrize("tag", ["", "two\nlines"])
+def test_rejects_bad_category_names(tag):
+    with pytest.raises(ValueError, match="invalid category"):
+        CatalogStore.from_records([("apple", ["fruit", tag])])
+
+
+# -----------------------------
+# Binary Round Trip
+# -----------------------------
+RECORDS = [("apple", ["fruit", "red"]), ("tiger", ["animal"]), ("naïve", []), ("pizza", ["food", "red", "round"])]
+
+@pytest.mark.parametrize("records", [RECORDS, [("solo", ["only"])], []])
+def test_round_trip(tmp_path, records):
+    built = CatalogStore.from_records(records)
+    built.save(tmp_path / "words.wcat")
+    opened = CatalogStore.open(tmp_path / "words.wcat")
+    assert list(opened.items()) == list(built.items()) == [(word, list(tags)) for word, tags in records]
+    assert opened.categories == built.categories and opened.plan is None
+    assert list(opened.tag_offsets) == list(built.tag_offsets) and list(opened.tag_ids) == list(built.tag_ids)
+
+def test_text_formats_read_the_same(tmp_path):
+    (tmp_path / "words.csv").write_text("word,categories\napple,fruit;red\n# note\ntiger,animal\n\nnaïve,\n"
+                                        "pizza,food\npizza,red\npizza,round\n", encoding="utf-8")
+    (tmp_path / "words.jsonl").write_text("".join(json.dumps({"word": w, "categories": c}) + "\n" for w, c in RECORDS),
+                                          encoding="utf-8")
+    (tmp_path / "words.json").write_text(json.dumps(dict(RECORDS)), encoding="utf-8")
+    for name in ("words.csv", "words.jsonl", "words.json"):
+        assert list(load_store(tmp_path / name).items()) == RECORDS, name
+
+def test_rejects_duplicate_words_and_unknown_files(tmp_path):
+    with pytest.raises(ValueError, match="duplicate word"):
+        CatalogStore.from_records([("apple", ["fruit"]), ("tiger", []), ("apple", ["red"])])
+    (tmp_path / "words.wcat").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a word catalog"):
+        CatalogStore.open(tmp_path / "words.wcat")
+    with pytest.raises(ValueError, match="unsupported"):
+        load_store(tmp_path / "words.txt")
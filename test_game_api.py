@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from game_api import MAX_BATCH, MAX_BODY, GameApi
+
+
+# -----------------------------
+# Request Limits
+# -----------------------------
+@pytest.fixture
+def api() -> GameApi:
+    return GameApi()
+
+def _post(api, path, payload):
+    return api.route("POST", path, json.dumps(payload).encode())
+
+def test_batch_of_the_maximum_size_runs(api):
+    status, payload = _post(api, "/batch", {"requests": [{"op": "start", "mode": "word"}] * MAX_BATCH})
+    assert status == 200 and len(payload["responses"]) == MAX_BATCH
+    assert all(response["prompt"] for response in payload["responses"])
+
+def test_larger_batch_is_rejected_before_any_step(api, monkeypatch):
+    monkeypatch.setattr(api, "step", lambda op, request: pytest.fail("no step may run"))
+    status, payload = _post(api, "/batch", {"requests": [{"op": "start", "mode": "word"}] * (MAX_BATCH + 1)})
+    assert status == 413 and "at most" in payload["error"]
+
+def test_oversized_body_is_rejected_before_parsing(api, monkeypatch):
+    monkeypatch.setattr(json, "loads", lambda body: pytest.fail("the body must not be parsed"))
+    status, payload = api.route("POST", "/start", b" " * (MAX_BODY + 1))
+    assert status == 413 and payload == {"error": "body too large"}
@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+import pytest
+
+import langraph_CLI as cli
+from game_simulator import GameSimulator
+from play_history import QuestionStrategy
+from question_planner import catalog_hash
+
+
+# -----------------------------
+# Benchmark Suite
+# -----------------------------
+# Collected by pytest (`python -m pytest test_game_bench.py`) and runnable as a
+# script. Question counts are deterministic for a fixed seed, game count and
+# catalog, so they must match bench_baseline.json exactly: a change either
+# way means the questions asked changed (run with --save when that is
+# intended). Timings differ too much between machines and runs to gate a
+# build on. They are always printed, but only compared with the baseline
+# (within the tolerance) when GAME_BENCH_TIMINGS=1 or --timings is given.
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+TIMINGS_ENV = "GAME_BENCH_TIMINGS"
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_GAMES = 2000
+
+@contextmanager
+def _pinned():
+    # Plain bisection and the catalog's plan, whatever GAME_HISTORY_FILE or
+    # GAME_TOLERATED_ERRORS say, so the questions are the same on every run
+    saved = cli.strategy, cli.tolerated_errors
+    cli.strategy, cli.tolerated_errors = QuestionStrategy(cli.word_plan), 0
+    try:
+        yield
+    finally:
+        cli.strategy, cli.tolerated_errors = saved
+
+def _bench_game(game: str, seed: int, games: int, timed: bool) -> dict[str, float]:
+    with _pinned():
+        report = GameSimulator(use_graph=timed, timed=timed).run(games, seed=seed, game=game)
+    metrics = {"games": games, "questions_mean": report["questions_mean"], "questions_p99": report["questions_p99"]}
+    if timed:
+        metrics["games_per_sec"] = report["games_per_sec"]
+        metrics["node_mean_us"] = report["node_latency"][f"{game}_game"]["mean_us"]
+    return metrics
+
+def bench_number_game(games: int, timed: bool = True) -> dict[str, float]:
+    return _bench_game("number", 1, games, timed)
+
+def bench_word_game(games: int, timed: bool = True) -> dict[str, float]:
+    return {**_bench_game("word", 2, games, timed), "catalog": catalog_hash(cli.word_index)}
+
+def bench_router(games: int, timed: bool = True) -> dict[str, float]:
+    if not timed:
+        return {}
+    states = [dict(cli.initialize_state(), next_node=name) for name in ("game_selector", "number_game", "word_game", None)]
+    calls = games * 100
+    start = time.perf_counter()
+    for i in range(calls):
+        cli.router(states[i & 3])
+    return {"calls_per_sec": calls / (time.perf_counter() - start)}
+
+BENCHMARKS = {
+    "number_game": bench_number_game,
+    "word_game": bench_word_game,
+    "router": bench_router,
+}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, timings: bool = False) -> list[str]:
+    failures = []
+    for bench, metrics in results.items():
+        expected_metrics = baseline.get(bench, {})
+        comparable = (metrics.get("games") == expected_metrics.get("games")
+                      and metrics.get("catalog") == expected_metrics.get("catalog"))
+        for metric, value in metrics.items():
+            expected = expected_metrics.get(metric)
+            if expected is None or isinstance(value, str):
+                continue
+            if metric.startswith("questions"):
+                if comparable and abs(value - expected) > 1e-9:
+                    failures.append(f"{bench}.{metric}: {value:.4f} != baseline {expected:.4f}")
+            elif not timings:
+                continue
+            elif metric.endswith("_per_sec") and value < expected * (1 - tolerance):
+                failures.append(f"{bench}.{metric}: {value:.1f} < baseline {expected:.1f}")
+            elif metric.endswith("_us") and value > expected * (1 + tolerance):
+                failures.append(f"{bench}.{metric}: {value:.2f} > baseline {expected:.2f}")
+    return failures
+
+def _load_baseline() -> dict:
+    return json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+
+
+# -----------------------------
+# pytest
+# -----------------------------
+@pytest.fixture(scope="module")
+def baseline() -> dict:
+    stored = _load_baseline()
+    if not stored:
+        pytest.skip(f"no {BASELINE_PATH.name}; run python test_game_bench.py --save")
+    return stored
+
+@pytest.mark.parametrize("name", ["number_game", "word_game"])
+def test_questions_match_baseline(name, baseline):
+    expected = baseline[name]
+    metrics = BENCHMARKS[name](expected["games"], timed=False)
+    if metrics.get("catalog") != expected.get("catalog"):
+        pytest.skip("baseline was recorded with another word catalog")
+    assert compare({name: metrics}, baseline, DEFAULT_TOLERANCE) == []
+
+@pytest.mark.skipif(not os.environ.get(TIMINGS_ENV), reason=f"timings are compared only with {TIMINGS_ENV}=1")
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_timings_within_tolerance(name, baseline):
+    games = baseline.get(name, {}).get("games", DEFAULT_GAMES)
+    metrics = BENCHMARKS[name](games)
+    assert compare({name: metrics}, baseline, DEFAULT_TOLERANCE, timings=True) == []
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the game benchmarks and check them against the stored baseline.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--timings", action="store_true", default=bool(os.environ.get(TIMINGS_ENV)),
+                        help="also fail on timings past the tolerance (machine dependent)")
+    parser.add_argument("--save", action="store_true", help=f"store the results as the new baseline in {BASELINE_PATH.name}")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append")
+    args = parser.parse_args(argv)
+
+    results = {name: bench(args.games) for name, bench in BENCHMARKS.items() if not args.only or name in args.only}
+    for name, metrics in results.items():
+        print(f"{name:12s} " + "  ".join(f"{metric}={value:,.2f}" for metric, value in metrics.items()
+                                           if not isinstance(value, str)))
+
+    baseline = _load_baseline()
+    if args.save or not baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE_PATH.name}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance, args.timings)
+    for failure in failures:
+        print("REGRESSION " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
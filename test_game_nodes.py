@@ -0,0 +1,162 @@
+import copy
+
+import pytest
+
+import game_nodes
+from play_history import AdaptiveStrategy, PlayHistory
+
+
+# -----------------------------
+# Tolerant Game Nodes
+# -----------------------------
+NODES = {"number": game_nodes.number_game, "word": game_nodes.word_game}
+
+def _start(mode, tolerance=1, bounds=(1, 50)):
+    return NODES[mode](game_nodes.initialize_state(mode, bounds, 0, tolerance))
+
+def _answer(state, answer):
+    state["user_input"] = answer
+    return NODES[state["mode"]](state)
+
+@pytest.fixture(autouse=True)
+def cold_cache():
+    # Every test also replays from scratch, as a process that never saw the game would
+    game_nodes._searches.clear()
+
+@pytest.mark.parametrize("mode", ["number", "word"])
+def test_back_undoes_each_answer(mode):
+    state = _start(mode)
+    history = [copy.deepcopy(state)]
+    for answer in ["yes", "no", "no", "yes"]:
+        if state["game_over"]:
+            break
+        state = _answer(state, answer)
+        history.append(copy.deepcopy(state))
+    while len(history) > 1:
+        history.pop()
+        state = _answer(state, "back")
+        assert state == history[-1]
+    assert _answer(state, "back") == history[0]  # nothing left to undo
+
+def test_back_reopens_a_finished_word_game():
+    state = _start("word")
+    while not state["game_over"]:
+        state = _answer(state, "yes" if state["current_guess"] == "tiger" or
+                        (state["current_guess"] is None and "animal" in state["step_output"]) else "no")
+    assert game_nodes.answer_found(state) and state["current_guess"] == "tiger"
+    state = _answer(state, "back")
+    assert not state["game_over"] and state["step_output"].endswith("'tiger'?")
+    assert state["attempts"] == len(state["tolerant_answers"])
+
+def test_number_game_survives_one_lie():
+    state = _start("number", bounds=(1, 1000))
+    secret, lied, noted = 777, False, False
+    while not state["game_over"]:
+        truth = secret > state["mid"]
+        if not lied:
+            truth, lied = not truth, True
+        state = _answer(state, "yes" if truth else "no")
+        noted = noted or state["step_output"].startswith(game_nodes.SLIP_NOTE)
+    assert state["number_range"] == (secret, secret) and game_nodes.answer_found(state)
+    assert noted
+    assert state["attempts"] == len(state["tolerant_answers"])
+
+def test_number_game_ends_on_a_number_whatever_the_answers():
+    # Answer whatever leaves the fewest candidates alive, lying as often as it takes
+    state = _start("number")
+    while not state["game_over"]:
+        alive = {}
+        for yes in (True, False):
+            trial = game_nodes.tolerant_search_for(state).copy()
+            trial.answer(trial.question(), yes)
+            alive[yes] = trial.alive()
+        state = _answer(state, "yes" if alive[True] <= alive[False] else "no")
+    low, high = state["number_range"]
+    assert low == high and state["step_output"] == f"🎉 Your number is {low}!"
+    state = _answer(state, "back")
+    assert not state["game_over"] and state["number_range"][0] < state["number_range"][1]
+
+def test_word_game_runs_out_after_too_many_noes():
+    state = _start("word")
+    while not state["game_over"]:
+        state = _answer(state, "no")
+    assert state["step_output"] == "😢 I ran out of guesses."
+    assert state["current_guess"] is None and not game_nodes.answer_found(state)
+
+def test_answers_after_the_end_are_ignored():
+    state = _start("word")
+    while not state["game_over"]:
+        state = _answer(state, "no")
+    finished = copy.deepcopy(state)
+    assert _answer(state, "yes") == finished
+
+
+# -----------------------------
+# Prior-Weighted Strategies
+# -----------------------------
+@pytest.fixture
+def plans(monkeypatch):
+    # A private plan registry that takes up every new pair at once
+    monkeypatch.setattr(game_nodes, "_plans", game_nodes.OrderedDict(game_nodes._plans))
+    monkeypatch.setattr(game_nodes, "_plan_taken", float("-inf"))
+    monkeypatch.setattr(game_nodes, "PLAN_REFRESH_SECONDS", 0.0)
+    monkeypatch.setattr(game_nodes, "strategy", game_nodes.strategy)
+    return game_nodes._plans
+
+def _weighted(secret_word="tiger", secret_number=40):
+    strategy = AdaptiveStrategy(game_nodes.word_index)
+    for _ in range(20):
+        strategy.priors.observe({"game": "word", "secret": secret_word})
+        strategy.priors.observe({"game": "number", "secret": secret_number})
+    strategy.rebuild(("number", "word"))
+    return strategy
+
+def _play(state, secret):
+    while not state["game_over"]:
+        if state["mode"] == "number":
+            mid = state["mid"] if state["mid"] is not None else (state["number_range"][0] + state["number_range"][1]) >> 1
+            truth = secret > mid
+        elif state["current_guess"] is not None:
+            truth = state["current_guess"] == secret
+        else:
+            truth = game_nodes.word_index.has_category(secret, state["step_output"].rsplit("'")[-2])
+        state = _answer(state, "yes" if truth else "no")
+    return state
+
+def test_games_keep_the_plan_they_started_with(plans):
+    uniform = _start("word", tolerance=0)
+    assert uniform["plan_id"] == 0
+    game_nodes.use_strategy(_weighted())
+    weighted = _start("word", tolerance=0)
+    assert weighted["plan_id"] != 0 and weighted["step_output"] == "🤔 Is your word 'tiger'?"
+    game_nodes.use_strategy(_weighted("pizza"))  # a rebuild while both games run
+    for state in (uniform, weighted):
+        assert _play(state, "apple")["step_output"] == "🎉 I guessed it! Your word is 'apple'!"
+
+def test_weighted_number_game_asks_its_own_thresholds(plans):
+    game_nodes.use_strategy(_weighted())
+    state = _start("number", tolerance=0, bounds=(1, 1000))
+    assert state["mid"] is not None and state["mid"] != 500
+    state = _play(state, 40)
+    assert state["number_range"] == (40, 40) and state["attempts"] < 10
+
+def test_game_whose_plan_was_dropped_starts_over(plans, monkeypatch):
+    monkeypatch.setattr(game_nodes, "PLANS_KEPT", 2)
+    game_nodes.use_strategy(_weighted())
+    state = _answer(_start("word", tolerance=0), "no")
+    game_nodes.use_strategy(_weighted("pizza"))
+    _start("word", tolerance=0)  # takes up the new plan and drops the old one
+    assert game_nodes.plan_of(state) is None
+    state = _answer(state, "no")
+    assert state["step_output"] == game_nodes.RESTART_NOTE + "🤔 Is your word 'pizza'?"
+    assert state["attempts"] == 0 and game_nodes.plan_of(state) is not None
+
+def test_adaptive_strategy_builds_its_first_plan_on_the_worker(tmp_path):
+    history = PlayHistory(tmp_path / "history.jsonl")
+    for _ in range(5):
+        history.record("word", "pizza")
+    strategy = AdaptiveStrategy(game_nodes.word_index, history, plan=game_nodes.word_plan)
+    strategy.record("word", "pizza")  # counted once, though the worker appends it to the file
+    strategy.join()
+    assert strategy.plan is not game_nodes.word_plan and strategy.plan.question(0) == ("guess", "pizza")
+    assert strategy.priors.words["pizza"] == 6 and len(list(history)) == 6
@@ -0,0 +1,31 @@
+import asyncio
+
+from game_server import GO_AHEAD, LINE_TOO_LONG, MAX_LINE, GameServer
+
+
+# -----------------------------
+# Over-Long Lines
+# -----------------------------
+async def _send(line: bytes) -> bytes:
+    server = GameServer(pause_scale=0)
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 16)
+    try:
+        await reader.readuntil(GO_AHEAD)  # the game menu
+        writer.write(line)
+        await writer.drain()
+        return await asyncio.wait_for(reader.read(), 5)  # up to the server closing
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        assert server.active == 0
+
+def test_over_long_line_gets_an_error_and_a_close():
+    reply = asyncio.run(_send(b"1" * (2 * MAX_LINE) + b"\n"))
+    assert LINE_TOO_LONG.encode() in reply
+
+def test_line_within_the_limit_is_played():
+    reply = asyncio.run(_send(b"3\n"))  # Exit
+    assert b"Thank you for playing" in reply and LINE_TOO_LONG.encode() not in reply
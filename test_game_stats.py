@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+import game_stats
+from game_stats import GAMES, QUESTIONS, GameStats, JsonLinesSink
+
+
+# -----------------------------
+# JSON Lines Totals Sidecar
+# -----------------------------
+def _row(game="word", found=True, questions=5, seconds=1.0):
+    return (0.0, "test", game, found, questions, seconds)
+
+def test_totals_survive_a_restart(tmp_path):
+    path = tmp_path / "stats.jsonl"
+    JsonLinesSink(path).write([_row(), _row(questions=7), _row("number")])
+    saved = json.loads((tmp_path / "stats.jsonl.totals.json").read_text())
+    assert saved["offset"] == path.stat().st_size
+    totals = JsonLinesSink(path).totals()
+    assert totals["word"][GAMES] == 2 and totals["word"][QUESTIONS] == 12 and totals["number"][GAMES] == 1
+
+def test_totals_catch_up_on_rows_other_writers_appended(tmp_path):
+    path = tmp_path / "stats.jsonl"
+    ours, theirs = JsonLinesSink(path), JsonLinesSink(path)
+    ours.write([_row()])
+    theirs.write([_row(), _row()])
+    ours.write([_row()])
+    assert ours.totals()["word"][GAMES] == 4
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write('{"game":"word","found":true,"quest')  # a torn last line waits
+    assert JsonLinesSink(path).totals()["word"][GAMES] == 4
+
+def test_replaced_log_is_counted_from_the_start(tmp_path):
+    path = tmp_path / "stats.jsonl"
+    JsonLinesSink(path).write([_row()] * 3)
+    os.replace(tmp_path / "stats.jsonl.totals.json", tmp_path / "old.json")
+    path.unlink()
+    JsonLinesSink(path).write([_row()])
+    os.replace(tmp_path / "old.json", tmp_path / "stats.jsonl.totals.json")  # a sidecar for another log
+    assert JsonLinesSink(path).totals()["word"][GAMES] == 1
+
+
+# -----------------------------
+# Failed Flushes
+# -----------------------------
+class FlakySink:
+    def __init__(self, failures, error=OSError):
+        self.failures, self.error = failures, error
+        self.rows = []
+        self.calls = threading.Semaphore(0)
+
+    def write(self, rows):
+        self.calls.release()
+        if self.failures:
+            self.failures -= 1
+            raise self.error("disk full")
+        self.rows += rows
+
+    def totals(self):
+        return {}
+
+    def close(self):
+        pass
+
+def test_refused_batch_goes_back_to_the_front(tmp_path):
+    sink = FlakySink(1)
+    stats = GameStats(sink, flush_seconds=3600)
+    for questions in (1, 2):
+        stats.record("word", True, questions)
+    try:
+        stats.flush()
+    except OSError:
+        pass
+    else:
+        raise AssertionError("the failure must reach the caller")
+    stats.record("word", True, 3)
+    assert stats.flush() == 3
+    assert [row[4] for row in sink.rows] == [1, 2, 3] and stats.flushed == 3
+    stats.close()
+
+def test_flush_thread_retries_and_survives_unexpected_errors(monkeypatch):
+    monkeypatch.setattr(game_stats, "MAX_RETRY_SECONDS", 0.05)
+    sink = FlakySink(3)
+    stats = GameStats(sink, flush_seconds=0.01)
+    stats.record("word", True, 4)
+    for _ in range(4):
+        assert sink.calls.acquire(timeout=5)
+    stats.close()
+    assert [row[4] for row in sink.rows] == [4]
+
+    sink = FlakySink(1, RuntimeError)
+    stats = GameStats(sink, flush_seconds=0.01)
+    stats.record("word", True, 4)
+    assert sink.calls.acquire(timeout=5)  # that batch is dropped, the thread goes on
+    stats.record("word", True, 5)
+    assert sink.calls.acquire(timeout=5)
+    stats.close()
+    assert [row[4] for row in sink.rows] == [5]
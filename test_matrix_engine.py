@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from game_simulator import batched_word_questions
+from matrix_engine import MatrixEngine
+from question_planner import CATEGORY, QuestionPlan, plan_for
+from word_catalog import BUILTIN_CATALOG
+from word_index import WordIndex
+
+
+# -----------------------------
+# Batched Planner Choices
+# -----------------------------
+def _random_index(words=600, categories=40, seed=0) -> WordIndex:
+    rng = random.Random(seed)
+    names = [f"category_{i}" for i in range(categories)]
+    return WordIndex({f"word_{i}": rng.sample(names, rng.randint(0, 4)) for i in range(words)})
+
+CATALOGS = {"builtin": lambda: WordIndex(BUILTIN_CATALOG), "random": _random_index}
+
+def _plan_nodes(plan: QuestionPlan):
+    # Every plan node with its candidate mask and the categories asked on the way
+    index, found = plan.index, []
+    stack = [(plan.ROOT, index.all_words, [])]
+    while stack:
+        node, mask, asked = stack.pop()
+        found.append((node, mask, asked))
+        kind, subject = plan.question(node)
+        children = (((plan.yes_child[node], index.narrow(mask, subject, True)),
+                     (plan.no_child[node], index.narrow(mask, subject, False))) if kind == CATEGORY
+                    else ((plan.no_child[node], index.remove(mask, subject)),))
+        for child, child_mask in children:
+            if child >= 0:
+                stack.append((child, child_mask, asked + [subject] if kind == CATEGORY else asked))
+    return found
+
+@pytest.mark.parametrize("catalog", CATALOGS)
+@pytest.mark.parametrize("sparse_matrix", [False, True])
+def test_best_categories_matches_the_plan_at_every_node(catalog, sparse_matrix):
+    if sparse_matrix:
+        pytest.importorskip("scipy")
+    index = CATALOGS[catalog]()
+    plan = plan_for(index)
+    nodes = _plan_nodes(plan)
+    engine = MatrixEngine(index, sparse_matrix=sparse_matrix)
+    chosen = engine.best_categories([mask for _, mask, _ in nodes], [asked for _, _, asked in nodes])
+    assert chosen == [plan.question(node) for node, _, _ in nodes]
+
+def test_best_categories_without_candidates():
+    engine = MatrixEngine(WordIndex(BUILTIN_CATALOG))
+    assert engine.best_categories([]) == []
+    assert engine.best_categories([0, 1]) == [None, ("guess", "apple")]
+
+@pytest.mark.parametrize("catalog", CATALOGS)
+def test_batched_games_take_the_planned_questions(catalog):
+    index = CATALOGS[catalog]()
+    plan = plan_for(index)
+    assert batched_word_questions(MatrixEngine(index), index.words, batch=64) == plan.word_depths
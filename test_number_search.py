@@ -0,0 +1,45 @@
+import pytest
+
+from number_search import MAX_BOUND, max_questions, parse_bound, solve, validate_range
+
+
+# -----------------------------
+# Bounds
+# -----------------------------
+@pytest.mark.parametrize("text, value", [
+    ("50", 50), (" -7 ", -7), ("2**64", 2 ** 64), ("-2**64", -(2 ** 64)), ("2 ** 10", 1024),
+    ("3**40", 3 ** 40), ("1**1000000000", 1), ("-1**3", -1), ("0**5", 0), ("7**0", 1),
+])
+def test_parse_bound(text, value):
+    assert parse_bound(text) == value
+
+@pytest.mark.parametrize("text", [
+    "", "abc", "2**", "**3", "2**-1", "2**66", "-2**66", "10**20", "2**64**2",
+    "9**999999999999",  # sized before it is computed, so this fails at once
+])
+def test_parse_bound_rejects(text):
+    with pytest.raises(ValueError):
+        parse_bound(text)
+
+@pytest.mark.parametrize("low, high", [(1, 50), (5, 5), (-MAX_BOUND, MAX_BOUND), ("3", "4")])
+def test_validate_range(low, high):
+    assert validate_range(low, high) == (int(low), int(high))
+
+@pytest.mark.parametrize("low, high, message", [
+    (2, 1, "empty range"), (0, MAX_BOUND + 1, "within"), (-MAX_BOUND - 1, 0, "within"),
+])
+def test_validate_range_rejects(low, high, message):
+    with pytest.raises(ValueError, match=message):
+        validate_range(low, high)
+
+
+# -----------------------------
+# Bisection
+# -----------------------------
+@pytest.mark.parametrize("bounds", [(1, 50), (-3, 3), (0, 0), (-MAX_BOUND, MAX_BOUND)])
+def test_solve_finds_every_secret_within_max_questions(bounds):
+    low, high = bounds
+    secrets = range(low, high + 1) if high - low < 100 else [low, low + 1, 0, 12345, high - 1, high]
+    for secret in secrets:
+        found, questions = solve(bounds, secret.__gt__)
+        assert found == secret and questions <= max_questions(low, high)
@@ -0,0 +1,46 @@
+import json
+import pickle
+
+import pytest
+
+import langraph_CLI as cli
+import parallel_simulator
+from parallel_simulator import Aggregate, exhaustive_shards, random_shards
+
+
+# -----------------------------
+# Workers, In Process
+# -----------------------------
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(cli, "strategy", cli.strategy)  # the initializer replaces it
+    def start(*options):
+        parallel_simulator._init_worker(False, *options)
+        return lambda shard: pickle.loads(pickle.dumps(parallel_simulator._run_shard(shard)))  # as from a pool
+    return start
+
+def test_shards_merge_into_exact_totals(worker):
+    run = worker()
+    aggregate = Aggregate()
+    for shard in exhaustive_shards(("number",), shard_size=20):
+        aggregate.merge(run(shard))
+    report = aggregate.report()
+    assert report["games"] == 50 and report["questions_p99"] == 6
+    router = report["node_latency"]["router"]
+    assert router["calls"] == 150 and 0.0 < router["p99_us"]  # sub-microsecond calls no longer round to 0
+
+def test_number_bounds_reach_the_workers(worker):
+    run = worker((-5, 5))
+    aggregate = Aggregate()
+    aggregate.merge(run(exhaustive_shards(("number",), number_bounds=(-5, 5))[0]))
+    assert aggregate.games == 11 and max(aggregate.questions) == 4
+    aggregate.merge(worker((1, 2 ** 64))(("random", "number", 3, 10)))
+    assert max(aggregate.questions) == 64
+
+def test_prior_strategy_plays_the_recorded_secrets(worker, tmp_path):
+    history = tmp_path / "history.jsonl"
+    history.write_text("".join(json.dumps({"game": "word", "secret": "pizza"}) + "\n" for _ in range(20)))
+    shard, = random_shards(40, game="word")
+    uniform = worker((1, 50), "uniform", str(history))(shard)["questions"]
+    prior = worker((1, 50), "prior", str(history))(shard)["questions"]
+    assert prior == {1: 40} and uniform != prior
@@ -0,0 +1,43 @@
+import pytest
+
+from replay_log import HEADER_SIZE, generate, replay
+
+
+# -----------------------------
+# Torn Replay Logs
+# -----------------------------
+@pytest.fixture(scope="module")
+def log_bytes(tmp_path_factory) -> bytes:
+    path = tmp_path_factory.mktemp("logs") / "traffic.glog"
+    generate(path, sessions=12, games=2, concurrent=4, bounds=(1, 2 ** 40), tolerance=0)
+    generate(path, sessions=4, games=1, concurrent=2, tolerance=1)  # reopened: a reset, then tolerant games
+    return path.read_bytes()
+
+BEHAVIOUR = ("games", "answers", "skipped_answers", "modes", "digest")
+
+def _replay(tmp_path, data: bytes) -> dict:
+    path = tmp_path / "cut.glog"
+    path.write_bytes(data)
+    return replay(path)
+
+def test_whole_log_has_no_torn_bytes(tmp_path, log_bytes):
+    report = _replay(tmp_path, log_bytes)
+    assert report["torn_bytes"] == 0 and report["games"] > 0
+
+def test_log_cut_at_every_offset(tmp_path, log_bytes):
+    # Each cut replays the complete events before it, exactly as a log that
+    # ends on the last event boundary does, and reports the rest as torn
+    full = _replay(tmp_path, log_bytes)
+    boundaries, answers = set(), 0
+    for cut in range(HEADER_SIZE, len(log_bytes) + 1):
+        report = _replay(tmp_path, log_bytes[:cut])
+        boundary = cut - report["torn_bytes"]
+        assert HEADER_SIZE <= boundary <= cut
+        if boundary != cut:
+            whole = _replay(tmp_path, log_bytes[:boundary])
+            assert whole["torn_bytes"] == 0
+            assert [report[key] for key in BEHAVIOUR] == [whole[key] for key in BEHAVIOUR]
+        assert report["answers"] >= answers
+        answers = report["answers"]
+        boundaries.add(boundary)
+    assert answers == full["answers"] and len(boundaries) > 100
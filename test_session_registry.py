@@ -0,0 +1,61 @@
+import pytest
+
+import session_registry
+from session_registry import GameSession, SessionRegistry
+
+
+# -----------------------------
+# LRU Eviction
+# -----------------------------
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_registry.time, "monotonic", lambda: now[0])
+    return now
+
+def _registry(max_sessions=3, idle_seconds=60.0):
+    evicted = []
+    return SessionRegistry(max_sessions, idle_seconds, evicted.append), evicted
+
+def _open(registry, *session_ids):
+    return [registry.get(session_id, lambda: GameSession(session_id)) for session_id in session_ids]
+
+def test_least_recently_used_session_goes_first(clock):
+    registry, evicted = _registry()
+    _open(registry, "a", "b", "c")
+    _open(registry, "a")  # touched: "b" is now the oldest
+    _open(registry, "d")
+    assert evicted == ["b"] and "b" not in registry and len(registry) == 3
+    _open(registry, "e", "f")
+    assert evicted == ["b", "c", "a"] and [s for s in "def" if s in registry] == list("def")
+    assert registry.stats() == {"live": 3, "evicted": 3, "max_sessions": 3}
+
+def test_live_session_is_not_created_again(clock):
+    registry, _ = _registry()
+    first, = _open(registry, "a")
+    assert registry.get("a", lambda: pytest.fail("created twice")) is first
+
+def test_idle_sessions_expire(clock):
+    registry, evicted = _registry(max_sessions=100)
+    _open(registry, "a", "b")
+    clock[0] += 30
+    _open(registry, "b")
+    clock[0] += 31  # "a" idle 61s, "b" 31s
+    _open(registry, "c")
+    assert evicted == ["a"] and "b" in registry
+    clock[0] += 60
+    _open(registry, "c")
+    assert evicted == ["a", "b"] and len(registry) == 1
+
+def test_evicted_session_is_built_again(clock):
+    registry, _ = _registry(max_sessions=1)
+    first, = _open(registry, "a")
+    _open(registry, "b", "a")
+    assert registry.get("a", lambda: pytest.fail("already live")) is not first
+
+def test_discard_drops_the_session_once(clock):
+    registry, evicted = _registry()
+    _open(registry, "a")
+    registry.discard("a")
+    registry.discard("a")
+    assert evicted == ["a"] and len(registry) == 0 and registry.evicted == 0
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("langgraph")
+from langgraph.checkpoint.base import empty_checkpoint
+
+from sqlite_checkpointer import SQLiteCheckpointer
+
+
+# -----------------------------
+# SQLite Checkpointer
+# -----------------------------
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+@pytest.fixture
+def open_saver(path):
+    savers = []
+    def open_saver(**options):
+        options.setdefault("flush_interval", 3600)  # flushed by hand unless a test says otherwise
+        savers.append(SQLiteCheckpointer(path, **options))
+        return savers[-1]
+    yield open_saver
+    for saver in savers:
+        saver.close()
+
+def _put(saver, thread_id, value):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"value": value}
+    return saver.put({"configurable": {"thread_id": thread_id}}, checkpoint, {}, {})
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT thread_id, checkpoint_id FROM checkpoints").fetchall()
+
+def test_only_the_latest_checkpoint_is_kept(open_saver, path):
+    saver = open_saver()
+    first = _put(saver, "a", 1)
+    latest = _put(saver, "a", 2)
+    assert saver.flush() == 1
+    assert _rows(path) == [("a", latest["configurable"]["checkpoint_id"])]
+    assert saver.get_tuple(first) is None and saver.resume("a") == {"value": 2}
+    _put(saver, "a", 3)
+    saver.flush()
+    assert len(_rows(path)) == 1 and open_saver().resume("a") == {"value": 3}
+
+def test_parked_checkpoints_are_read_before_the_flush(open_saver, path):
+    saver, other = open_saver(), open_saver()
+    _put(saver, "a", 1)
+    _put(saver, "b", 2)
+    assert set(saver._pending) == {("a", ""), ("b", "")}
+    assert saver.resume("a") == {"value": 1} and other.resume("a") is None
+    assert saver.flush() == 2
+    assert saver._pending == {} and other.resume("a") == {"value": 1} and other.resume("b") == {"value": 2}
+
+def test_flusher_thread_commits_on_its_timer(open_saver):
+    saver, other = open_saver(flush_interval=0.01), open_saver()
+    _put(saver, "a", 1)
+    deadline = time.monotonic() + 5
+    while other.resume("a") is None:
+        assert time.monotonic() < deadline, "the flusher never committed"
+        time.sleep(0.01)
+
+def test_flusher_thread_wakes_once_enough_steps_wait(open_saver):
+    saver, other = open_saver(flush_steps=2), open_saver()
+    _put(saver, "a", 1)
+    _put(saver, "b", 2)  # the timer is an hour away, so only the wake-up commits this
+    deadline = time.monotonic() + 5
+    while other.resume("b") is None:
+        assert time.monotonic() < deadline, "the flusher never woke up"
+        time.sleep(0.01)
+
+
+class FailingConnection:
+    # The saver's connection, with one executemany that fails (and may run
+    # `meanwhile` first, as a put() racing the failed batch would)
+    def __init__(self, conn, meanwhile=None):
+        self.conn, self.meanwhile, self.failed = conn, meanwhile, False
+
+    def executemany(self, sql, rows):
+        if not self.failed:
+            self.failed = True
+            if self.meanwhile:
+                self.meanwhile()
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.executemany(sql, rows)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+def test_failed_flush_keeps_the_checkpoint(open_saver):
+    saver, other = open_saver(), open_saver()
+    _put(saver, "a", 1)
+    saver._conn = FailingConnection(saver._conn)
+    with pytest.raises(sqlite3.OperationalError):
+        saver.flush()
+    assert not saver._conn.in_transaction and saver.resume("a") == {"value": 1} and other.resume("a") is None
+    assert saver.flush() == 1 and other.resume("a") == {"value": 1}
+
+def test_failed_flush_does_not_bring_back_an_older_checkpoint(open_saver):
+    saver, other = open_saver(), open_saver()
+    _put(saver, "a", 1)
+    saver._conn = FailingConnection(saver._conn, meanwhile=lambda: _put(saver, "a", 2))
+    with pytest.raises(sqlite3.OperationalError):
+        saver.flush()
+    assert saver.flush() == 1 and other.resume("a") == {"value": 2}
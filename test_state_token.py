@@ -0,0 +1,82 @@
+import base64
+
+import pytest
+
+import game_nodes
+from state_token import InvalidToken, StateCodec, _put_varint, _zigzag
+
+
+# -----------------------------
+# State Token Codec
+# -----------------------------
+def _play(mode, answers, bounds=(1, 50), tolerance=0):
+    node = game_nodes.number_game if mode == "number" else game_nodes.word_game
+    state = node(game_nodes.initialize_state(mode, bounds, 3, tolerance))
+    for answer in answers:
+        state["user_input"] = answer
+        state = node(state)
+    return state
+
+def _signed(codec: StateCodec, payload: bytes) -> str:
+    return base64.urlsafe_b64encode(payload + codec._mac(payload)).rstrip(b"=").decode()
+
+@pytest.fixture
+def codec() -> StateCodec:
+    return StateCodec(b"test key")
+
+@pytest.mark.parametrize("mode, answers, bounds, tolerance", [
+    (None, [], (1, 50), 0),
+    ("number", [], (1, 50), 0),
+    ("number", ["yes", "no", "no"], (-2 ** 64, 2 ** 64), 0),
+    ("number", ["yes", "no", "yes", "yes", "no", "no"], (1, 50), 0),
+    ("word", ["no", "back", "yes", "no"], (1, 50), 0),
+    ("number", ["yes", "no", "back", "no", "yes"], (1, 1000), 2),
+    ("word", ["no", "no", "yes", "back"], (1, 50), 1),
+])
+def test_round_trip(codec, mode, answers, bounds, tolerance):
+    state = _play(mode, answers, bounds, tolerance) if mode else game_nodes.initialize_state(None, bounds, 3)
+    assert codec.decode(codec.encode(state)) == state
+
+def test_rejects_tampered_payload(codec):
+    token = codec.encode(_play("number", ["yes", "no"]))
+    raw = bytearray(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    raw[1] ^= 1  # games_played
+    with pytest.raises(InvalidToken, match="bad signature"):
+        codec.decode(base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode())
+
+def test_rejects_other_key(codec):
+    token = StateCodec(b"another key").encode(_play("word", ["yes"]))
+    with pytest.raises(InvalidToken, match="bad signature"):
+        codec.decode(token)
+
+def test_rejects_every_truncation(codec):
+    token = codec.encode(_play("number", ["yes", "no", "yes"], tolerance=1))
+    for end in range(len(token)):
+        with pytest.raises(InvalidToken):
+            codec.decode(token[:end])
+
+@pytest.mark.parametrize("token", ["", "!!!!", "a", "=" * 8])
+def test_rejects_garbage(codec, token):
+    with pytest.raises(InvalidToken):
+        codec.decode(token)
+
+def test_rejects_unknown_flags(codec):
+    with pytest.raises(InvalidToken, match="unknown flags"):
+        codec.decode(_signed(codec, bytes([1 | 4 | 16, 0, 2, 100, 0])))
+
+def test_rejects_signed_truncated_payload(codec):
+    # A correctly signed payload that stops inside a varint
+    payload = bytearray([1 | 4])
+    _put_varint(payload, 7)
+    _put_varint(payload, _zigzag(1))
+    payload.append(0x80)
+    with pytest.raises(InvalidToken, match="truncated"):
+        codec.decode(_signed(codec, bytes(payload)))
+
+def test_rejects_signed_bad_range(codec):
+    payload = bytearray([1 | 4, 0])
+    _put_varint(payload, _zigzag(50))
+    _put_varint(payload, _zigzag(1))
+    payload.append(0)
+    with pytest.raises(InvalidToken):
+        codec.decode(_signed(codec, bytes(payload)))
@@ -0,0 +1,82 @@
+import pytest
+
+import game_nodes
+from question_planner import GUESS
+from tolerant_search import TolerantNumberSearch, TolerantWordSearch, step
+
+
+# -----------------------------
+# Numbers
+# -----------------------------
+def _play_number(low, high, errors, secret, lies=()):
+    # Answers truthfully except at the question numbers in `lies`
+    search = TolerantNumberSearch(low, high, errors)
+    while (threshold := search.question()) is not None:
+        truth = secret > threshold
+        search.answer(threshold, truth != (search.questions in lies))
+    return search
+
+def test_number_without_lies():
+    for secret in range(1, 51):
+        search = _play_number(1, 50, 1, secret)
+        assert search.result == secret and not search.caught_error
+
+def test_number_survives_one_lie_anywhere():
+    # Every secret in 1..50, with the lie at every question of its game
+    for secret in range(1, 51):
+        position = 0
+        while True:
+            search = _play_number(1, 50, 1, secret, {position})
+            assert search.result == secret, (secret, position)
+            if position >= search.questions:
+                break  # the game ended before the lie came up
+            assert search.caught_error
+            position += 1
+
+def test_number_survives_two_lies_anywhere():
+    for secret in range(1, 21):
+        for first in range(12):
+            for second in range(first + 1, 14):
+                assert _play_number(1, 20, 2, secret, {first, second}).result == secret
+
+def test_number_questions_stay_inside_the_alive_range():
+    search = TolerantNumberSearch(-2 ** 64, 2 ** 64, 1)
+    while (threshold := search.question()) is not None:
+        first, last = search.segments[0][0], search.segments[-1][1]
+        assert first <= threshold < last
+        search.answer(threshold, 12345 > threshold)
+    assert search.result == 12345 and search.questions < 80
+
+
+# -----------------------------
+# Words
+# -----------------------------
+def _play_word(index, errors, secret, lies=()):
+    search = TolerantWordSearch(index, errors)
+    while (question := search.question()) is not None:
+        kind, subject = question
+        truth = subject == secret if kind == GUESS else index.has_category(secret, subject)
+        # "yes" to a wrong guess would end the game on it, so that one is never a lie
+        lie = search.questions in lies and (kind != GUESS or truth)
+        search.answer(kind, subject, truth != lie)
+    return search
+
+def test_word_survives_one_lie_anywhere():
+    # The lie is any category answer, or a "no" to the right guess
+    index = game_nodes.word_index
+    for secret in index.words:
+        position = 0
+        while True:
+            search = _play_word(index, 1, secret, {position})
+            assert search.found == secret, (secret, position)
+            if position >= search.questions:
+                break
+            position += 1
+
+def test_step_leaves_the_search_alone():
+    search = TolerantNumberSearch(1, 50, 1)
+    question = search.question()
+    after = step(search, True)
+    assert search.questions == 0 and search.question() == question
+    assert after.questions == 1 and after is not search
+    assert step(_play_number(1, 50, 1, 7), True).result == 7  # finished: nothing to answer
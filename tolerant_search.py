@@ -0,0 +1,369 @@
+from typing import Optional, Tuple
+from functools import lru_cache
+from math import comb
+import os
+
+from question_planner import CATEGORY, FOUND, GUESS
+from word_index import WordIndex
+
+
+# -----------------------------
+# Error-Tolerant Search
+# -----------------------------
+# Solvers that survive up to `errors` wrong answers (Ulam's searching game
+# with lies). Every candidate carries the number of answers it contradicts,
+# its "lies"; candidates with more than `errors` lies are out, and the game
+# ends when a single candidate is left. A wrong answer no longer leads to a
+# wrong result or to "ran out of guesses": it shows up as the leading
+# candidate having lies > 0, and costs a few extra questions instead of a
+# restart.
+#
+# Questions are chosen by Berlekamp's volume: with q questions to go, a
+# candidate at j lies can still be reached by sum(C(q, i) for i <= errors - j)
+# answer sequences, and q is the least with total volume <= 2**q. Each
+# question splits that volume as evenly as it can, which makes the number
+# game cost about log2(n) + errors * log2(log2(n)) questions instead of log2(n).
+TOLERANCE_ENV = "GAME_TOLERATED_ERRORS"
+MAX_ERRORS = 3  # the most the web app and the HTTP API let a player ask for
+_UNASKED = object()
+
+def tolerance_from_env() -> int:
+    return max(0, int(os.environ.get(TOLERANCE_ENV, 0) or 0))
+
+
+@lru_cache(maxsize=None)
+def _reach(q: int, budget: int) -> int:
+    # Answer sequences of length q with at most `budget` lies
+    return sum(comb(q, i) for i in range(budget + 1))
+
+class _Volume:
+    __slots__ = ("errors", "q")
+
+    def __init__(self, errors: int):
+        self.errors = errors
+        self.q = 0
+
+    def copy(self) -> "_Volume":
+        clone = _Volume(self.errors)
+        clone.q = self.q
+        return clone
+
+    def weight(self, q: int, lies: int) -> int:
+        return _reach(q, self.errors - lies)
+
+    def update(self, counts: list[int]) -> int:
+        # The character q of a state (counts[j] candidates at j lies). It
+        # moves little between questions, so the search starts from the last.
+        total = lambda q: sum(n * self.weight(q, j) for j, n in enumerate(counts) if n)
+        q = self.q
+        while q > 0 and total(q - 1) <= 1 << (q - 1):
+            q -= 1
+        while total(q) > 1 << q:
+            q += 1
+        self.q = q
+        return q
+
+    def splits(self) -> list[int]:
+        # How much one candidate at j lies tips the balance between the two
+        # answers: w(j) - w(j + 1) for the next q - 1 questions
+        q = max(self.q - 1, 0)
+        return [self.weight(q, j) - self.weight(q, j + 1) for j in range(self.errors + 1)]
+
+
+# -----------------------------
+# Numbers
+# -----------------------------
+# Thresholds split the range into at most one segment per answer, each with a
+# single lie count, so a state is a short sorted list of (low, high, lies)
+# and a step is linear in the answers so far, whatever the range.
+class TolerantNumberSearch:
+    def __init__(self, low: int, high: int, errors: int = 1):
+        self.errors = errors
+        self.segments: list[Tuple[int, int, int]] = [(low, high, 0)]
+        self.questions = 0
+        self._volume = _Volume(errors)
+        self._next = _UNASKED  # question() is computed once per state
+
+    def alive(self) -> int:
+        return sum(high - low + 1 for low, high, _ in self.segments)
+
+    @property
+    def result(self) -> Optional[int]:
+        segments = self.segments
+        return segments[0][0] if len(segments) == 1 and segments[0][0] == segments[0][1] else None
+
+    @property
+    def exhausted(self) -> bool:
+        # More than `errors` answers were wrong
+        return not self.segments
+
+    @property
+    def caught_error(self) -> bool:
+        return bool(self.segments) and min(lies for _, _, lies in self.segments) > 0
+
+    def copy(self) -> "TolerantNumberSearch":
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._volume = self._volume.copy()
+        return clone
+
+    def question(self) -> Optional[int]:
+        # Threshold t of the next "greater than t?", or None when finished
+        if self._next is _UNASKED:
+            self._next = self._question()
+        return self._next
+
+    def _question(self) -> Optional[int]:
+        if self.result is not None or self.exhausted:
+            return None
+        counts = [0] * (self.errors + 1)
+        for low, high, lies in self.segments:
+            counts[lies] += high - low + 1
+        self._volume.update(counts)
+        tips = self._volume.splits()
+
+        # Weighted median of the tips: the t with half the tip mass at or below it
+        half = sum(tips[lies] * (high - low + 1) for low, high, lies in self.segments) / 2
+        first, last = self.segments[0][0], self.segments[-1][1]
+        seen = 0
+        for low, high, lies in self.segments:
+            mass = tips[lies] * (high - low + 1)
+            if seen + mass >= half:
+                t = low + max(0, int((half - seen) / tips[lies]) - 1)
+                # the better of t and t + 1, kept inside the alive range
+                if t < high and abs(seen + tips[lies] * (t + 2 - low) - half) < abs(seen + tips[lies] * (t + 1 - low) - half):
+                    t += 1
+                return min(max(t, first), last - 1)
+            seen += mass
+        return last - 1
+
+    def answer(self, threshold: int, greater: bool) -> None:
+        self.questions += 1
+        self._next = _UNASKED
+        updated = []
+        for low, high, lies in self.segments:
+            parts = [(low, min(high, threshold)), (max(low, threshold + 1), high)]
+            for (lo, hi), above in zip(parts, (False, True)):
+                if lo > hi:
+                    continue
+                count = lies + (above != greater)
+                if count > self.errors:
+                    continue
+                if updated and updated[-1][2] == count and updated[-1][1] + 1 == lo:
+                    updated[-1] = (updated[-1][0], hi, count)
+                else:
+                    updated.append((lo, hi, count))
+        self.segments = updated
+
+
+# -----------------------------
+# Words
+# -----------------------------
+# One bitmask of words per lie count over the shared WordIndex, so an answer
+# is a few ANDs and shifts between levels. Questions are categories (asking
+# one again is allowed: that is how a wrong answer gets outvoted) or a guess
+# at the likeliest word, whichever splits the volume best; guesses win ties.
+# A "yes" to a guess still ends the game, as it does everywhere else: the
+# player has just seen the word, so that is the one answer not second-guessed.
+class TolerantWordSearch:
+    def __init__(self, index: WordIndex, errors: int = 1):
+        self.index = index
+        self.errors = errors
+        self.levels = [index.all_words] + [0] * errors
+        self.questions = 0
+        self.found: Optional[str] = None
+        self._volume = _Volume(errors)
+        self._next = _UNASKED
+
+    @property
+    def exhausted(self) -> bool:
+        return self.found is None and not any(self.levels)
+
+    @property
+    def caught_error(self) -> bool:
+        return not self.levels[0] and any(self.levels)
+
+    def leader(self) -> Optional[str]:
+        # The word with the fewest lies (lowest id on ties)
+        for mask in self.levels:
+            if mask:
+                return self.index.words[(mask & -mask).bit_length() - 1]
+        return None
+
+    def copy(self) -> "TolerantWordSearch":
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._volume = self._volume.copy()
+        return clone
+
+    def question(self) -> Optional[Tuple[str, str]]:
+        if self._next is _UNASKED:
+            self._next = self._question()
+        return self._next
+
+    def _question(self) -> Optional[Tuple[str, str]]:
+        if self.found is not None or self.exhausted:
+            return None
+        counts = [mask.bit_count() for mask in self.levels]
+        self._volume.update(counts)
+        tips = self._volume.splits()
+        total = sum(t * n for t, n in zip(tips, counts))
+
+        leader = self.leader()
+        leader_lies = next(j for j, mask in enumerate(self.levels) if mask)
+        best, best_gap = (GUESS, leader), abs(2 * tips[leader_lies] - total)
+        if sum(counts) == 1:
+            return best
+        for category in self.index.categories:
+            mask = self.index.category_masks[category]
+            gap = abs(sum(t * (2 * (level & mask).bit_count() - n) for t, level, n in zip(tips, self.levels, counts)))
+            if gap < best_gap:
+                best, best_gap = (CATEGORY, category), gap
+        return best
+
+    def answer(self, kind: str, subject: str, yes: bool) -> None:
+        self.questions += 1
+        self._next = _UNASKED
+        if kind == GUESS:
+            if yes:
+                self.found = subject
+                return
+            agree = self.index.all_words & ~(1 << self.index.word_ids[subject])
+        else:
+            mask = self.index.category_masks.get(subject, 0)
+            agree = mask if yes else self.index.all_words & ~mask
+        # Words contradicting this answer move up one level; the top level's drop out
+        levels = self.levels
+        self.levels = [levels[0] & agree] + [(levels[j] & agree) | (levels[j - 1] & ~agree) for j in range(1, len(levels))]
+
+
+# -----------------------------
+# Stepping by Answers
+# -----------------------------
+# Each question depends only on the answers before it, so the yes/no answers
+# alone are a full record of a game. `step` answers the current question on a
+# copy and leaves the search itself alone, so a search can be shared and
+# cached under its answers (the web app does, see game_nodes).
+def step(search, yes: bool):
+    question = search.question()
+    if question is None:
+        return search
+    search = search.copy()
+    if isinstance(search, TolerantNumberSearch):
+        search.answer(question, yes)
+    else:
+        search.answer(question[0], question[1], yes)
+    return search
+
+
+# -----------------------------
+# Benchmark: tolerate vs restart
+# -----------------------------
+# Players who get each answer wrong with probability p. The current solvers
+# (bisection, the catalog's question plan) end a game with a wrong answer on
+# the wrong number, or on a wrong or missing word, and the player starts over
+# until a game comes out right; the tolerant ones keep going. Reported per
+# setting: questions until the right answer, and games started (each start
+# and answer is one rerun in the web app).
+def _restart_number(low: int, high: int, secret: int, p: float, rng) -> Tuple[int, int]:
+    questions = games = 0
+    while True:
+        games += 1
+        lo, hi = low, high
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            greater = (secret > mid) != (rng.random() < p)
+            lo, hi = (mid + 1, hi) if greater else (lo, mid)
+            questions += 1
+        if lo == secret:
+            return questions, games
+
+def _restart_word(plan, index: WordIndex, secret: str, p: float, rng) -> Tuple[int, int]:
+    questions = games = 0
+    while True:
+        games += 1
+        node = plan.ROOT
+        while node >= 0:
+            kind, subject = plan.question(node)
+            truth = index.has_category(secret, subject) if kind == CATEGORY else subject == secret
+            node = plan.advance(node, truth != (rng.random() < p))
+            questions += 1
+        if node == FOUND and subject == secret:
+            return questions, games
+
+def _tolerant(make, truth, p: float, rng) -> Tuple[int, int]:
+    questions = games = 0
+    while True:
+        games += 1
+        search = make()
+        while (question := search.question()) is not None:
+            answer = truth(question) != (rng.random() < p)
+            if isinstance(search, TolerantNumberSearch):
+                search.answer(question, answer)
+            else:
+                search.answer(question[0], question[1], answer)
+        questions += search.questions
+        if truth(None):  # right result
+            return questions, games
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    from word_catalog import get_catalog
+    import number_search
+
+    parser = argparse.ArgumentParser(description="Questions until the right answer: restart on a wrong result vs tolerate errors.")
+    parser.add_argument("--games", type=int, default=4000)
+    parser.add_argument("--high", type=number_search.parse_bound, default=number_search.DEFAULT_RANGE[1])
+    parser.add_argument("--errors", type=int, nargs="+", default=[1, 2], help="tolerated errors to compare")
+    parser.add_argument("--p", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.1], help="chance of each answer being wrong")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    index, plan = catalog.index, catalog.plan
+    print(f"numbers 1..{args.high}, {len(index)} words; mean questions (games started) per correct result")
+    for p in args.p:
+        rng = random.Random(args.seed)
+        secrets = [(rng.randint(1, args.high), index.words[rng.randrange(len(index))]) for _ in range(args.games)]
+        rows = {}
+        start = time.perf_counter()
+        rows["restart"] = (
+            [_restart_number(1, args.high, n, p, rng) for n, _ in secrets],
+            [_restart_word(plan, index, w, p, rng) for _, w in secrets],
+        )
+        for errors in args.errors:
+            numbers, words = [], []
+            for n, w in secrets:
+                state = {}
+
+                def make_number(errors=errors):
+                    state["search"] = TolerantNumberSearch(1, args.high, errors)
+                    return state["search"]
+
+                def number_truth(t, n=n):
+                    return state["search"].result == n if t is None else n > t
+                numbers.append(_tolerant(make_number, number_truth, p, rng))
+
+                def make_word(errors=errors):
+                    state["search"] = TolerantWordSearch(index, errors)
+                    return state["search"]
+
+                def word_truth(question, w=w):
+                    if question is None:
+                        return state["search"].found == w
+                    kind, subject = question
+                    return index.has_category(w, subject) if kind == CATEGORY else subject == w
+                words.append(_tolerant(make_word, word_truth, p, rng))
+            rows[f"tolerate {errors}"] = (numbers, words)
+        seconds = time.perf_counter() - start
+
+        line = f"p={p:<5}"
+        for name, (numbers, words) in rows.items():
+            mean = lambda pairs, i: sum(pair[i] for pair in pairs) / len(pairs)
+            line += (f"  {name}: number {mean(numbers, 0):5.2f} ({mean(numbers, 1):.2f})"
+                     f" word {mean(words, 0):5.2f} ({mean(words, 1):.2f})")
+        print(line + f"  [{seconds:.1f}s]")
@@ -0,0 +1,385 @@
+import streamlit as st
+from typing import Dict, Any
+import time # Import time for the delay
+import uuid
+import os
+import threading
+import number_search
+import tolerant_search
+# The state, the nodes and the graph live in game_nodes, which does not import Streamlit
+import game_nodes
+from game_nodes import GameState, initialize_state, answer_found, build_game_graph, catalog
+from banner import render_banner
+import node_metrics
+from session_registry import GameSession, SessionRegistry
+from play_history import strategy_from_env
+from game_stats import get_stats
+
+
+@st.cache_resource
+def get_checkpointer():
+    # One latest-only record per session (see sqlite_checkpointer). With
+    # GAME_CHECKPOINT_DB set, sessions are checkpointed to that SQLite file
+    # and survive restarts; any replica pointing at it can resume them.
+    # Otherwise they live in an in-memory database, dropped on eviction.
+    from sqlite_checkpointer import SQLiteCheckpointer
+    return SQLiteCheckpointer(os.environ.get("GAME_CHECKPOINT_DB") or ":memory:")
+
+@st.cache_resource
+def get_session_registry():
+    # Live sessions of this process in LRU order; idle ones are evicted
+    # together with their in-memory checkpoint (durable ones are kept).
+    drop = None if os.environ.get("GAME_CHECKPOINT_DB") else lambda session_id: get_checkpointer().delete_thread(session_id)
+    log = get_replay_log()
+    if log is None:
+        return SessionRegistry(on_evict=drop)
+
+    def on_evict(session_id):
+        if drop:
+            drop(session_id)
+        log.close(session_id)
+    return SessionRegistry(on_evict=on_evict)
+
+@st.cache_resource
+def get_replay_log():
+    # GAME_REPLAY_LOG: every game start and answer, for replay_log.py
+    from replay_log import ReplayLog
+    return ReplayLog.from_env()
+
+@st.cache_resource
+def warm_up() -> threading.Thread:
+    # The first page (the menu) needs neither the checkpointer nor the graph,
+    # and their langgraph imports take over a second: load them in the
+    # background once it is shown, so that Start Game finds them loaded.
+    def load():
+        import sqlite_checkpointer
+        import langgraph.graph
+    thread = threading.Thread(target=load, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource
+def get_game_graph(catalog_key):
+    # Compiled once per process (and again only if the catalog file changes,
+    # since the nodes close over the catalog) and shared by every session.
+    metrics = node_metrics.configure()
+    return build_game_graph(checkpointer=get_checkpointer(), wrap=metrics.wrap if metrics else None)
+
+@st.cache_resource
+def get_strategy():
+    # GAME_HISTORY_FILE: finished games are appended there, and new games ask
+    # with the prior-weighted split and plan (play_history) once the worker
+    # has built them; until then, and without the file, the uniform ones.
+    # Games keep the pair they started with (see game_nodes.use_strategy).
+    strategy = strategy_from_env(catalog)
+    game_nodes.use_strategy(strategy)
+    return strategy
+
+def session_config() -> Dict[str, Any]:
+    if 'session_id' not in st.session_state:
+        # Keep the id in the URL so a reload (or another replica) resumes the game
+        st.session_state['session_id'] = st.query_params.get("session") or uuid.uuid4().hex
+        st.query_params["session"] = st.session_state['session_id']
+    return {"configurable": {"thread_id": st.session_state['session_id']}}
+
+def resume_session(session_id: str, saved_game: bool) -> GameSession:
+    # Menu settings for a new browser session, picking up a saved game if any.
+    # A first visit has no session in the URL, so the graph is not needed yet.
+    game = GameSession(session_id)
+    if not saved_game:
+        return game
+    saved = get_game_graph(catalog.key).get_state(session_config()).values
+    if saved and saved.get('mode') in ('number', 'word') and not saved.get('game_over') and game_nodes.plan_of(saved):
+        game.mode, game.number_range, game.games_played = saved['mode'], tuple(saved['number_bounds']), saved['games_played']
+        game.tolerance = saved.get('tolerance', 0)
+    return game
+
+def current_session() -> GameSession:
+    saved_game = "session" in st.query_params
+    session_id = session_config()["configurable"]["thread_id"]
+    return get_session_registry().get(session_id, lambda: resume_session(session_id, saved_game))
+
+def current_state(mode) -> GameState:
+    # State of this session's game, starting a fresh one if it is not `mode`
+    state = get_game_graph(catalog.key).get_state(session_config()).values
+    if not state or state.get('mode') != mode or (not state['game_over'] and game_nodes.plan_of(state) is None):
+        state = start_game(mode)
+    return state
+
+def advance(answer: str) -> GameState:
+    config = session_config()
+    state = get_game_graph(catalog.key).invoke({"user_input": answer}, config)
+    log = get_replay_log()
+    if log is not None:
+        log.answer(config["configurable"]["thread_id"], answer)
+    if state["game_over"] and answer != "back":
+        # Answer buttons are only shown while a game runs, so this is the answer that ended it
+        count_finished_game(state)
+    return state
+
+def count_finished_game(state: GameState) -> None:
+    # Once per game, when it first ends: going back into a finished word
+    # game and finishing it again does not count it twice
+    game = st.session_state.game
+    if game.game_counted:
+        return
+    game.game_counted = True
+    game.games_played += 1
+    found = answer_found(state)
+    seconds = time.monotonic() - game.game_started if game.game_started is not None else None
+    get_stats().record(state["mode"], found, state["attempts"], seconds, "web")
+    if found:
+        if state["mode"] == "number":
+            get_strategy().record("number", state["number_range"][0], state["number_bounds"])
+        else:
+            get_strategy().record("word", state["current_guess"])
+
+def advance_all(answers) -> GameState:
+    # Several answers from one click (k-way mode): still one node step and
+    # one log entry per answer, so saved games and replays cannot tell
+    state = None
+    for answer in answers:
+        state = advance(answer)
+    return state
+
+def start_game(mode) -> GameState:
+    game = st.session_state.game
+    get_strategy()
+    fresh = initialize_state(mode, game.number_range, game.games_played, game.tolerance)
+    config = session_config()
+    log = get_replay_log()
+    if log is not None:
+        # A replay runs the uniform split and plan, so games on a weighted one are left out
+        if fresh["plan_id"]:
+            log.close(config["configurable"]["thread_id"])
+        else:
+            log.start(config["configurable"]["thread_id"], mode, game.number_range, game.tolerance)
+    game.game_started, game.game_counted = time.monotonic(), False
+    state = get_game_graph(catalog.key).invoke(fresh, config)
+    if state["game_over"]:  # a one-number range ends before any question
+        count_finished_game(state)
+    return state
+
+# -----------------------------
+# Streamlit UI Functions (Modified)
+# -----------------------------
+def show_game_menu():
+    st.subheader("Choose a Game:")
+    st.caption(f"🎮 Games played: {st.session_state.game.games_played} · {get_stats().snapshot()['total_games']:,} on this server")
+    choice = st.radio("Select game type:", ["Number Game", "Word Game", "Exit Game"])
+
+    if choice == "Number Game":
+        low, high = st.session_state.game.number_range
+        col1, col2 = st.columns(2)
+        with col1:
+            low_text = st.text_input("From", str(low))
+        with col2:
+            high_text = st.text_input("To", str(high), help="Up to 2**64")
+
+    # k-way mode: one click answers up to k questions, so a game takes about
+    # k times fewer reruns
+    k = st.select_slider("Questions per click", options=[1, 2, 3, 4], value=st.session_state.game.answers_per_click,
+                         help="Number game: pick one of 2^k ranges. Word game: answer several categories in one form.")
+    errors = st.select_slider("Wrong answers to allow", options=list(range(tolerant_search.MAX_ERRORS + 1)),
+                              value=st.session_state.game.tolerance,
+                              help="Keep going through this many wrong answers per game, for a few more questions. "
+                                   "Asks one question per click.")
+
+    if st.button("Start Game"):
+        st.session_state.game.answers_per_click = k
+        st.session_state.game.tolerance = errors
+        if choice == "Number Game":
+            try:
+                bounds = number_search.validate_range(number_search.parse_bound(low_text), number_search.parse_bound(high_text))
+            except ValueError as exc:
+                st.error(f"Invalid range: {exc}")
+                return
+            st.session_state.game.number_range = bounds
+            st.session_state.game.mode = 'number'
+        elif choice == "Word Game":
+            st.session_state.game.mode = 'word'
+        else:
+            st.session_state.game.mode = 'exit'
+        if choice != "Exit Game":
+            start_game(st.session_state.game.mode)  # a new game, not the one left for the menu
+        st.rerun()
+
+def play_number_game():
+    st.subheader("🔢 Number Guessing Game")
+    state = current_state('number')
+    
+    # Show success message if game is over (correct number found)
+    if state["game_over"]:
+        st.success(state["step_output"])
+        
+        # Game over buttons
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            if st.button("🔄 Play Again"):
+                start_game('number')
+                st.rerun()
+        with col2:
+            if st.button("🧠 Try Word Game"):
+                switch_to_game('word')
+        with col3:
+            if st.button("🏠 Back to Menu"):
+                reset_to_main_menu()
+        with col4:
+            if st.button("🚪 Exit Game"):
+                st.session_state.game.mode = 'exit'
+                st.rerun()
+        return
+
+    question = state["step_output"]
+    # k-way answers follow the bisection, which a tolerant game does not
+    k = st.session_state.game.answers_per_click if not state["tolerance"] else 1
+    if question:
+        col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1])
+        with col1:
+            if k > 1:
+                # 2^k ranges; picking one answers the next k questions
+                low, high = state["number_range"]
+                st.write(f"Which range is your number in? ({low} to {high})")
+                for lo, hi, answers in number_search.intervals(low, high, k, game_nodes.plan_of(state)[0]):
+                    if st.button(f"{lo}–{hi}" if lo != hi else str(lo), key=f"range-{lo}"):
+                        advance_all("yes" if answer else "no" for answer in answers)
+                        st.rerun()
+            else:
+                response = st.radio(question, ["Yes", "No"])
+                if st.button("Submit Answer"):
+                    advance(response.lower())
+                    st.rerun()
+        with col2:
+            if st.button("Exit Game"):
+                st.session_state.game.mode = 'exit'
+                st.rerun()
+        with col3:
+            if st.button("Back to Menu"):
+                reset_to_main_menu()
+        with col4:
+            if st.button("Play Again"):
+                start_game('number')
+                st.rerun()
+        with col5:
+            if st.button("Try Word Game"):
+                switch_to_game('word')
+
+def play_word_game():
+    st.subheader("🧠 Word Guessing Game")
+    state = current_state('word')
+    
+    # Display game info
+    st.write("🧠 Welcome to the Word Game!")
+    st.write("Think of one of these words:")
+    st.write(catalog.word_list_text)
+    
+    # Display success message if game is over
+    if state["game_over"]:
+        st.success(state["step_output"])
+        
+        # Game over buttons - matching number game layout
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            if st.button("🔄 Play Again"):
+                start_game('word')
+                st.rerun()
+        with col2:
+            if st.button("🔢 Try Number Game"):
+                switch_to_game('number')
+        with col3:
+            if st.button("🏠 Back to Menu"):
+                reset_to_main_menu()
+        with col4:
+            if st.button("🚪 Exit Game"):
+                st.session_state.game.mode = 'exit'
+                st.rerun()
+        go_back_button(state)
+        return
+    
+    # Gameplay section (k-way answers follow the plan, which a tolerant game does not)
+    k = st.session_state.game.answers_per_click if not state["tolerance"] else 1
+    if state["current_guess"] is None and k > 1:
+        # Every category the next k questions could ask, in one form
+        plan = game_nodes.plan_of(state)[1]
+        categories = plan.categories_within(state["plan_node"], k)
+        with st.form("categories", clear_on_submit=True):
+            st.write("🧐 Which of these is your word related to?")
+            checked = {category: st.checkbox(category) for category in categories}
+            if st.form_submit_button("Submit answers"):
+                advance_all("yes" if answer else "no" for answer in plan.walk(state["plan_node"], checked))
+                st.rerun()
+    else:
+        st.write(state["step_output"])
+        col1, col2 = st.columns(2)
+        if state["current_guess"] is None:
+            # Ask category question phase
+            with col1:
+                if st.button("👍 Yes"):
+                    advance("yes")
+                    st.rerun()
+            with col2:
+                if st.button("👎 No"):
+                    advance("no")
+                    st.rerun()
+        else:
+            # Make a guess phase
+            with col1:
+                if st.button("✅ Yes, you got it!"):
+                    advance("yes")
+                    st.rerun()
+            with col2:
+                if st.button("❌ No, try again"):
+                    advance("no")
+                    st.rerun()
+    go_back_button(state)
+    
+    # Navigation buttons during gameplay - matching number game layout
+    st.write("---")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("🚪 Exit Game"):
+            st.session_state.game.mode = 'exit'
+            st.rerun()
+    with col2:
+        if st.button("🏠 Back to Menu"):
+            reset_to_main_menu()
+    with col3:
+        if st.button("🔢 Try Number Game"):
+            switch_to_game('number')
+    with col4:
+        if st.button("🔄 Play Again"):
+            start_game('word')
+            st.rerun()
+
+def go_back_button(state):
+    if (state["answer_log"] or state["tolerant_answers"]) and st.button("↩️ I answered wrong, go back"):
+        advance("back")
+        st.rerun()
+
+def reset_to_main_menu():
+    st.session_state.game.mode = None
+    st.rerun()
+
+def switch_to_game(mode):
+    st.session_state.game.mode = mode
+    start_game(mode)
+    st.rerun()
+
+def main():
+    st.set_page_config(page_title="Game Challenge", page_icon="🎲")
+    st.markdown(f"<pre style='color:cyan'>{render_banner('Game Zone', 'slant')}</pre>", unsafe_allow_html=True)
+    st.title("🎮 Welcome to the Game Challenge!")
+
+    # Touch (or create) this tab's entry in the process-wide registry
+    st.session_state.game = current_session()
+
+    mode = st.session_state.game.mode
+    if mode is None:
+        show_game_menu()
+    elif mode == 'number':
+        play_number_game()
+    elif mode == 'word':
+        play_word_game()
+    elif mode == 'exit':
+        st.success("👋 Thanks for playing! Come back soon.")
+    warm_up()
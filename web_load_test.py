@@ -0,0 +1,258 @@
+from pathlib import Path
+from array import array
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from game_simulator import percentile
+from word_catalog import get_catalog
+
+
+# -----------------------------
+# Streamlit Load Test
+# -----------------------------
+# Simulated browser sessions of Langgraph_Updated.py, driven through
+# Streamlit's headless AppTest API inside this process (nothing is served or
+# fetched). Each player picks a game in show_game_menu, answers
+# play_number_game / play_word_game truthfully about a seeded secret, goes
+# back to the menu and repeats (with --k, in k-way mode). All sessions stay open and take turns one
+# rerun at a time: AppTest runs share process-wide runtime state and are not
+# thread safe, and a worker runs scripts one at a time under the GIL anyway,
+# so one process here pays what one worker would. Reported:
+#   rerun_ms             latency of each click's rerun
+#   first_run_ms         first page load of a new session
+#   rss_kb_per_session   RSS growth per open session (AppTest's own element
+#                        trees included, so an upper bound)
+#   reruns_per_sec, games_per_sec, reruns_per_game (answer_reruns_per_game
+#                        counts only the reruns that answered questions)
+#   capacity_sessions    sessions one worker keeps 70% busy when every player
+#                        clicks once per --think seconds
+# Save a run with --json and pass it back with --baseline to compare commits.
+ROOT = Path(__file__).resolve().parent
+APP = str(ROOT / "Langgraph_Updated.py")
+TARGET_UTILISATION = 0.7
+
+# metric -> True when higher is better
+COMPARED = {
+    "rerun_ms.p50": False,
+    "rerun_ms.p95": False,
+    "rerun_ms.p99": False,
+    "first_run_ms.p50": False,
+    "rss_kb_per_session": False,
+    "reruns_per_game": False,
+    "answer_reruns_per_game": False,
+    "reruns_per_sec": True,
+    "games_per_sec": True,
+    "capacity_sessions": True,
+}
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+def _quantiles(samples) -> dict:
+    return {"p50": percentile(samples, 0.5), "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99), "max": max(samples, default=0.0)}
+
+def _button(app, label: str):
+    for button in app.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"no button {label!r}")
+
+def _range_button(app, secret: int):
+    # k-way number game: the "lo–hi" (or single number) button holding secret
+    for button in app.button:
+        lo, _, hi = button.label.partition("–")
+        try:
+            if int(lo) <= secret <= int(hi or lo):
+                return button
+        except ValueError:
+            continue
+    raise LookupError(f"no range button for {secret}")
+
+
+class Player:
+    __slots__ = ("app", "rng", "games_left", "k", "mode", "secret", "answers", "finished")
+
+    def __init__(self, app, rng: random.Random, games: int, k: int = 1):
+        self.app = app
+        self.rng = rng
+        self.games_left = games
+        self.k = k
+        self.mode = None
+        self.secret = None
+        self.answers = 0  # reruns that answered questions
+        self.finished = 0  # games that reached the success screen
+
+    def step(self, rerun_ms: array) -> bool:
+        # One click and its rerun; False once the player has finished
+        app, index = self.app, get_catalog().index
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+        if app.success:
+            self.finished += 1
+            self.mode = None
+            action = _button(app, "🏠 Back to Menu").click()
+        elif self.mode is None or (app.radio and app.radio[0].label == "Select game type:"):
+            if not self.games_left:
+                return False
+            if self.mode is None:
+                self.mode = self.rng.choice(("number", "word"))
+                low, high = map(int, (app.text_input[0].value, app.text_input[1].value)) if app.text_input else (1, 50)
+                self.secret = self.rng.randint(low, high) if self.mode == "number" else index.pick(index.all_words, self.rng)
+            wanted = "Number Game" if self.mode == "number" else "Word Game"
+            if app.radio[0].value != wanted:
+                action = app.radio[0].set_value(wanted)  # each widget change is a rerun of its own
+            elif app.select_slider[0].value != self.k:
+                action = app.select_slider[0].set_value(self.k)
+            else:
+                self.games_left -= 1
+                action = _button(app, "Start Game").click()
+        elif self.mode == "number" and self.k > 1:
+            self.answers += 1
+            action = _range_button(app, self.secret).click()
+        elif self.mode == "number":
+            self.answers += 1
+            question = app.radio[0]
+            mid = int(question.label.rstrip("?").split()[-1])
+            question.set_value("Yes" if self.secret > mid else "No")
+            action = _button(app, "Submit Answer").click()
+        elif app.checkbox:
+            self.answers += 1
+            for box in app.checkbox:
+                box.set_value(index.has_category(self.secret, box.label))
+            action = _button(app, "Submit answers").click()
+        else:
+            self.answers += 1
+            text = next(m.value for m in app.markdown if m.value.startswith(("🧐", "🤔")))
+            subject = text.split("'")[1]
+            if text.startswith("🧐"):
+                action = _button(app, "👍 Yes" if index.has_category(self.secret, subject) else "👎 No").click()
+            else:
+                action = _button(app, "✅ Yes, you got it!" if subject == self.secret else "❌ No, try again").click()
+
+        start = time.perf_counter()
+        action.run()
+        rerun_ms.append((time.perf_counter() - start) * 1000)
+        return True
+
+
+def run_load(sessions: int, games: int, think: float = 5.0, seed: int = 0, k: int = 1) -> dict:
+    from streamlit.testing.v1 import AppTest
+    from streamlit.logger import set_log_level
+    set_log_level("error")  # AppTest warns about bare-mode script contexts
+
+    # One uncounted session first, so imports and shared caches are warm
+    AppTest.from_file(APP, default_timeout=60).run()
+    rng = random.Random(seed)
+    rss_start = _rss_mb()
+    first_run_ms, rerun_ms = array("d"), array("d")
+    players = []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        app = AppTest.from_file(APP, default_timeout=60).run()
+        first_run_ms.append((time.perf_counter() - start) * 1000)
+        players.append(Player(app, random.Random(rng.random()), games, k))
+    rss_open = _rss_mb()
+
+    # Round robin, so every session stays live until its last game
+    errors = answer_reruns = played = 0
+    start = time.perf_counter()
+    while players:
+        still_playing = []
+        for player in players:
+            try:
+                if player.step(rerun_ms):
+                    still_playing.append(player)
+                    continue
+            except (LookupError, RuntimeError, StopIteration, ValueError):
+                errors += 1
+            answer_reruns += player.answers
+            played += player.finished  # short of `games` for a player who hit an error
+        players = still_playing
+    seconds = time.perf_counter() - start
+
+    mean_rerun_s = sum(rerun_ms) / len(rerun_ms) / 1000 if rerun_ms else 0.0
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    import streamlit
+    return {
+        "commit": commit or None,
+        "streamlit": streamlit.__version__,
+        "sessions": sessions,
+        "games_per_session": games,
+        "answers_per_click": k,
+        "think_seconds": think,
+        "errors": errors,
+        "games": played,
+        "reruns": len(rerun_ms),
+        "seconds": seconds,
+        "reruns_per_sec": len(rerun_ms) / seconds if seconds else 0.0,
+        "games_per_sec": played / seconds if seconds else 0.0,
+        "reruns_per_game": len(rerun_ms) / played if played else 0.0,
+        "answer_reruns_per_game": answer_reruns / played if played else 0.0,
+        "rerun_ms": _quantiles(rerun_ms),
+        "first_run_ms": _quantiles(first_run_ms),
+        "rss_mb_start": rss_start,
+        "rss_kb_per_session": (rss_open - rss_start) * 1000 / sessions if sessions else 0.0,
+        "rss_mb_end": _rss_mb(),
+        "capacity_sessions": TARGET_UTILISATION * think / mean_rerun_s if mean_rerun_s else 0.0,
+    }
+
+
+def _lookup(report: dict, metric: str):
+    value = report
+    for part in metric.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for metric, higher_is_better in COMPARED.items():
+        value, before = _lookup(report, metric), _lookup(baseline, metric)
+        line = f"{metric:20s} {value:10.2f}"
+        if before:
+            change = (value - before) / before
+            line += f"  before {before:10.2f}  ({change * 100:+.1f}%)"
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                line += "  REGRESSED"
+                regressions.append(metric)
+        print(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with simulated sessions (headless, local).")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--games", type=int, default=2, help="games per session")
+    parser.add_argument("--think", type=float, default=5.0, help="seconds between a player's clicks, for capacity_sessions")
+    parser.add_argument("--k", type=int, choices=[1, 2, 3, 4], default=1, help="questions per click (k-way mode)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write the report to this file")
+    parser.add_argument("--baseline", type=Path, help="earlier --json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_load(args.sessions, args.games, args.think, args.seed, args.k)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    print(f"{report['sessions']} sessions x {report['games_per_session']} games ({report['games']} finished), {report['reruns']} reruns "
+          f"in {report['seconds']:.1f}s, {report['errors']} errors (commit {report['commit']}"
+          + (f", baseline {baseline.get('commit')}" if baseline else "") + ")")
+    regressions = compare(report, baseline, args.tolerance)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if regressions or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+from typing import Optional
+import os
+
+from catalog_store import CatalogStore, load_store
+from word_index import WordIndex
+from matrix_engine import MatrixEngine, matrix_engine_for
+from question_planner import PLAN_VERSION, QuestionPlan, plan_for
+
+
+# -----------------------------
+# Shared Word Catalog
+# -----------------------------
+# Everything derived from the word catalog (bitset index, sorted categories,
+# question plan, display text) is built once per process and shared
+# read-only by every game and session. Streamlit re-runs the app script on
+# each interaction, but imported modules are not re-run, so the cache lives
+# here. A catalog file (CSV, JSONL, JSON or the binary .wcat form, see
+# catalog_store) is rebuilt only when its mtime or size changes; the
+# built-in catalog never changes. A .wcat that carries its question plan is
+# used as is: no plan build, and the MatrixEngine only when something asks.
+BUILTIN_CATALOG = {
+    "apple": ["food", "fruit"],
+    "chair": ["furniture", "object"],
+    "elephant": ["animal"],
+    "guitar": ["instrument", "object"],
+    "rocket": ["vehicle", "space"],
+    "pencil": ["stationery", "object"],
+    "pizza": ["food"],
+    "tiger": ["animal"]
+}
+
+CATALOG_ENV = "GAME_WORD_CATALOG"
+
+class Catalog:
+    __slots__ = ("key", "words", "index", "categories", "plan", "word_list_text", "_engine")
+
+    def __init__(self, store: CatalogStore, key: tuple = ("builtin",)):
+        self.key = key
+        self.index = WordIndex.from_store(store)
+        self.words = self.index.words
+        self.categories = self.index.categories
+        stored = store.plan
+        if stored is not None and stored.version == PLAN_VERSION:
+            self.index.digest = stored.digest
+            self.plan: QuestionPlan = QuestionPlan.from_stored(self.index, stored, store.categories)
+            self._engine = None
+        else:
+            self._engine = matrix_engine_for(self.index)
+            self.plan = plan_for(self.index, engine=self._engine)
+        self.word_list_text = ", ".join(self.words)
+
+    @property
+    def engine(self) -> Optional[MatrixEngine]:
+        # For weighted rebuilds (play_history); built on first use
+        if self._engine is None:
+            self._engine = matrix_engine_for(self.index)
+        return self._engine
+
+def _source_key(path: Optional[str]) -> tuple:
+    if not path:
+        return ("builtin",)
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+_catalogs: dict[str, Catalog] = {}
+
+def get_catalog(path: Optional[str] = None) -> Catalog:
+    # `path` defaults to $GAME_WORD_CATALOG, then the built-in catalog.
+    # A call costs one stat() when a file is configured, a dict lookup otherwise.
+    path = path if path is not None else os.environ.get(CATALOG_ENV)
+    key = _source_key(path)
+    catalog = _catalogs.get(key[0])
+    if catalog is None or catalog.key != key:
+        catalog = _catalogs[key[0]] = Catalog(load_store(path) if path else CatalogStore.from_records(BUILTIN_CATALOG.items()), key)
+    return catalog
@@ -0,0 +1,122 @@
+from typing import Iterable, Mapping, Optional
+import random
+
+
+# -----------------------------
+# Bitset Word/Category Index
+# -----------------------------
+# Every word gets an integer id (its position in `words`). A category is stored
+# as one Python int whose bit i is set when word i carries that category, and
+# the candidate set of a running game is an int bitmask over the same ids.
+# Narrowing is a single AND / AND-NOT and scoring a category is a popcount.
+class WordIndex:
+    __slots__ = ("words", "word_ids", "categories", "category_masks", "all_words", "digest")
+
+    def __init__(self, word_categories: Mapping[str, Iterable[str]]):
+        self.words = list(word_categories.keys())
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+
+        # Set bits in per-category byte buffers and convert once at the end,
+        # so building stays linear in the number of (word, category) tags.
+        nbytes = (len(self.words) + 7) // 8
+        buffers: dict[str, bytearray] = {}
+        for i, tags in enumerate(word_categories.values()):
+            for category in tags:
+                buf = buffers.get(category)
+                if buf is None:
+                    buf = buffers[category] = bytearray(nbytes)
+                buf[i >> 3] |= 1 << (i & 7)
+
+        self._finish(buffers)
+
+    @classmethod
+    def from_store(cls, store) -> "WordIndex":
+        # Same index built from a CatalogStore's flat arrays: tags are already
+        # interned category ids, so no category string is hashed per tag.
+        index = cls.__new__(cls)
+        index.words = store.words
+        index.word_ids = {word: i for i, word in enumerate(index.words)}
+
+        nbytes = (len(index.words) + 7) // 8
+        buffers: dict[int, bytearray] = {}
+        offsets, tag_ids = store.tag_offsets, store.tag_ids
+        for i in range(len(index.words)):
+            for category_id in tag_ids[offsets[i]:offsets[i + 1]]:
+                buf = buffers.get(category_id)
+                if buf is None:
+                    buf = buffers[category_id] = bytearray(nbytes)
+                buf[i >> 3] |= 1 << (i & 7)
+
+        index._finish({store.categories[c]: buf for c, buf in buffers.items()})
+        return index
+
+    def _finish(self, buffers: dict[str, bytearray]) -> None:
+        self.category_masks = {cat: int.from_bytes(buf, "little") for cat, buf in buffers.items()}
+        self.categories = sorted(self.category_masks)
+        self.all_words = (1 << len(self.words)) - 1
+        self.digest: Optional[str] = None  # question_planner.catalog_hash, filled in on first use
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # -- candidate sets ---------------------------------------------------
+    @staticmethod
+    def count(mask: int) -> int:
+        return mask.bit_count()
+
+    def narrow(self, mask: int, category: str, answer: bool) -> int:
+        category_mask = self.category_masks.get(category, 0)
+        return mask & category_mask if answer else mask & ~category_mask
+
+    def remove(self, mask: int, word: str) -> int:
+        return mask & ~(1 << self.word_ids[word])
+
+    def has_category(self, word: str, category: str) -> bool:
+        return bool(self.category_masks.get(category, 0) >> self.word_ids[word] & 1)
+
+    def word_category_ids(self) -> list[list[int]]:
+        # Per-word category ids (positions in `categories`), recovered from the
+        # category bitmasks. Peeling bits off a big int copies it every time,
+        # so each mask is read as a bit string (lowest bit first) instead.
+        tags: list[list[int]] = [[] for _ in self.words]
+        for category_id, category in enumerate(self.categories):
+            bits = bin(self.category_masks[category])[:1:-1]
+            word_id = bits.find("1")
+            while word_id >= 0:
+                tags[word_id].append(category_id)
+                word_id = bits.find("1", word_id + 1)
+        return tags
+
+    # -- scoring ------------------------------------------------------------
+    def best_category(self, mask: int, asked: Iterable[str] = ()) -> Optional[str]:
+        # Category that splits the candidates most evenly (max of min(yes, no)),
+        # restricted to categories at least one candidate still carries.
+        asked = set(asked)
+        total = mask.bit_count()
+        best_category, best_score = None, -1
+        for category in self.categories:
+            if category in asked:
+                continue
+            yes = (mask & self.category_masks[category]).bit_count()
+            if not yes:
+                continue
+            score = min(yes, total - yes)
+            if score > best_score:
+                best_category, best_score = category, score
+        return best_category
+
+    # -- picking --------------------------------------------------------------
+    def nth(self, mask: int, rank: int) -> str:
+        # Word with the `rank`-th lowest id in `mask`, found by bisecting on
+        # prefix popcounts instead of materialising the candidate list.
+        lo, hi = 0, len(self.words) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (mask & ((1 << (mid + 1)) - 1)).bit_count() > rank:
+                hi = mid
+            else:
+                lo = mid + 1
+        return self.words[lo]
+
+    def pick(self, mask: int, rng: random.Random = random) -> str:
+        return self.nth(mask, rng.randrange(mask.bit_count()))